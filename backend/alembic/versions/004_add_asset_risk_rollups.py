@@ -0,0 +1,83 @@
+"""Add asset risk rollups table
+
+Revision ID: 004_add_asset_risk_rollups
+Revises: 48578a914206
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004_add_asset_risk_rollups'
+down_revision = '48578a914206'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'asset_risk_rollups',
+        sa.Column('asset_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('open_critical_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_high_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_medium_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_low_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_info_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('threat_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('threat_status_counts', postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column('max_risk_score', sa.Numeric(5, 2), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['asset_id'], ['assets.asset_id'], ondelete='CASCADE'),
+    )
+    op.create_index('ix_asset_risk_rollups_max_risk_score', 'asset_risk_rollups', ['max_risk_score'])
+
+    # Backfill one row per existing asset
+    op.execute("""
+        INSERT INTO asset_risk_rollups (
+            asset_id, open_critical_count, open_high_count, open_medium_count,
+            open_low_count, open_info_count, threat_count, threat_status_counts, max_risk_score
+        )
+        SELECT
+            a.asset_id,
+            COALESCE(f.critical, 0),
+            COALESCE(f.high, 0),
+            COALESCE(f.medium, 0),
+            COALESCE(f.low, 0),
+            COALESCE(f.info, 0),
+            COALESCE(t.threat_count, 0),
+            COALESCE(t.status_counts, '{}'::jsonb),
+            t.max_risk_score
+        FROM assets a
+        LEFT JOIN (
+            SELECT
+                asset_id,
+                count(*) FILTER (WHERE severity = 'CRITICAL') AS critical,
+                count(*) FILTER (WHERE severity = 'HIGH') AS high,
+                count(*) FILTER (WHERE severity = 'MEDIUM') AS medium,
+                count(*) FILTER (WHERE severity = 'LOW') AS low,
+                count(*) FILTER (WHERE severity = 'INFO') AS info
+            FROM findings
+            WHERE status IN ('OPEN', 'IN_PROGRESS')
+            GROUP BY asset_id
+        ) f ON f.asset_id = a.asset_id
+        LEFT JOIN (
+            SELECT
+                asset_id,
+                sum(status_count) AS threat_count,
+                jsonb_object_agg(status, status_count) AS status_counts,
+                max(status_max_risk) AS max_risk_score
+            FROM (
+                SELECT asset_id, status, count(*) AS status_count, max(risk_score) AS status_max_risk
+                FROM threats
+                GROUP BY asset_id, status
+            ) per_status
+            GROUP BY asset_id
+        ) t ON t.asset_id = a.asset_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_asset_risk_rollups_max_risk_score', table_name='asset_risk_rollups')
+    op.drop_table('asset_risk_rollups')
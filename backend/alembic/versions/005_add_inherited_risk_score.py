@@ -0,0 +1,27 @@
+"""Add inherited risk score to asset risk rollups
+
+Revision ID: 005_add_inherited_risk_score
+Revises: 004_add_asset_risk_rollups
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_add_inherited_risk_score'
+down_revision = '004_add_asset_risk_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('asset_risk_rollups', sa.Column('inherited_risk_score', sa.Numeric(5, 2), nullable=True))
+    op.add_column('asset_risk_rollups', sa.Column('inherited_risk_updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_asset_risk_rollups_inherited_risk_score', 'asset_risk_rollups', ['inherited_risk_score'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_asset_risk_rollups_inherited_risk_score', table_name='asset_risk_rollups')
+    op.drop_column('asset_risk_rollups', 'inherited_risk_updated_at')
+    op.drop_column('asset_risk_rollups', 'inherited_risk_score')
@@ -0,0 +1,29 @@
+"""Add cache versions table
+
+Revision ID: 006_add_cache_versions
+Revises: 005_add_inherited_risk_score
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_add_cache_versions'
+down_revision = '005_add_inherited_risk_score'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='1'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+    op.execute("INSERT INTO cache_versions (name, version) VALUES ('asset_graph', 1)")
+
+
+def downgrade() -> None:
+    op.drop_table('cache_versions')
@@ -0,0 +1,88 @@
+"""Add technology stack index and asset components table
+
+Revision ID: 007_add_asset_components
+Revises: 006_add_cache_versions
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import re
+import uuid
+
+# revision identifiers, used by Alembic.
+revision = '007_add_asset_components'
+down_revision = '006_add_cache_versions'
+branch_labels = None
+depends_on = None
+
+# Same pattern as technology_service.ENTRY_PATTERN at the time of this revision
+ENTRY_PATTERN = re.compile(r"^(?P<name>.*?)[\s@:/]+v?(?P<major>\d+)(?:\.(?P<minor>\d+))?(?:\.(?P<patch>\d+))?\S*$")
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_assets_technology_stack', 'assets', ['technology_stack'], postgresql_using='gin'
+    )
+
+    components = op.create_table(
+        'asset_components',
+        sa.Column('component_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('asset_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('raw_entry', sa.String(), nullable=False),
+        sa.Column('version', sa.String(100), nullable=True),
+        sa.Column('version_major', sa.Integer(), nullable=True),
+        sa.Column('version_minor', sa.Integer(), nullable=True),
+        sa.Column('version_patch', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['asset_id'], ['assets.asset_id'], ondelete='CASCADE'),
+    )
+    op.create_index('ix_asset_components_asset_id', 'asset_components', ['asset_id'])
+    op.create_index(
+        'ix_asset_components_name_version',
+        'asset_components',
+        ['name', 'version_major', 'version_minor', 'version_patch']
+    )
+
+    # Backfill from existing technology stacks
+    rows = []
+    assets = op.get_bind().execute(
+        sa.text("SELECT asset_id, technology_stack FROM assets WHERE technology_stack IS NOT NULL")
+    )
+    for asset_id, technology_stack in assets:
+        seen = set()
+        for entry in technology_stack:
+            entry = (entry or '').strip()
+            if not entry or entry in seen:
+                continue
+            seen.add(entry)
+            match = ENTRY_PATTERN.match(entry)
+            row = {
+                'component_id': uuid.uuid4(),
+                'asset_id': asset_id,
+                'name': entry.lower(),
+                'raw_entry': entry,
+                'version': None,
+                'version_major': None,
+                'version_minor': None,
+                'version_patch': None,
+            }
+            if match and match.group('name').strip():
+                row.update({
+                    'name': match.group('name').strip().lower(),
+                    'version': entry[match.start('major'):].strip(),
+                    'version_major': int(match.group('major')),
+                    'version_minor': int(match.group('minor') or 0),
+                    'version_patch': int(match.group('patch') or 0),
+                })
+            rows.append(row)
+    if rows:
+        op.bulk_insert(components, rows)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_asset_components_name_version', table_name='asset_components')
+    op.drop_index('ix_asset_components_asset_id', table_name='asset_components')
+    op.drop_table('asset_components')
+    op.drop_index('ix_assets_technology_stack', table_name='assets')
@@ -0,0 +1,26 @@
+"""Add threat state history timeline index
+
+Revision ID: 008_add_threat_history_index
+Revises: 007_add_asset_components
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '008_add_threat_history_index'
+down_revision = '007_add_asset_components'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_threat_state_history_threat_id_changed_at',
+        'threat_state_history',
+        ['threat_id', 'changed_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_threat_state_history_threat_id_changed_at', table_name='threat_state_history')
@@ -0,0 +1,26 @@
+"""Add revision to threat model diagrams
+
+Revision ID: 009_add_diagram_revision
+Revises: 008_add_threat_history_index
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_add_diagram_revision'
+down_revision = '008_add_threat_history_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'threat_model_diagrams',
+        sa.Column('revision', sa.Integer(), nullable=False, server_default='1')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('threat_model_diagrams', 'revision')
@@ -0,0 +1,38 @@
+"""Add diagram listing summary columns
+
+Revision ID: 010_add_diagram_summary_columns
+Revises: 009_add_diagram_revision
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_add_diagram_summary_columns'
+down_revision = '009_add_diagram_revision'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('threat_model_diagrams', sa.Column('node_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('threat_model_diagrams', sa.Column('link_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('threat_model_diagrams', sa.Column('thumbnail_svg', sa.Text(), nullable=True))
+    op.add_column('threat_model_diagrams', sa.Column('thumbnail_revision', sa.Integer(), nullable=True))
+
+    # Existing diagrams get their counts now and a thumbnail on their next save
+    op.execute("""
+        UPDATE threat_model_diagrams SET
+            node_count = CASE WHEN jsonb_typeof(canvas_data->'nodes') = 'array'
+                THEN jsonb_array_length(canvas_data->'nodes') ELSE 0 END,
+            link_count = CASE WHEN jsonb_typeof(canvas_data->'links') = 'array'
+                THEN jsonb_array_length(canvas_data->'links') ELSE 0 END
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('threat_model_diagrams', 'thumbnail_revision')
+    op.drop_column('threat_model_diagrams', 'thumbnail_svg')
+    op.drop_column('threat_model_diagrams', 'link_count')
+    op.drop_column('threat_model_diagrams', 'node_count')
@@ -0,0 +1,33 @@
+"""Add diagram element states for incremental threat generation
+
+Revision ID: 011_add_diagram_element_states
+Revises: 010_add_diagram_summary_columns
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '011_add_diagram_element_states'
+down_revision = '010_add_diagram_summary_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'diagram_element_states',
+        sa.Column('diagram_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('element_key', sa.String(length=255), nullable=False),
+        sa.Column('fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('threat_ids', postgresql.ARRAY(postgresql.UUID(as_uuid=True)), nullable=False, server_default='{}'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['diagram_id'], ['threat_model_diagrams.diagram_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('diagram_id', 'element_key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('diagram_element_states')
@@ -0,0 +1,36 @@
+"""Add daily risk posture snapshots
+
+Revision ID: 012_add_risk_posture_snapshots
+Revises: 011_add_diagram_element_states
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '012_add_risk_posture_snapshots'
+down_revision = '011_add_diagram_element_states'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'risk_posture_snapshots',
+        sa.Column('snapshot_date', sa.Date(), primary_key=True),
+        sa.Column('open_critical_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_high_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_medium_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_low_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_info_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('threat_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('threat_status_counts', postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column('risk_by_classification', postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column('captured_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('risk_posture_snapshots')
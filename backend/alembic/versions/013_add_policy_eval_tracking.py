@@ -0,0 +1,44 @@
+"""Add change tracking for incremental policy evaluation
+
+Revision ID: 013_add_policy_eval_tracking
+Revises: 012_add_risk_posture_snapshots
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_add_policy_eval_tracking'
+down_revision = '012_add_risk_posture_snapshots'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A constant default is metadata-only on Postgres 11+, so this does not
+    # rewrite the table; existing findings look changed once and are picked
+    # up by the first incremental run
+    op.add_column(
+        'findings',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True)
+    )
+    op.create_index('ix_findings_updated_at_finding_id', 'findings', ['updated_at', 'finding_id'])
+
+    op.add_column('policy_rules', sa.Column('evaluated_version', sa.Integer(), nullable=True))
+
+    op.add_column('policy_violations', sa.Column('retired_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_policy_violations_active_finding_policy',
+        'policy_violations',
+        ['finding_id', 'policy_rule_id'],
+        postgresql_where=sa.text('retired_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_policy_violations_active_finding_policy', table_name='policy_violations')
+    op.drop_column('policy_violations', 'retired_at')
+    op.drop_column('policy_rules', 'evaluated_version')
+    op.drop_index('ix_findings_updated_at_finding_id', table_name='findings')
+    op.drop_column('findings', 'updated_at')
@@ -0,0 +1,22 @@
+"""Add scan result pipeline run index
+
+Revision ID: 014_add_scan_pipeline_index
+Revises: 013_add_policy_eval_tracking
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '014_add_scan_pipeline_index'
+down_revision = '013_add_policy_eval_tracking'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_scan_results_pipeline_run_id', 'scan_results', ['pipeline_run_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scan_results_pipeline_run_id', table_name='scan_results')
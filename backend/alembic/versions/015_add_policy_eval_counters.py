@@ -0,0 +1,35 @@
+"""Add daily policy evaluation counters
+
+Revision ID: 015_add_policy_eval_counters
+Revises: 014_add_scan_pipeline_index
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '015_add_policy_eval_counters'
+down_revision = '014_add_scan_pipeline_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'policy_evaluation_counters',
+        sa.Column('policy_rule_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('bucket_date', sa.Date(), nullable=False),
+        sa.Column('evaluations', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('passed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('warned', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('blocked', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_evaluated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['policy_rule_id'], ['policy_rules.policy_rule_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('policy_rule_id', 'bucket_date'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('policy_evaluation_counters')
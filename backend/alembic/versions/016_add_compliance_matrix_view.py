@@ -0,0 +1,74 @@
+"""Add the compliance control status materialized view
+
+Revision ID: 016_add_compliance_matrix_view
+Revises: 015_add_policy_eval_counters
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '016_add_compliance_matrix_view'
+down_revision = '015_add_policy_eval_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per control with its active mapped rules and their active
+    # violations; refreshed concurrently after evaluation runs
+    op.execute("""
+        CREATE MATERIALIZED VIEW compliance_control_status AS
+        WITH rule_violations AS (
+            SELECT policy_rule_id,
+                   count(*) FILTER (WHERE gate_decision = 'BLOCK') AS blocking_violations,
+                   count(*) FILTER (WHERE gate_decision = 'WARN') AS warning_violations
+            FROM policy_violations
+            WHERE retired_at IS NULL
+            GROUP BY policy_rule_id
+        ),
+        control_rules AS (
+            SELECT DISTINCT m.control_id, r.policy_rule_id, r.name, r.severity,
+                   coalesce(v.blocking_violations, 0) AS blocking_violations,
+                   coalesce(v.warning_violations, 0) AS warning_violations
+            FROM policy_control_mappings m
+            JOIN policy_rules r ON r.policy_rule_id = m.policy_rule_id AND r.active
+            LEFT JOIN rule_violations v ON v.policy_rule_id = r.policy_rule_id
+        )
+        SELECT c.control_id,
+               c.framework,
+               c.control_code,
+               c.description,
+               count(cr.policy_rule_id) AS mapped_rule_count,
+               coalesce(sum(cr.blocking_violations), 0)::bigint AS blocking_violations,
+               coalesce(sum(cr.warning_violations), 0)::bigint AS warning_violations,
+               CASE
+                   WHEN count(cr.policy_rule_id) = 0 THEN 'NOT_MAPPED'
+                   WHEN coalesce(sum(cr.blocking_violations), 0) > 0 THEN 'FAILING'
+                   WHEN coalesce(sum(cr.warning_violations), 0) > 0 THEN 'WARNING'
+                   ELSE 'PASSING'
+               END AS status,
+               coalesce(
+                   jsonb_agg(jsonb_build_object(
+                       'policy_rule_id', cr.policy_rule_id,
+                       'name', cr.name,
+                       'severity', cr.severity,
+                       'blocking_violations', cr.blocking_violations,
+                       'warning_violations', cr.warning_violations
+                   ) ORDER BY cr.name) FILTER (WHERE cr.policy_rule_id IS NOT NULL),
+                   '[]'::jsonb
+               ) AS rules
+        FROM controls c
+        LEFT JOIN control_rules cr ON cr.control_id = c.control_id
+        GROUP BY c.control_id
+    """)
+    # A unique index is what allows REFRESH ... CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX ix_compliance_control_status_control_id ON compliance_control_status (control_id)")
+    op.execute(
+        "CREATE INDEX ix_compliance_control_status_framework_code "
+        "ON compliance_control_status (framework, control_code)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS compliance_control_status")
@@ -0,0 +1,54 @@
+"""Add natural keys to controls and policy control mappings
+
+Revision ID: 017_add_control_unique_keys
+Revises: 016_add_compliance_matrix_view
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '017_add_control_unique_keys'
+down_revision = '016_add_compliance_matrix_view'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fold duplicate controls into the first one before the unique key goes on
+    op.execute("""
+        WITH ranked AS (
+            SELECT control_id,
+                   first_value(control_id) OVER (
+                       PARTITION BY framework, control_code ORDER BY control_id
+                   ) AS keep_id
+            FROM controls
+        )
+        UPDATE policy_control_mappings m
+        SET control_id = ranked.keep_id
+        FROM ranked
+        WHERE m.control_id = ranked.control_id AND ranked.control_id <> ranked.keep_id
+    """)
+    op.execute("""
+        DELETE FROM controls c
+        USING controls keep
+        WHERE keep.framework = c.framework
+          AND keep.control_code = c.control_code
+          AND keep.control_id < c.control_id
+    """)
+    op.execute("""
+        DELETE FROM policy_control_mappings m
+        USING policy_control_mappings keep
+        WHERE keep.policy_rule_id = m.policy_rule_id
+          AND keep.control_id = m.control_id
+          AND keep.mapping_id < m.mapping_id
+    """)
+    op.create_unique_constraint('uq_controls_framework_control_code', 'controls', ['framework', 'control_code'])
+    op.create_unique_constraint(
+        'uq_policy_control_mappings_rule_control', 'policy_control_mappings', ['policy_rule_id', 'control_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_policy_control_mappings_rule_control', 'policy_control_mappings', type_='unique')
+    op.drop_constraint('uq_controls_framework_control_code', 'controls', type_='unique')
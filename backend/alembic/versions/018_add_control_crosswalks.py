@@ -0,0 +1,39 @@
+"""Add cross-framework control crosswalks
+
+Revision ID: 018_add_control_crosswalks
+Revises: 017_add_control_unique_keys
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '018_add_control_crosswalks'
+down_revision = '017_add_control_unique_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'control_crosswalks',
+        sa.Column('crosswalk_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('source_control_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('target_control_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['source_control_id'], ['controls.control_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['target_control_id'], ['controls.control_id'], ondelete='CASCADE'),
+        sa.CheckConstraint('source_control_id <> target_control_id', name='ck_control_crosswalks_distinct'),
+    )
+    # Links are undirected: A -> B and B -> A are the same crosswalk
+    op.execute(
+        "CREATE UNIQUE INDEX uq_control_crosswalks_pair ON control_crosswalks "
+        "(LEAST(source_control_id, target_control_id), GREATEST(source_control_id, target_control_id))"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_control_crosswalks_pair', table_name='control_crosswalks')
+    op.drop_table('control_crosswalks')
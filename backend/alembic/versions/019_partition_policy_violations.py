@@ -0,0 +1,224 @@
+"""Partition policy violations by month and add monthly summaries
+
+Revision ID: 019_partition_policy_violations
+Revises: 018_add_control_crosswalks
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '019_partition_policy_violations'
+down_revision = '018_add_control_crosswalks'
+branch_labels = None
+depends_on = None
+
+# Partitions created beyond the current month; the daily maintenance task keeps this many ahead
+PARTITIONS_AHEAD = 3
+
+COMPLIANCE_CONTROL_STATUS = """
+    CREATE MATERIALIZED VIEW compliance_control_status AS
+    WITH rule_violations AS (
+        SELECT policy_rule_id,
+               count(*) FILTER (WHERE gate_decision = 'BLOCK') AS blocking_violations,
+               count(*) FILTER (WHERE gate_decision = 'WARN') AS warning_violations
+        FROM policy_violations
+        WHERE retired_at IS NULL
+        GROUP BY policy_rule_id
+    ),
+    control_rules AS (
+        SELECT DISTINCT m.control_id, r.policy_rule_id, r.name, r.severity,
+               coalesce(v.blocking_violations, 0) AS blocking_violations,
+               coalesce(v.warning_violations, 0) AS warning_violations
+        FROM policy_control_mappings m
+        JOIN policy_rules r ON r.policy_rule_id = m.policy_rule_id AND r.active
+        LEFT JOIN rule_violations v ON v.policy_rule_id = r.policy_rule_id
+    )
+    SELECT c.control_id,
+           c.framework,
+           c.control_code,
+           c.description,
+           count(cr.policy_rule_id) AS mapped_rule_count,
+           coalesce(sum(cr.blocking_violations), 0)::bigint AS blocking_violations,
+           coalesce(sum(cr.warning_violations), 0)::bigint AS warning_violations,
+           CASE
+               WHEN count(cr.policy_rule_id) = 0 THEN 'NOT_MAPPED'
+               WHEN coalesce(sum(cr.blocking_violations), 0) > 0 THEN 'FAILING'
+               WHEN coalesce(sum(cr.warning_violations), 0) > 0 THEN 'WARNING'
+               ELSE 'PASSING'
+           END AS status,
+           coalesce(
+               jsonb_agg(jsonb_build_object(
+                   'policy_rule_id', cr.policy_rule_id,
+                   'name', cr.name,
+                   'severity', cr.severity,
+                   'blocking_violations', cr.blocking_violations,
+                   'warning_violations', cr.warning_violations
+               ) ORDER BY cr.name) FILTER (WHERE cr.policy_rule_id IS NOT NULL),
+               '[]'::jsonb
+           ) AS rules
+    FROM controls c
+    LEFT JOIN control_rules cr ON cr.control_id = c.control_id
+    GROUP BY c.control_id
+"""
+
+
+def _create_compliance_control_status() -> None:
+    op.execute(COMPLIANCE_CONTROL_STATUS)
+    op.execute("CREATE UNIQUE INDEX ix_compliance_control_status_control_id ON compliance_control_status (control_id)")
+    op.execute(
+        "CREATE INDEX ix_compliance_control_status_framework_code "
+        "ON compliance_control_status (framework, control_code)"
+    )
+
+
+def upgrade() -> None:
+    # The view reads policy_violations and would keep pointing at the old table
+    op.execute("DROP MATERIALIZED VIEW compliance_control_status")
+
+    op.execute("ALTER TABLE policy_violations RENAME TO policy_violations_unpartitioned")
+    op.execute("ALTER INDEX policy_violations_pkey RENAME TO policy_violations_unpartitioned_pkey")
+    op.execute(
+        "ALTER INDEX ix_policy_violations_active_finding_policy "
+        "RENAME TO ix_policy_violations_unpartitioned_active"
+    )
+
+    # The partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE policy_violations (
+            violation_id uuid NOT NULL,
+            finding_id uuid NOT NULL REFERENCES findings (finding_id),
+            policy_rule_id uuid NOT NULL REFERENCES policy_rules (policy_rule_id),
+            gate_decision gatedecision NOT NULL,
+            evaluated_at timestamptz NOT NULL DEFAULT now(),
+            retired_at timestamptz,
+            CONSTRAINT policy_violations_pkey PRIMARY KEY (violation_id, evaluated_at)
+        ) PARTITION BY RANGE (evaluated_at)
+    """)
+
+    # One partition per UTC month from the oldest violation to PARTITIONS_AHEAD months out
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce(
+                        (SELECT min(evaluated_at) FROM policy_violations_unpartitioned), now()
+                    ) AT TIME ZONE 'UTC'),
+                    date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{PARTITIONS_AHEAD} months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF policy_violations FOR VALUES FROM (%L) TO (%L)',
+                    'policy_violations_' || to_char(month, '"y"YYYY"m"MM'),
+                    month::timestamp AT TIME ZONE 'UTC',
+                    (month + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+                );
+            END LOOP;
+        END
+        $$
+    """)
+
+    op.execute("""
+        INSERT INTO policy_violations
+            (violation_id, finding_id, policy_rule_id, gate_decision, evaluated_at, retired_at)
+        SELECT violation_id, finding_id, policy_rule_id, gate_decision, coalesce(evaluated_at, now()), retired_at
+        FROM policy_violations_unpartitioned
+    """)
+    op.execute("DROP TABLE policy_violations_unpartitioned")
+
+    op.create_index(
+        'ix_policy_violations_policy_evaluated_at',
+        'policy_violations',
+        ['policy_rule_id', sa.text('evaluated_at DESC')]
+    )
+    op.create_index(
+        'ix_policy_violations_active_finding_policy',
+        'policy_violations',
+        ['finding_id', 'policy_rule_id'],
+        postgresql_where=sa.text('retired_at IS NULL')
+    )
+
+    op.create_table(
+        'policy_violation_monthly_summaries',
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('policy_rule_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            'gate_decision',
+            postgresql.ENUM('PASS', 'WARN', 'BLOCK', name='gatedecision', create_type=False),
+            nullable=False
+        ),
+        sa.Column('violation_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('retired_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('finding_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rolled_up_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['policy_rule_id'], ['policy_rules.policy_rule_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('month', 'policy_rule_id', 'gate_decision'),
+    )
+    op.create_index(
+        'ix_policy_violation_monthly_summaries_policy_month',
+        'policy_violation_monthly_summaries',
+        ['policy_rule_id', 'month']
+    )
+    # Completed months are summarized now; the maintenance task takes over from here
+    op.execute("""
+        INSERT INTO policy_violation_monthly_summaries
+            (month, policy_rule_id, gate_decision, violation_count, retired_count, finding_count)
+        SELECT (date_trunc('month', evaluated_at AT TIME ZONE 'UTC'))::date, policy_rule_id, gate_decision,
+               count(*), count(retired_at), count(DISTINCT finding_id)
+        FROM policy_violations
+        WHERE evaluated_at < date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+        GROUP BY 1, 2, 3
+    """)
+
+    _create_compliance_control_status()
+
+
+def downgrade() -> None:
+    op.drop_index('ix_policy_violation_monthly_summaries_policy_month', table_name='policy_violation_monthly_summaries')
+    op.drop_table('policy_violation_monthly_summaries')
+
+    op.execute("DROP MATERIALIZED VIEW compliance_control_status")
+    op.execute("ALTER TABLE policy_violations RENAME TO policy_violations_partitioned")
+    op.execute("ALTER INDEX policy_violations_pkey RENAME TO policy_violations_partitioned_pkey")
+    op.execute(
+        "ALTER INDEX ix_policy_violations_active_finding_policy RENAME TO ix_policy_violations_partitioned_active"
+    )
+    op.execute(
+        "ALTER INDEX ix_policy_violations_policy_evaluated_at RENAME TO ix_policy_violations_partitioned_policy"
+    )
+    op.create_table(
+        'policy_violations',
+        sa.Column('violation_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('finding_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('findings.finding_id'), nullable=False),
+        sa.Column(
+            'policy_rule_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('policy_rules.policy_rule_id'),
+            nullable=False
+        ),
+        sa.Column(
+            'gate_decision',
+            postgresql.ENUM('PASS', 'WARN', 'BLOCK', name='gatedecision', create_type=False),
+            nullable=False
+        ),
+        sa.Column('evaluated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('retired_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute("""
+        INSERT INTO policy_violations
+            (violation_id, finding_id, policy_rule_id, gate_decision, evaluated_at, retired_at)
+        SELECT violation_id, finding_id, policy_rule_id, gate_decision, evaluated_at, retired_at
+        FROM policy_violations_partitioned
+    """)
+    op.execute("DROP TABLE policy_violations_partitioned")
+    op.create_index(
+        'ix_policy_violations_active_finding_policy',
+        'policy_violations',
+        ['finding_id', 'policy_rule_id'],
+        postgresql_where=sa.text('retired_at IS NULL')
+    )
+    _create_compliance_control_status()
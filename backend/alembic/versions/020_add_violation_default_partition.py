@@ -0,0 +1,52 @@
+"""Add a default violation partition and mark carried-forward violations
+
+Revision ID: 020_violation_default_partition
+Revises: 019_partition_policy_violations
+Create Date: 2026-10-20 01:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '020_violation_default_partition'
+down_revision = '019_partition_policy_violations'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rollups and history skip carried rows; they were counted in the month they expired from
+    op.add_column(
+        'policy_violations',
+        sa.Column('carried_forward', sa.Boolean(), nullable=False, server_default='false')
+    )
+    # Inserts no longer depend on the maintenance task having created the month's partition
+    op.execute("CREATE TABLE policy_violations_default PARTITION OF policy_violations DEFAULT")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE policy_violations DETACH PARTITION policy_violations_default")
+    # Give the rows that landed in the default partition a monthly partition of their own
+    op.execute("""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT DISTINCT date_trunc('month', evaluated_at AT TIME ZONE 'UTC')::date
+                FROM policy_violations_default
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF policy_violations FOR VALUES FROM (%L) TO (%L)',
+                    'policy_violations_' || to_char(month, '"y"YYYY"m"MM'),
+                    month::timestamp AT TIME ZONE 'UTC',
+                    (month + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+                );
+            END LOOP;
+        END
+        $$
+    """)
+    op.execute("INSERT INTO policy_violations SELECT * FROM policy_violations_default")
+    op.execute("DROP TABLE policy_violations_default")
+    op.drop_column('policy_violations', 'carried_forward')
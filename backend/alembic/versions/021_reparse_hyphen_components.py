@@ -0,0 +1,70 @@
+"""Re-parse asset components with a hyphen-separated version
+
+Revision ID: 021_reparse_hyphen_components
+Revises: 020_violation_default_partition
+Create Date: 2026-10-20 02:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import re
+
+# revision identifiers, used by Alembic.
+revision = '021_reparse_hyphen_components'
+down_revision = '020_violation_default_partition'
+branch_labels = None
+depends_on = None
+
+# Same patterns as technology_service.ENTRY_PATTERN and HYPHENATED_ENTRY_PATTERN at the time of this revision
+ENTRY_PATTERN = re.compile(r"^(?P<name>.*?)[\s@:/]+v?(?P<major>\d+)(?:\.(?P<minor>\d+))?(?:\.(?P<patch>\d+))?\S*$")
+HYPHENATED_ENTRY_PATTERN = re.compile(
+    r"^(?P<name>.+?)-v?(?P<major>\d+)(?:\.(?P<minor>\d+))?(?:\.(?P<patch>\d+))?(?:\.\d+)*$"
+)
+
+
+def upgrade() -> None:
+    # Entries like "log4j-core-2.14.1" were stored whole as the name, without a version
+    bind = op.get_bind()
+    components = bind.execute(
+        sa.text("SELECT component_id, raw_entry FROM asset_components WHERE version_major IS NULL")
+    )
+    rows = []
+    for component_id, raw_entry in components:
+        entry = raw_entry.strip()
+        match = HYPHENATED_ENTRY_PATTERN.match(entry)
+        if not match or not match.group('name').strip():
+            continue
+        rows.append({
+            'component_id': component_id,
+            'name': match.group('name').strip().lower(),
+            'version': entry[match.start('major'):].strip(),
+            'version_major': int(match.group('major')),
+            'version_minor': int(match.group('minor') or 0),
+            'version_patch': int(match.group('patch') or 0),
+        })
+    if rows:
+        bind.execute(sa.text("""
+            UPDATE asset_components
+            SET name = :name, version = :version, version_major = :version_major,
+                version_minor = :version_minor, version_patch = :version_patch
+            WHERE component_id = :component_id
+        """), rows)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    components = bind.execute(
+        sa.text("SELECT component_id, raw_entry FROM asset_components WHERE version_major IS NOT NULL")
+    )
+    rows = [
+        {'component_id': component_id, 'name': raw_entry.strip().lower()}
+        for component_id, raw_entry in components
+        if not ENTRY_PATTERN.match(raw_entry.strip()) and HYPHENATED_ENTRY_PATTERN.match(raw_entry.strip())
+    ]
+    if rows:
+        bind.execute(sa.text("""
+            UPDATE asset_components
+            SET name = :name, version = NULL, version_major = NULL,
+                version_minor = NULL, version_patch = NULL
+            WHERE component_id = :component_id
+        """), rows)
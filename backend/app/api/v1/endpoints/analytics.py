@@ -0,0 +1,44 @@
+"""
+Analytics API Endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.schemas.analytics import RiskTrendPoint, RiskTrendResponse
+from app.services.analytics_service import get_risk_trend
+
+router = APIRouter()
+
+MAX_TREND_RANGE_DAYS = 3 * 366
+
+
+@router.get("/risk-trend", response_model=RiskTrendResponse)
+def get_risk_trend_endpoint(
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Daily risk posture snapshots between two dates (default: the last 90 days)"""
+    to_date = to_date or datetime.now(timezone.utc).date()
+    from_date = from_date or to_date - timedelta(days=90)
+    if (to_date - from_date).days > MAX_TREND_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range cannot exceed {MAX_TREND_RANGE_DAYS} days")
+
+    try:
+        snapshots = get_risk_trend(db, from_date, to_date, granularity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return RiskTrendResponse(
+        from_date=from_date,
+        to_date=to_date,
+        granularity=granularity,
+        points=[RiskTrendPoint.model_validate(snapshot) for snapshot in snapshots]
+    )
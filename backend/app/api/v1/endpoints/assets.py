@@ -4,7 +4,7 @@ Assets API Endpoints
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 import csv
 import json
@@ -12,12 +12,18 @@ import json
 from app.core.database import get_db
 from app.core.dependencies import get_current_user, require_permission
 from app.models.user import User
-from app.schemas.asset import AssetCreate, AssetUpdate, AssetResponse, BulkImportResponse
+from app.schemas.asset import (
+    AssetCreate, AssetUpdate, AssetResponse, BulkImportResponse, InheritedRiskRecalculationResponse,
+    AssetOverviewResponse, AttackPathsResponse, TechnologyMatchResponse
+)
 from app.schemas.common import PaginatedResponse
+from app.schemas.threat import ThreatResponse
+from app.schemas.finding import FindingResponse
 from app.services.asset_service import (
     create_asset,
     get_asset,
     get_assets,
+    get_asset_overview,
     update_asset,
     delete_asset,
     get_asset_relationships,
@@ -25,22 +31,46 @@ from app.services.asset_service import (
     delete_asset_relationship,
     bulk_import_assets
 )
+from app.services.risk_propagation_service import recalculate_inherited_risk
+from app.services.attack_path_service import find_attack_paths
+from app.services.technology_service import find_assets_by_technology
 from app.schemas.asset import AssetRelationshipCreate, AssetRelationshipResponse
 
 router = APIRouter()
 
 
+def _relationship_response(rel) -> AssetRelationshipResponse:
+    """Build a relationship response with summaries of both endpoints"""
+    return AssetRelationshipResponse(
+        relationship_id=rel.relationship_id,
+        source_asset_id=rel.source_asset_id,
+        target_asset_id=rel.target_asset_id,
+        relationship_type=rel.relationship_type.value,
+        source_asset={
+            "asset_id": str(rel.source_asset.asset_id),
+            "name": rel.source_asset.name,
+            "type": rel.source_asset.type.value
+        } if rel.source_asset else None,
+        target_asset={
+            "asset_id": str(rel.target_asset.asset_id),
+            "name": rel.target_asset.name,
+            "type": rel.target_asset.type.value
+        } if rel.target_asset else None,
+    )
+
+
 @router.get("", response_model=PaginatedResponse[AssetResponse])
 async def list_assets(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     search: str = Query(None),
+    sort_by: Optional[str] = Query(None, pattern="^(name|max_risk_score|inherited_risk_score)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List assets with pagination"""
     skip = (page - 1) * page_size
-    assets, total = get_assets(db, skip=skip, limit=page_size, search=search)
+    assets, total = get_assets(db, skip=skip, limit=page_size, search=search, sort_by=sort_by)
     
     total_pages = (total + page_size - 1) // page_size
     
@@ -53,6 +83,77 @@ async def list_assets(
     )
 
 
+@router.get("/attack-paths", response_model=AttackPathsResponse)
+async def get_attack_paths(
+    from_asset_id: UUID = Query(..., alias="from"),
+    to_asset_id: UUID = Query(..., alias="to"),
+    k: int = Query(3, ge=1, le=10),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the k highest-risk attack paths from an entry asset to a RESTRICTED asset"""
+    try:
+        result = find_attack_paths(db, from_asset_id, to_asset_id, k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return result
+
+
+@router.get("/by-technology", response_model=PaginatedResponse[TechnologyMatchResponse])
+async def list_assets_by_technology(
+    name: str = Query(..., min_length=1),
+    version_range: Optional[str] = Query(None, description="Semver range, e.g. '>=2.0.0 <2.15.0' or '^1.2'"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List assets whose technology stack contains a component, optionally within a version range"""
+    skip = (page - 1) * page_size
+    try:
+        matches, total = find_assets_by_technology(
+            db, name, version_range=version_range, skip=skip, limit=page_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total_pages = (total + page_size - 1) // page_size
+
+    return PaginatedResponse(
+        items=[
+            TechnologyMatchResponse(
+                asset_id=asset.asset_id,
+                asset_name=asset.name,
+                asset_type=asset.type,
+                classification_level=asset.classification_level,
+                owner_id=asset.owner_id,
+                component=component.name,
+                version=component.version,
+                raw_entry=component.raw_entry
+            )
+            for asset, component in matches
+        ],
+        total=total,
+        page=page,
+        page_size=page_size,
+        total_pages=total_pages
+    )
+
+
+@router.post("/inherited-risk/recalculate", response_model=InheritedRiskRecalculationResponse)
+async def recalculate_inherited_risk_endpoint(
+    decay: Optional[float] = Query(None, gt=0, lt=1),
+    max_depth: Optional[int] = Query(None, ge=1, le=20),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("assets:write"))
+):
+    """Propagate threat risk along DEPENDS_ON / PROCESSES_DATA_FROM edges for every asset"""
+    result = recalculate_inherited_risk(db, decay=decay, max_depth=max_depth)
+    return InheritedRiskRecalculationResponse(**result)
+
+
 @router.get("/{asset_id}", response_model=AssetResponse)
 async def get_asset_by_id(
     asset_id: UUID,
@@ -66,6 +167,62 @@ async def get_asset_by_id(
     return AssetResponse.model_validate(asset)
 
 
+@router.get("/{asset_id}/overview", response_model=AssetOverviewResponse)
+async def get_asset_overview_endpoint(
+    asset_id: UUID,
+    threat_page: int = Query(1, ge=1),
+    finding_page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get an asset with its relationships, threats, findings and severity counts in one call"""
+    overview = get_asset_overview(
+        db,
+        asset_id,
+        threat_skip=(threat_page - 1) * page_size,
+        finding_skip=(finding_page - 1) * page_size,
+        limit=page_size
+    )
+    if not overview:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    
+    asset = overview["asset"]
+    
+    threat_responses = []
+    for threat in overview["threats"]:
+        response = ThreatResponse.model_validate(threat)
+        response.asset_name = asset.name
+        threat_responses.append(response)
+    
+    finding_responses = []
+    for finding in overview["findings"]:
+        response = FindingResponse.model_validate(finding)
+        response.asset_name = asset.name
+        finding_responses.append(response)
+    
+    return AssetOverviewResponse(
+        asset=AssetResponse.model_validate(asset),
+        relationships=[_relationship_response(rel) for rel in overview["relationships"]],
+        threats=PaginatedResponse[ThreatResponse](
+            items=threat_responses,
+            total=overview["threat_total"],
+            page=threat_page,
+            page_size=page_size,
+            total_pages=(overview["threat_total"] + page_size - 1) // page_size
+        ),
+        findings=PaginatedResponse[FindingResponse](
+            items=finding_responses,
+            total=overview["finding_total"],
+            page=finding_page,
+            page_size=page_size,
+            total_pages=(overview["finding_total"] + page_size - 1) // page_size
+        ),
+        open_findings_by_severity=overview["open_findings_by_severity"],
+        threat_status_counts=overview["threat_status_counts"],
+    )
+
+
 @router.post("", response_model=AssetResponse, status_code=201)
 async def create_new_asset(
     asset_data: AssetCreate,
@@ -123,28 +280,7 @@ async def get_asset_relationships_endpoint(
         (AssetRelationship.target_asset_id == asset_id)
     ).all()
     
-    # Build response with asset details
-    result = []
-    for rel in relationships:
-        rel_dict = {
-            "relationship_id": rel.relationship_id,
-            "source_asset_id": str(rel.source_asset_id),
-            "target_asset_id": str(rel.target_asset_id),
-            "relationship_type": rel.relationship_type.value,
-            "source_asset": {
-                "asset_id": str(rel.source_asset.asset_id),
-                "name": rel.source_asset.name,
-                "type": rel.source_asset.type.value
-            } if rel.source_asset else None,
-            "target_asset": {
-                "asset_id": str(rel.target_asset.asset_id),
-                "name": rel.target_asset.name,
-                "type": rel.target_asset.type.value
-            } if rel.target_asset else None,
-        }
-        result.append(AssetRelationshipResponse(**rel_dict))
-    
-    return result
+    return [_relationship_response(rel) for rel in relationships]
 
 
 @router.post("/{asset_id}/relationships", response_model=AssetRelationshipResponse, status_code=201)
@@ -162,7 +298,7 @@ async def create_asset_relationship_endpoint(
             relationship_data.target_asset_id,
             relationship_data.relationship_type
         )
-        return AssetRelationshipResponse.model_validate(relationship)
+        return _relationship_response(relationship)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
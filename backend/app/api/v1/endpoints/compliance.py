@@ -0,0 +1,219 @@
+"""
+Compliance API Endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_user, require_permission
+from app.models.policy import ComplianceFramework
+from app.models.user import User
+from app.schemas.common import PaginatedResponse
+from app.schemas.compliance import (
+    ComplianceMatrixResponse,
+    ControlImportResponse,
+    ControlMappingImportResponse,
+    ControlCrosswalkCreate,
+    ControlCrosswalkResponse,
+    ControlCrosswalkDetail,
+    ControlCrosswalkImportResponse,
+    DerivedComplianceMatrixResponse
+)
+from app.schemas.policy import ControlResponse
+from app.services.compliance_service import get_compliance_matrix, get_controls
+from app.services.control_catalog_service import (
+    load_bundled_catalog,
+    load_control_catalog,
+    load_control_crosswalks,
+    load_control_mappings,
+    parse_control_catalog,
+    parse_control_crosswalks,
+    parse_control_mappings
+)
+from app.services.crosswalk_service import (
+    create_crosswalk,
+    delete_crosswalk,
+    derive_compliance_matrix,
+    get_linked_controls
+)
+
+router = APIRouter()
+
+
+async def _read_upload(file: UploadFile):
+    """Decoded content and format (csv or json) of an uploaded file"""
+    file_format = (file.filename or "").rsplit(".", 1)[-1].lower()
+    if file_format not in ("csv", "json"):
+        raise HTTPException(status_code=400, detail="Unsupported file type. Use CSV or JSON")
+    try:
+        content = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    return content, file_format
+
+
+@router.get("/matrix", response_model=ComplianceMatrixResponse)
+async def get_compliance_matrix_endpoint(
+    framework: ComplianceFramework = Query(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Every control of a framework with its mapped rules, current violations and status"""
+    return get_compliance_matrix(db, framework)
+
+
+@router.get("/matrix/derived", response_model=DerivedComplianceMatrixResponse)
+async def get_derived_compliance_matrix_endpoint(
+    framework: ComplianceFramework = Query(...),
+    source_framework: Optional[List[ComplianceFramework]] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    A framework's coverage carried over through crosswalks from the
+    violations already computed for other frameworks (default: all others)
+    """
+    return derive_compliance_matrix(db, framework, source_framework)
+
+
+@router.get("/controls", response_model=PaginatedResponse[ControlResponse])
+async def list_controls(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    framework: Optional[ComplianceFramework] = Query(None),
+    search: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List controls with pagination and filters"""
+    skip = (page - 1) * page_size
+    controls, total = get_controls(db, framework=framework, search=search, skip=skip, limit=page_size)
+    
+    return PaginatedResponse(
+        items=[ControlResponse.model_validate(control) for control in controls],
+        total=total,
+        page=page,
+        page_size=page_size,
+        total_pages=(total + page_size - 1) // page_size
+    )
+
+
+@router.post("/controls/import", response_model=ControlImportResponse)
+async def import_controls(
+    framework: ComplianceFramework = Query(...),
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("compliance:write"))
+):
+    """
+    Load a framework catalog from a CSV (control_code,description header) or
+    a JSON array of {control_code, description}; existing controls are updated
+    """
+    content, file_format = await _read_upload(file)
+    try:
+        rows = parse_control_catalog(content, file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not rows:
+        raise HTTPException(status_code=400, detail="File is empty")
+    return load_control_catalog(db, framework, rows)
+
+
+@router.post("/controls/import-bundled", response_model=ControlImportResponse)
+async def import_bundled_controls(
+    framework: ComplianceFramework = Query(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("compliance:write"))
+):
+    """
+    Load the catalog bundled with Sentinel for a framework; `subset` is true
+    when the bundled file is not the full catalog
+    """
+    try:
+        return load_bundled_catalog(db, framework)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/mappings/import", response_model=ControlMappingImportResponse)
+async def import_control_mappings(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("compliance:write"))
+):
+    """
+    Map policy rules to controls from a CSV (policy_name,framework,control_code
+    header) or JSON array; rows naming unknown policies or controls are reported
+    """
+    content, file_format = await _read_upload(file)
+    try:
+        rows = parse_control_mappings(content, file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not rows:
+        raise HTTPException(status_code=400, detail="File is empty")
+    return load_control_mappings(db, rows)
+
+
+@router.get("/crosswalks/{control_id}", response_model=ControlCrosswalkDetail)
+async def get_control_crosswalk(
+    control_id: UUID,
+    framework: Optional[ComplianceFramework] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The controls linked to a control, optionally of one framework, with the control's mapped rules"""
+    result = get_linked_controls(db, control_id, framework)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Control not found")
+    return result
+
+
+@router.post("/crosswalks", response_model=ControlCrosswalkResponse, status_code=201)
+async def create_control_crosswalk(
+    crosswalk_data: ControlCrosswalkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("compliance:write"))
+):
+    """Link two controls of different frameworks"""
+    try:
+        crosswalk = create_crosswalk(db, crosswalk_data.source_control_id, crosswalk_data.target_control_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if crosswalk is None:
+        raise HTTPException(status_code=404, detail="Control not found")
+    return crosswalk
+
+
+@router.delete("/crosswalks/{crosswalk_id}", status_code=204)
+async def delete_control_crosswalk(
+    crosswalk_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("compliance:write"))
+):
+    """Remove a crosswalk link"""
+    if not delete_crosswalk(db, crosswalk_id):
+        raise HTTPException(status_code=404, detail="Crosswalk not found")
+    return None
+
+
+@router.post("/crosswalks/import", response_model=ControlCrosswalkImportResponse)
+async def import_control_crosswalks(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("compliance:write"))
+):
+    """
+    Link controls from a CSV (source_framework,source_control_code,
+    target_framework,target_control_code header) or JSON array
+    """
+    content, file_format = await _read_upload(file)
+    try:
+        rows = parse_control_crosswalks(content, file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not rows:
+        raise HTTPException(status_code=400, detail="File is empty")
+    return load_control_crosswalks(db, rows)
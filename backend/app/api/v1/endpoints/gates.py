@@ -0,0 +1,30 @@
+"""
+CI/CD Gate API Endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.opa import OPAError
+from app.models.user import User
+from app.schemas.gate import GateEvaluateRequest, GateEvaluateResponse
+from app.services.gate_service import evaluate_gate
+
+router = APIRouter()
+
+
+@router.post("/evaluate", response_model=GateEvaluateResponse)
+async def evaluate_gate_endpoint(
+    request: GateEvaluateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Decide whether a pipeline run may proceed: PASS, WARN or BLOCK, with the violating rules"""
+    try:
+        result = await evaluate_gate(db, pipeline_run_id=request.pipeline_run_id, findings=request.findings)
+    except OPAError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Pipeline run not found")
+    return result
@@ -0,0 +1,90 @@
+"""
+MITRE ATT&CK API Endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.mitre_attack import MitreCatalog, MitreTechnique, get_mitre_catalog
+from app.models.threat import ThreatStatus
+from app.models.user import User
+from app.schemas.mitre import MitreTacticResponse, MitreTechniqueResponse, ThreatsByTacticResponse
+from app.services.mitre_service import get_threats_by_tactic
+
+router = APIRouter()
+
+
+def _technique_response(catalog: MitreCatalog, technique: MitreTechnique) -> MitreTechniqueResponse:
+    return MitreTechniqueResponse(
+        technique_id=technique.technique_id,
+        name=technique.name,
+        tactics=catalog.tactic_names(technique),
+        parent_id=technique.parent_id,
+        is_subtechnique=technique.is_subtechnique,
+        subtechniques=list(technique.subtechniques),
+        url=technique.url
+    )
+
+
+@router.get("/techniques", response_model=List[MitreTechniqueResponse])
+async def search_techniques(
+    q: Optional[str] = Query(None, description="Prefix of a technique id, name or name word"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user)
+):
+    """Autocomplete ATT&CK techniques; without a query, list techniques by id"""
+    catalog = get_mitre_catalog()
+    if q:
+        techniques = catalog.search(q, limit=limit)
+    else:
+        techniques = [catalog.techniques[technique_id] for technique_id in sorted(catalog.techniques)[:limit]]
+    return [_technique_response(catalog, technique) for technique in techniques]
+
+
+@router.get("/techniques/{technique_id}", response_model=MitreTechniqueResponse)
+async def get_technique(
+    technique_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get an ATT&CK technique with its tactics and sub-techniques"""
+    catalog = get_mitre_catalog()
+    technique = catalog.get(technique_id)
+    if not technique:
+        raise HTTPException(status_code=404, detail="Technique not found")
+    return _technique_response(catalog, technique)
+
+
+@router.get("/tactics", response_model=List[MitreTacticResponse])
+async def list_tactics(
+    current_user: User = Depends(get_current_user)
+):
+    """List ATT&CK tactics with the ids of their techniques"""
+    catalog = get_mitre_catalog()
+    techniques_by_tactic = {shortname: [] for shortname in catalog.tactics}
+    for technique_id in sorted(catalog.techniques):
+        for shortname in catalog.techniques[technique_id].tactics:
+            if shortname in techniques_by_tactic:
+                techniques_by_tactic[shortname].append(technique_id)
+    return [
+        MitreTacticResponse(
+            tactic_id=tactic.tactic_id,
+            name=tactic.name,
+            shortname=shortname,
+            techniques=techniques_by_tactic[shortname]
+        )
+        for shortname, tactic in catalog.tactics.items()
+    ]
+
+
+@router.get("/tactics/threats", response_model=ThreatsByTacticResponse)
+async def get_threats_by_tactic_endpoint(
+    asset_id: Optional[UUID] = Query(None),
+    status: Optional[ThreatStatus] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Threat counts and max risk per ATT&CK tactic and technique"""
+    return get_threats_by_tactic(db, asset_id=asset_id, status=status)
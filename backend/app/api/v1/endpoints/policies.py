@@ -15,7 +15,9 @@ from app.schemas.policy import (
     PolicyRuleResponse,
     PolicyViolationResponse,
     PolicyTestRequest,
-    PolicyTestResponse
+    PolicyTestResponse,
+    PolicyStatisticsResponse,
+    PolicyViolationHistoryResponse
 )
 from app.schemas.common import PaginatedResponse
 from app.services.policy_service import (
@@ -26,9 +28,14 @@ from app.services.policy_service import (
     delete_policy_rule,
     test_policy_rule,
     get_policy_violations,
-    get_policy_statistics
+    get_policy_statistics,
+    get_policies_statistics,
+    get_policy_evaluation_trend
 )
+from app.services.violation_retention_service import get_violation_history
+from app.core.config import settings
 from app.models.policy import GateDecision
+from app.core.opa import OPAError, OPAPolicyError
 
 router = APIRouter()
 
@@ -53,9 +60,10 @@ async def list_policies(
     )
     
     # Enrich with statistics
+    statistics = get_policies_statistics(db, [policy.policy_rule_id for policy in policies])
     policy_responses = []
     for policy in policies:
-        stats = get_policy_statistics(db, policy.policy_rule_id)
+        stats = statistics[policy.policy_rule_id]
         response = PolicyRuleResponse.model_validate(policy)
         response.violations_count = stats.get("violations_count", 0)
         response.controls_mapped_count = stats.get("controls_mapped_count", 0)
@@ -117,7 +125,7 @@ async def create_new_policy(
         response = PolicyRuleResponse.model_validate(policy)
         response.violations_count = 0
         response.controls_mapped_count = 0
-        response.pass_rate = 100.0
+        response.pass_rate = None  # not evaluated yet
         
         return response
     except ValueError as e:
@@ -174,15 +182,57 @@ async def test_policy(
 ):
     """Test a policy rule against test data"""
     try:
-        result = test_policy_rule(db, policy_id, test_request.test_data)
+        result = await test_policy_rule(db, policy_id, test_request.test_data)
         
         return PolicyTestResponse(
             passed=result.get("passed", False),
             gate_decision=result.get("gate_decision", GateDecision.BLOCK),
-            message=result.get("message")
+            message=result.get("message"),
+            violations=result.get("violations")
         )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except OPAPolicyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OPAError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/{policy_id}/statistics", response_model=PolicyStatisticsResponse)
+async def get_policy_statistics_endpoint(
+    policy_id: UUID,
+    days: int = Query(settings.POLICY_STATISTICS_WINDOW_DAYS, ge=1, le=366),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Pass rate, decision counts and daily trend from the policy's evaluation counters"""
+    stats = get_policy_statistics(db, policy_id, days)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Policy rule not found")
+    
+    return PolicyStatisticsResponse(
+        policy_rule_id=policy_id,
+        window_days=days,
+        trend=get_policy_evaluation_trend(db, policy_id, days),
+        **stats
+    )
+
+
+@router.get("/{policy_id}/violations/history", response_model=PolicyViolationHistoryResponse)
+async def get_policy_violation_history_endpoint(
+    policy_id: UUID,
+    months: int = Query(12, ge=1, le=60),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Monthly violation counts, from the monthly summaries for rolled-up months"""
+    if not get_policy_rule(db, policy_id):
+        raise HTTPException(status_code=404, detail="Policy rule not found")
+
+    return PolicyViolationHistoryResponse(
+        policy_rule_id=policy_id,
+        months=get_violation_history(db, policy_id, months)
+    )
 
 
 @router.get("/{policy_id}/violations", response_model=PaginatedResponse[PolicyViolationResponse])
@@ -190,6 +240,7 @@ async def get_policy_violations_endpoint(
     policy_id: UUID,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    include_retired: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -203,7 +254,8 @@ async def get_policy_violations_endpoint(
         db,
         policy_id=policy_id,
         skip=skip,
-        limit=page_size
+        limit=page_size,
+        include_retired=include_retired
     )
     
     # Enrich with policy and finding names
@@ -212,7 +264,7 @@ async def get_policy_violations_endpoint(
         response = PolicyViolationResponse.model_validate(violation)
         response.policy_name = policy.name
         if violation.finding:
-            response.finding_title = violation.finding.title
+            response.finding_title = violation.finding.vulnerability_type
         violation_responses.append(response)
     
     total_pages = (total + page_size - 1) // page_size
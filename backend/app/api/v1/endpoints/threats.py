@@ -1,33 +1,58 @@
 """
 Threats API Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.orm import Session, defer, joinedload
 from sqlalchemy.sql import func
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
+import json
+from redis.exceptions import LockError
 
-from app.core.database import get_db
-from app.core.dependencies import get_current_user, require_permission
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
+from app.core.dependencies import get_current_user, get_user_from_token, require_permission
 from app.models.user import User
 from app.schemas.threat import (
     ThreatCreate, ThreatUpdate, ThreatResponse, ThreatTransition,
-    ThreatModelDiagramCreate, ThreatModelDiagramUpdate, ThreatModelDiagramResponse
+    ThreatModelDiagramCreate, ThreatModelDiagramUpdate, ThreatModelDiagramResponse,
+    ThreatStateHistoryResponse, ThreatModelDiagramPatch, ThreatModelDiagramPatchResponse,
+    ThreatModelDiagramSummary, JsonPatchOperation, ThreatBulkCreate, ThreatBulkCreateResponse,
+    ThreatBulkTransition, ThreatBulkTransitionResponse
 )
 from app.schemas.common import PaginatedResponse
+from app.schemas.risk_simulation import RiskSimulationRequest, RiskSimulationResponse
 from app.services.threat_service import (
     create_threat,
+    create_threats_bulk,
     get_threat,
     get_threats,
     update_threat,
     transition_threat_status,
+    transition_threats_bulk,
     delete_threat,
-    get_threat_state_history
+    get_threat_state_history,
+    get_threat_timeline,
+    get_latest_transitions,
+    get_risk_heatmap
 )
+from app.services.diagram_service import (
+    patch_diagram,
+    update_canvas_counts,
+    queue_thumbnail_render,
+    DiagramRevisionConflict
+)
+from app.services.diagram_collab_service import collab_hub
+from app.services.risk_simulation_service import simulate_risk
+from app.core.json_patch import JsonPatchTestFailed
 from app.models.threat import ThreatStatus, ThreatModelDiagram
+from app.models.asset import ClassificationLevel
 
 router = APIRouter()
 
+_patch_operations = TypeAdapter(List[JsonPatchOperation])
+
 
 @router.get("", response_model=PaginatedResponse[ThreatResponse])
 async def list_threats(
@@ -68,7 +93,7 @@ async def list_threats(
     )
 
 
-@router.get("/{threat_id}", response_model=ThreatResponse)
+@router.get("/{threat_id:uuid}", response_model=ThreatResponse)
 async def get_threat_by_id(
     threat_id: UUID,
     db: Session = Depends(get_db),
@@ -106,6 +131,43 @@ async def create_new_threat(
         )
 
 
+@router.post("/bulk", response_model=ThreatBulkCreateResponse, status_code=201)
+async def create_threats_bulk_endpoint(
+    bulk_data: ThreatBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("threats:write"))
+):
+    """Create many threats (e.g. a threat catalog import) in one transaction"""
+    try:
+        threat_ids = create_threats_bulk(db, bulk_data.threats, current_user.user_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return ThreatBulkCreateResponse(created=len(threat_ids), threat_ids=threat_ids)
+
+
+@router.post("/transition-bulk", response_model=ThreatBulkTransitionResponse)
+async def transition_threats_bulk_endpoint(
+    bulk_transition: ThreatBulkTransition,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("threats:write"))
+):
+    """Transition many threats to the same status"""
+    transitioned, errors = transition_threats_bulk(
+        db,
+        bulk_transition.threat_ids,
+        bulk_transition,
+        current_user.user_id
+    )
+    return ThreatBulkTransitionResponse(
+        total=len(set(bulk_transition.threat_ids)),
+        transitioned=transitioned,
+        errors=errors
+    )
+
+
 @router.patch("/{threat_id}", response_model=ThreatResponse)
 async def update_existing_threat(
     threat_id: UUID,
@@ -191,69 +253,80 @@ async def get_threat_history(
     
     history = get_threat_state_history(db, threat_id)
     
-    # Convert to response format with user names
-    history_items = []
-    for item in history:
-        history_items.append({
-            "history_id": str(item.history_id),
-            "threat_id": str(item.threat_id),
-            "from_state": item.from_state.value,
-            "to_state": item.to_state.value,
-            "changed_by": str(item.changed_by),
-            "changed_by_name": item.user.full_name if item.user else "Unknown",
-            "changed_at": item.changed_at.isoformat(),
-        })
+    return [ThreatStateHistoryResponse.model_validate(item) for item in history]
+
+
+@router.get("/{threat_id}/timeline", response_model=PaginatedResponse[ThreatStateHistoryResponse])
+async def get_threat_timeline_endpoint(
+    threat_id: UUID,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a page of a threat's state history, newest first"""
+    threat = get_threat(db, threat_id)
+    if not threat:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Threat with ID {threat_id} not found"
+        )
+    
+    skip = (page - 1) * page_size
+    history, total = get_threat_timeline(db, threat_id, skip=skip, limit=page_size)
     
-    return history_items
+    total_pages = (total + page_size - 1) // page_size
+    
+    return PaginatedResponse(
+        items=[ThreatStateHistoryResponse.model_validate(item) for item in history],
+        total=total,
+        page=page,
+        page_size=page_size,
+        total_pages=total_pages
+    )
+
+
+@router.get("/history/latest", response_model=List[ThreatStateHistoryResponse])
+async def get_latest_threat_transitions(
+    threat_ids: List[UUID] = Query(..., alias="threat_id", max_length=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the latest state transition for each of the given threats"""
+    latest = get_latest_transitions(db, threat_ids)
+    return [ThreatStateHistoryResponse.model_validate(item) for item in latest.values()]
 
 
 @router.get("/analytics/risk-heatmap")
-async def get_risk_heatmap(
+def get_risk_heatmap_endpoint(
+    asset_id: Optional[UUID] = Query(None),
+    status: Optional[ThreatStatus] = Query(None),
+    classification_level: Optional[ClassificationLevel] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get risk heatmap data aggregated by likelihood and impact"""
-    from sqlalchemy import func
-    from app.models.threat import Threat
-    
-    # Aggregate threats by likelihood and impact
-    results = db.query(
-        Threat.likelihood_score,
-        Threat.impact_score,
-        func.count(Threat.threat_id).label('count')
-    ).group_by(
-        Threat.likelihood_score,
-        Threat.impact_score
-    ).all()
-    
-    # Calculate risk level for each cell
-    heatmap_data = []
-    for likelihood, impact, count in results:
-        risk_score = (likelihood + impact) / 2 * 20  # Scale to 0-100
-        
-        if risk_score >= 80:
-            risk_level = "critical"
-        elif risk_score >= 60:
-            risk_level = "high"
-        elif risk_score >= 40:
-            risk_level = "medium"
-        else:
-            risk_level = "low"
-        
-        heatmap_data.append({
-            "likelihood": likelihood,
-            "impact": impact,
-            "count": count,
-            "risk": risk_level,
-        })
-    
-    return heatmap_data
+    # Sync handler: runs in the threadpool so concurrent misses can share one computation
+    return get_risk_heatmap(
+        db, asset_id=asset_id, status=status, classification_level=classification_level
+    )
+
+
+@router.post("/analytics/what-if", response_model=RiskSimulationResponse)
+def simulate_risk_endpoint(
+    simulation: RiskSimulationRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Simulate portfolio risk after hypothetical changes, without modifying any threat or asset"""
+    return simulate_risk(db, simulation.modifications)
 
 
 # Threat Model Diagram Endpoints
 @router.post("/diagrams", response_model=ThreatModelDiagramResponse, status_code=status.HTTP_201_CREATED)
 async def create_threat_model_diagram(
     diagram_data: ThreatModelDiagramCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -265,9 +338,11 @@ async def create_threat_model_diagram(
         canvas_data=diagram_data.canvas_data,
         created_by=current_user.user_id
     )
+    update_canvas_counts(diagram)
     db.add(diagram)
     db.commit()
     db.refresh(diagram)
+    background_tasks.add_task(queue_thumbnail_render, diagram.diagram_id)
     
     # Get creator name
     response = ThreatModelDiagramResponse.model_validate(diagram)
@@ -275,7 +350,7 @@ async def create_threat_model_diagram(
     return response
 
 
-@router.get("/diagrams", response_model=PaginatedResponse[ThreatModelDiagramResponse])
+@router.get("/diagrams", response_model=PaginatedResponse[ThreatModelDiagramSummary])
 async def list_threat_model_diagrams(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
@@ -283,7 +358,7 @@ async def list_threat_model_diagrams(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List threat model diagrams"""
+    """List threat model diagrams (without canvas data; fetch a diagram to load it)"""
     query = db.query(ThreatModelDiagram)
     
     if threat_id:
@@ -291,13 +366,16 @@ async def list_threat_model_diagrams(
     
     total = query.count()
     skip = (page - 1) * page_size
-    diagrams = query.order_by(ThreatModelDiagram.updated_at.desc()).offset(skip).limit(page_size).all()
+    diagrams = query.options(
+        defer(ThreatModelDiagram.canvas_data),
+        joinedload(ThreatModelDiagram.creator)
+    ).order_by(ThreatModelDiagram.updated_at.desc()).offset(skip).limit(page_size).all()
     
     # Enrich with creator names
     diagram_responses = []
     for diagram in diagrams:
         # Use model_validate with from_attributes=True to properly convert SQLAlchemy model
-        response = ThreatModelDiagramResponse.model_validate(diagram)
+        response = ThreatModelDiagramSummary.model_validate(diagram)
         if diagram.creator:
             response.creator_name = diagram.creator.email
         diagram_responses.append(response)
@@ -338,6 +416,7 @@ async def get_threat_model_diagram(
 async def update_threat_model_diagram(
     diagram_id: UUID,
     diagram_data: ThreatModelDiagramUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -363,11 +442,15 @@ async def update_threat_model_diagram(
         diagram.description = diagram_data.description
     if diagram_data.canvas_data is not None:
         diagram.canvas_data = diagram_data.canvas_data
+        diagram.revision += 1
+        update_canvas_counts(diagram)
     
     from sqlalchemy.sql import func
     diagram.updated_at = func.now()
     db.commit()
     db.refresh(diagram)
+    if diagram_data.canvas_data is not None:
+        background_tasks.add_task(queue_thumbnail_render, diagram.diagram_id)
     
     response = ThreatModelDiagramResponse.model_validate(diagram)
     if diagram.creator:
@@ -375,6 +458,183 @@ async def update_threat_model_diagram(
     return response
 
 
+@router.patch("/diagrams/{diagram_id}", response_model=ThreatModelDiagramPatchResponse)
+async def patch_threat_model_diagram(
+    diagram_id: UUID,
+    patch_data: ThreatModelDiagramPatch,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Apply RFC 6902 JSON Patch operations to a diagram canvas at a known revision"""
+    created_by = db.query(ThreatModelDiagram.created_by).filter(
+        ThreatModelDiagram.diagram_id == diagram_id
+    ).scalar()
+    
+    if not created_by:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Threat model diagram not found"
+        )
+    
+    # Check if user has permission (creator or admin)
+    if created_by != current_user.user_id and (not current_user.role or current_user.role.role_name != "Admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to update this diagram"
+        )
+    
+    try:
+        result = patch_diagram(
+            db,
+            diagram_id,
+            revision=patch_data.revision,
+            operations=[
+                operation.model_dump(by_alias=True, exclude_unset=True)
+                for operation in patch_data.operations
+            ],
+            canvas_data=patch_data.canvas_data,
+            name=patch_data.name,
+            description=patch_data.description
+        )
+    except DiagramRevisionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(e), "revision": e.current_revision}
+        )
+    except JsonPatchTestFailed as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Threat model diagram not found"
+        )
+    if patch_data.canvas_data is not None or patch_data.operations:
+        background_tasks.add_task(queue_thumbnail_render, diagram_id)
+    return result
+
+
+@router.post("/diagrams/{diagram_id}/generate-threats", status_code=status.HTTP_202_ACCEPTED)
+async def generate_diagram_threats_endpoint(
+    diagram_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("threats:write"))
+):
+    """Queue STRIDE threat generation for the elements added or changed since the last run"""
+    exists = db.query(ThreatModelDiagram.diagram_id).filter(
+        ThreatModelDiagram.diagram_id == diagram_id
+    ).first()
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Threat model diagram not found"
+        )
+
+    from app.tasks.diagram_tasks import generate_diagram_threats_task
+    try:
+        task = generate_diagram_threats_task.apply_async(
+            args=[str(diagram_id), str(current_user.user_id)],
+            retry=False
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Threat generation queue is unavailable"
+        )
+    return {"diagram_id": diagram_id, "task_id": task.id, "status": "queued"}
+
+
+@router.websocket("/diagrams/{diagram_id}/ws")
+async def diagram_collaboration_socket(
+    websocket: WebSocket,
+    diagram_id: UUID,
+    token: str = Query(...)
+):
+    """
+    Collaborative editing session for a diagram.
+    
+    The server sends a `snapshot` (canvas, revision and pending operations)
+    on connect, then `batch` messages carrying other editors' `ops` events
+    and `saved` events as the canvas is persisted. Clients send
+    {"type": "ops", "operations": [<RFC 6902 operations>]}.
+    """
+    # Browsers cannot set headers on WebSocket requests, so the JWT comes in the query string
+    db = SessionLocal()
+    try:
+        user = get_user_from_token(db, token)
+        permissions = user.role.permissions if user and user.role else []
+        is_admin = bool(user and user.role and user.role.role_name == "Admin")
+        created_by = db.query(ThreatModelDiagram.created_by).filter(
+            ThreatModelDiagram.diagram_id == diagram_id
+        ).scalar()
+    finally:
+        db.close()
+    
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid authentication credentials")
+        return
+    if "threats:write" not in permissions:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Permission required: threats:write")
+        return
+    if not created_by:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Threat model diagram not found")
+        return
+    # Same rule as PUT and PATCH: creator or admin
+    if created_by != user.user_id and not is_admin:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Not authorized to update this diagram")
+        return
+    
+    await websocket.accept()
+    room, client_id = await collab_hub.join(diagram_id, websocket)
+    try:
+        try:
+            snapshot = await room.snapshot(client_id)
+        except LockError:
+            # A flush held the lock past blocking_timeout; the client reconnects
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Diagram is busy, try again")
+            return
+        if snapshot is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Threat model diagram not found")
+            return
+        await websocket.send_json(snapshot)
+        
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                message = None
+            if not isinstance(message, dict) or message.get("type") != "ops":
+                await websocket.send_json({"type": "error", "detail": "Expected an 'ops' message"})
+                continue
+            try:
+                operations = _patch_operations.validate_python(message.get("operations"))
+            except ValidationError as e:
+                await websocket.send_json({"type": "error", "detail": e.errors(include_url=False)})
+                continue
+            if not operations:
+                continue
+            if len(operations) > settings.DIAGRAM_COLLAB_MAX_OPERATIONS:
+                await websocket.send_json({
+                    "type": "error",
+                    "detail": f"At most {settings.DIAGRAM_COLLAB_MAX_OPERATIONS} operations per message"
+                })
+                continue
+            
+            event = await room.submit(
+                client_id,
+                user.user_id,
+                [operation.model_dump(by_alias=True, exclude_unset=True) for operation in operations]
+            )
+            await websocket.send_json({"type": "ack", "id": event["id"]})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await collab_hub.leave(room, client_id)
+
+
 @router.delete("/diagrams/{diagram_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_threat_model_diagram(
     diagram_id: UUID,
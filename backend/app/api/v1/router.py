@@ -2,7 +2,7 @@
 API v1 Router
 """
 from fastapi import APIRouter
-from app.api.v1.endpoints import assets, auth, threats, findings, risk_acceptances, policies
+from app.api.v1.endpoints import assets, auth, threats, findings, risk_acceptances, policies, analytics, mitre, gates, compliance
 
 api_router = APIRouter()
 
@@ -12,6 +12,10 @@ api_router.include_router(threats.router, prefix="/threats", tags=["Threats"])
 api_router.include_router(findings.router, prefix="/findings", tags=["Findings"])
 api_router.include_router(risk_acceptances.router, prefix="/risk-acceptances", tags=["Risk Acceptances"])
 api_router.include_router(policies.router, prefix="/policies", tags=["Policies"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+api_router.include_router(mitre.router, prefix="/mitre", tags=["MITRE ATT&CK"])
+api_router.include_router(gates.router, prefix="/gates", tags=["Gates"])
+api_router.include_router(compliance.router, prefix="/compliance", tags=["Compliance"])
 
 
 
@@ -2,13 +2,14 @@
 Celery Application Configuration
 """
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import settings
 
 celery_app = Celery(
     "sentinel_irm",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.REDIS_URL,
-    include=["app.tasks"]
+    include=["app.tasks.scan_tasks", "app.tasks.risk_tasks", "app.tasks.diagram_tasks", "app.tasks.policy_tasks"]
 )
 
 celery_app.conf.update(
@@ -23,6 +24,26 @@ celery_app.conf.update(
         "app.tasks.sync_nvd_cves": {"queue": "intelligence_sync_queue"},
         "app.tasks.send_notification": {"queue": "notification_queue"},
     },
+    beat_schedule={
+        "recalculate-inherited-risk": {
+            "task": "app.tasks.risk_tasks.recalculate_inherited_risk_task",
+            "schedule": 900.0,
+        },
+        "reevaluate-changed-policies": {
+            "task": "app.tasks.policy_tasks.reevaluate_changed_policies_task",
+            "schedule": 60.0,
+        },
+        # Late in the UTC day so the snapshot reflects the day's activity
+        "capture-risk-snapshot": {
+            "task": "app.tasks.risk_tasks.capture_risk_snapshot_task",
+            "schedule": crontab(hour=23, minute=55),
+        },
+        # Shortly after midnight UTC so a new month's partition exists before it is written to
+        "maintain-violation-partitions": {
+            "task": "app.tasks.policy_tasks.maintain_violation_partitions_task",
+            "schedule": crontab(hour=0, minute=15),
+        },
+    },
 )
 
 
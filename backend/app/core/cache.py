@@ -0,0 +1,139 @@
+"""
+In-process caching helpers
+
+Cached values are keyed on a version counter stored in the cache_versions
+table. Writers mark the caches they invalidate; the counters are bumped
+right after the write commits, in a short transaction of their own, so
+every API worker stops serving stale entries while the write transaction
+itself never locks a cache_versions row.
+"""
+from collections import OrderedDict
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+from sqlalchemy import event, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+import logging
+import time
+from app.models.cache import CacheVersion
+
+logger = logging.getLogger(__name__)
+
+_PENDING_BUMPS = "pending_cache_bumps"
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional per-entry TTL"""
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+        self._in_flight: Dict[Hashable, "_Flight"] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value or compute it. Concurrent callers missing the
+        same key wait for a single computation instead of repeating it.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            self.set(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _Flight:
+    """A computation in progress, shared by concurrent cache misses"""
+
+    def __init__(self):
+        self.done = Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def get_cache_version(db: Session, name: str) -> int:
+    """Read the current version of a named cache"""
+    version = db.query(CacheVersion.version).filter(CacheVersion.name == name).scalar()
+    return version or 0
+
+
+def bump_cache_version(db: Session, name: str) -> None:
+    """
+    Increment a named cache version once the caller's transaction commits;
+    nothing is bumped if it rolls back
+    """
+    db.info.setdefault(_PENDING_BUMPS, set()).add(name)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_bumps(db: Session) -> None:
+    names = db.info.pop(_PENDING_BUMPS, None)
+    if not names:
+        return
+    # One statement in a fixed name order: bumps hold their row locks only
+    # for this statement and always take them in the same order
+    stmt = pg_insert(CacheVersion).values([{"name": name, "version": 1} for name in sorted(names)])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CacheVersion.name],
+        set_={"version": CacheVersion.version + 1, "updated_at": func.now()}
+    )
+    try:
+        with db.get_bind().begin() as connection:
+            connection.execute(stmt)
+    except Exception as e:
+        # The write is already committed; TTL-bound caches expire on their own
+        logger.error(f"Bumping cache versions {sorted(names)} failed: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_bumps(db: Session) -> None:
+    db.info.pop(_PENDING_BUMPS, None)
@@ -2,7 +2,7 @@
 Application Configuration
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -21,6 +21,43 @@ class Settings(BaseSettings):
     
     # OPA
     OPA_URL: str = "http://localhost:8181"
+    OPA_TIMEOUT_SECONDS: float = 5.0
+    OPA_MAX_CONNECTIONS: int = 20
+    OPA_HTTP2: bool = True  # negotiated via ALPN on https; plain http stays on keep-alive HTTP/1.1
+    OPA_BATCH_SIZE: int = 500  # inputs per Data API query
+    
+    # Bulk policy evaluation: OPEN findings per worker task
+    POLICY_EVALUATION_CHUNK_SIZE: int = 2000
+    # Incremental runs re-read findings updated this long before the watermark,
+    # covering writes that were uncommitted when the previous run started
+    POLICY_EVALUATION_WATERMARK_OVERLAP_SECONDS: int = 120
+    # Pass rates are computed over this many days of evaluation counters
+    POLICY_STATISTICS_WINDOW_DAYS: int = 30
+    # policy_violations is partitioned by month: partitions kept, and created ahead of time
+    POLICY_VIOLATION_RETENTION_MONTHS: int = 13
+    POLICY_VIOLATION_PARTITIONS_AHEAD: int = 3
+    
+    # CI/CD gate: decisions for identical inputs and rule versions are reused
+    GATE_DECISION_CACHE_TTL_SECONDS: int = 60
+    GATE_DECISION_CACHE_SIZE: int = 1024
+    
+    # Inherited risk propagation (DEPENDS_ON / PROCESSES_DATA_FROM edges)
+    INHERITED_RISK_DECAY: float = 0.5
+    INHERITED_RISK_MAX_DEPTH: int = 6
+    
+    # Risk heatmap cache (also invalidated on every threat write)
+    RISK_HEATMAP_CACHE_TTL_SECONDS: int = 300
+
+    # What-if risk simulation: grouped threat portfolio cache (shares the heatmap version)
+    RISK_SIMULATION_CACHE_TTL_SECONDS: int = 300
+
+    # MITRE ATT&CK technique index or STIX bundle; defaults to the full Enterprise index in app/data
+    MITRE_ATTACK_CATALOG_PATH: Optional[str] = None
+    
+    # Collaborative diagram editing (WebSocket sessions)
+    DIAGRAM_COLLAB_FLUSH_SECONDS: float = 5.0
+    DIAGRAM_COLLAB_BROADCAST_INTERVAL_MS: int = 50
+    DIAGRAM_COLLAB_MAX_OPERATIONS: int = 500  # per client message
     
     # JWT
     JWT_SECRET_KEY: str = "change-this-secret-key-in-production"
@@ -4,6 +4,7 @@ FastAPI Dependencies
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from typing import Optional
 from jose import JWTError, jwt
 from app.core.database import get_db
 from app.core.config import settings
@@ -12,6 +13,23 @@ from app.models.user import User
 security = HTTPBearer()
 
 
+def get_user_from_token(db: Session, token: str) -> Optional[User]:
+    """Resolve a JWT to its user, or None if the token is invalid (for WebSocket auth)"""
+    try:
+        payload = jwt.decode(
+            token,
+            settings.JWT_SECRET_KEY,
+            algorithms=[settings.JWT_ALGORITHM]
+        )
+    except JWTError:
+        return None
+    
+    user_id = payload.get("sub")
+    if user_id is None:
+        return None
+    return db.query(User).filter(User.user_id == user_id).first()
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -0,0 +1,180 @@
+"""
+RFC 6902 JSON Patch
+
+Operations are applied with structural sharing: only the containers along
+each patched path are shallow-copied, so patching a large canvas costs
+O(depth x container size) per operation instead of a full deep copy, and
+the input document is never modified.
+"""
+from typing import Any, Dict, List
+import copy
+
+OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class JsonPatchError(ValueError):
+    """The patch is malformed or does not apply to the document"""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """A 'test' operation did not match the document"""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens"""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer '{pointer}'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index '{token}'")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index {index} out of range")
+    return index
+
+
+def _get(document: Any, tokens: List[str]) -> Any:
+    node = document
+    for token in tokens:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JsonPatchError(f"Path member '{token}' not found")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_list_index(node, token)]
+        else:
+            raise JsonPatchError(f"Cannot traverse into scalar at '{token}'")
+    return node
+
+
+def _json_equal(left: Any, right: Any) -> bool:
+    # Python treats True == 1; JSON does not
+    if isinstance(left, bool) or isinstance(right, bool):
+        return isinstance(left, bool) and isinstance(right, bool) and left == right
+    if isinstance(left, dict) and isinstance(right, dict):
+        return left.keys() == right.keys() and all(_json_equal(left[key], right[key]) for key in left)
+    if isinstance(left, list) and isinstance(right, list):
+        return len(left) == len(right) and all(_json_equal(a, b) for a, b in zip(left, right))
+    if isinstance(left, (dict, list)) or isinstance(right, (dict, list)):
+        return False
+    return left == right
+
+
+class _Patcher:
+    def __init__(self, document: Any):
+        self.document = document
+        # Containers this patcher created (and may therefore mutate), by id.
+        # Holding the references keeps the ids from being reused.
+        self._owned: Dict[int, Any] = {}
+
+    def _own(self, container: Any) -> Any:
+        if id(container) in self._owned:
+            return container
+        if isinstance(container, dict):
+            owned = dict(container)
+        elif isinstance(container, list):
+            owned = list(container)
+        else:
+            raise JsonPatchError("Path parent is not an object or array")
+        self._owned[id(owned)] = owned
+        return owned
+
+    def _parent(self, tokens: List[str]) -> Any:
+        """Copy-on-write the containers down to the parent of tokens[-1]"""
+        self.document = self._own(self.document)
+        node = self.document
+        for token in tokens[:-1]:
+            if isinstance(node, dict):
+                if token not in node:
+                    raise JsonPatchError(f"Path member '{token}' not found")
+                key = token
+            else:
+                key = _list_index(node, token)
+            node[key] = self._own(node[key])
+            node = node[key]
+        return node
+
+    def add(self, tokens: List[str], value: Any) -> None:
+        if not tokens:
+            self.document = value
+            return
+        parent = self._parent(tokens)
+        if isinstance(parent, dict):
+            parent[tokens[-1]] = value
+        else:
+            parent.insert(_list_index(parent, tokens[-1], allow_end=True), value)
+
+    def remove(self, tokens: List[str]) -> Any:
+        if not tokens:
+            raise JsonPatchError("Cannot remove the document root")
+        parent = self._parent(tokens)
+        if isinstance(parent, dict):
+            if tokens[-1] not in parent:
+                raise JsonPatchError(f"Path member '{tokens[-1]}' not found")
+            return parent.pop(tokens[-1])
+        return parent.pop(_list_index(parent, tokens[-1]))
+
+    def replace(self, tokens: List[str], value: Any) -> None:
+        if not tokens:
+            self.document = value
+            return
+        parent = self._parent(tokens)
+        if isinstance(parent, dict):
+            if tokens[-1] not in parent:
+                raise JsonPatchError(f"Path member '{tokens[-1]}' not found")
+            parent[tokens[-1]] = value
+        else:
+            parent[_list_index(parent, tokens[-1])] = value
+
+    def apply(self, operation: dict) -> None:
+        op = operation.get("op")
+        if op not in OPERATIONS:
+            raise JsonPatchError(f"Unsupported operation '{op}'")
+        if "path" not in operation:
+            raise JsonPatchError(f"Operation '{op}' requires 'path'")
+        tokens = parse_pointer(operation["path"])
+
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"Operation '{op}' requires 'value'")
+        if op in ("move", "copy") and "from" not in operation:
+            raise JsonPatchError(f"Operation '{op}' requires 'from'")
+
+        if op == "add":
+            self.add(tokens, operation["value"])
+        elif op == "remove":
+            self.remove(tokens)
+        elif op == "replace":
+            self.replace(tokens, operation["value"])
+        elif op == "move":
+            from_tokens = parse_pointer(operation["from"])
+            if tokens[:len(from_tokens)] == from_tokens and len(tokens) > len(from_tokens):
+                raise JsonPatchError("Cannot move a value into one of its children")
+            if from_tokens != tokens:
+                self.add(tokens, self.remove(from_tokens))
+        elif op == "copy":
+            self.add(tokens, copy.deepcopy(_get(self.document, parse_pointer(operation["from"]))))
+        elif op == "test":
+            if not _json_equal(_get(self.document, tokens), operation["value"]):
+                raise JsonPatchTestFailed(f"Test failed at '{operation['path']}'")
+
+
+def apply_json_patch(document: Any, operations: List[dict]) -> Any:
+    """
+    Apply RFC 6902 operations atomically and return the patched document.
+    Raises JsonPatchError (a ValueError) if any operation fails; the input
+    document is left untouched either way.
+    """
+    patcher = _Patcher(document)
+    for position, operation in enumerate(operations):
+        try:
+            patcher.apply(operation)
+        except JsonPatchError as e:
+            raise type(e)(f"Operation {position}: {e}") from None
+    return patcher.document
@@ -0,0 +1,183 @@
+"""
+MITRE ATT&CK Catalog
+
+Loads the ATT&CK technique index once per process: technique -> name,
+tactics and sub-techniques, plus sorted keys for prefix autocomplete. The
+bundled app/data/mitre_attack.json is a compact index of every Enterprise
+ATT&CK tactic, technique and sub-technique (id, name, tactics, parent),
+generated from the STIX bundle with scripts/build_mitre_attack_index.py.
+MITRE_ATTACK_CATALOG_PATH may point at another index or directly at an
+enterprise-attack.json STIX bundle. Threat technique ids must exist in the
+loaded catalog.
+"""
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import re
+from app.core.config import settings
+
+BUNDLED_CATALOG_PATH = Path(__file__).resolve().parent.parent / "data" / "mitre_attack.json"
+
+TECHNIQUE_ID_PATTERN = re.compile(r"^T\d{4}(\.\d{3})?$")
+
+
+@dataclass(frozen=True)
+class MitreTactic:
+    tactic_id: str
+    name: str
+    shortname: str
+
+
+@dataclass(frozen=True)
+class MitreTechnique:
+    technique_id: str
+    name: str
+    tactics: Tuple[str, ...]  # tactic shortnames, e.g. ("initial-access", "persistence")
+    parent_id: Optional[str] = None
+    url: Optional[str] = None
+    subtechniques: Tuple[str, ...] = ()
+
+    @property
+    def is_subtechnique(self) -> bool:
+        return self.parent_id is not None
+
+
+def _attack_reference(stix_object: dict) -> Optional[dict]:
+    for reference in stix_object.get("external_references") or []:
+        if reference.get("source_name") == "mitre-attack" and reference.get("external_id"):
+            return reference
+    return None
+
+
+def _technique_url(technique_id: str) -> str:
+    return f"https://attack.mitre.org/techniques/{technique_id.replace('.', '/')}/"
+
+
+def stix_to_index(bundle: dict) -> dict:
+    """The compact technique index (the bundled format) of an ATT&CK STIX 2.x bundle"""
+    tactics = []
+    techniques = []
+    for stix_object in bundle.get("objects", []):
+        if stix_object.get("revoked") or stix_object.get("x_mitre_deprecated"):
+            continue
+        reference = _attack_reference(stix_object)
+        if reference is None:
+            continue
+        if stix_object.get("type") == "x-mitre-tactic":
+            tactics.append({
+                "id": reference["external_id"],
+                "name": stix_object["name"],
+                "shortname": stix_object["x_mitre_shortname"],
+            })
+        elif stix_object.get("type") == "attack-pattern":
+            technique = {
+                "id": reference["external_id"],
+                "name": stix_object["name"],
+                "tactics": [
+                    phase["phase_name"] for phase in stix_object.get("kill_chain_phases") or []
+                    if phase.get("kill_chain_name") == "mitre-attack"
+                ],
+            }
+            if "." in technique["id"]:
+                technique["parent"] = technique["id"].split(".")[0]
+            techniques.append(technique)
+    return {"tactics": tactics, "techniques": sorted(techniques, key=lambda technique: technique["id"])}
+
+
+@dataclass
+class MitreCatalog:
+    tactics: Dict[str, MitreTactic] = field(default_factory=dict)  # by shortname, in bundle order
+    techniques: Dict[str, MitreTechnique] = field(default_factory=dict)
+    # Sorted (lowercased key, technique_id) pairs: ids, full names and name words
+    _prefix_index: List[Tuple[str, str]] = field(default_factory=list)
+
+    @classmethod
+    def from_stix(cls, bundle: dict) -> "MitreCatalog":
+        return cls.from_index(stix_to_index(bundle))
+
+    @classmethod
+    def from_index(cls, index: dict) -> "MitreCatalog":
+        catalog = cls()
+        for tactic in index["tactics"]:
+            catalog.tactics[tactic["shortname"]] = MitreTactic(
+                tactic_id=tactic["id"],
+                name=tactic["name"],
+                shortname=tactic["shortname"]
+            )
+
+        children: Dict[str, List[str]] = {}
+        for technique in index["techniques"]:
+            if technique.get("parent"):
+                children.setdefault(technique["parent"], []).append(technique["id"])
+
+        for technique in index["techniques"]:
+            technique_id = technique["id"]
+            catalog.techniques[technique_id] = MitreTechnique(
+                technique_id=technique_id,
+                name=technique["name"],
+                tactics=tuple(technique["tactics"]),
+                parent_id=technique.get("parent"),
+                url=_technique_url(technique_id),
+                subtechniques=tuple(sorted(children.get(technique_id, [])))
+            )
+
+        index = set()
+        for technique in catalog.techniques.values():
+            name = technique.name.lower()
+            index.add((technique.technique_id.lower(), technique.technique_id))
+            index.add((name, technique.technique_id))
+            for word in re.findall(r"[a-z0-9]+", name):
+                index.add((word, technique.technique_id))
+        catalog._prefix_index = sorted(index)
+        return catalog
+
+    def get(self, technique_id: str) -> Optional[MitreTechnique]:
+        return self.techniques.get(technique_id.strip().upper())
+
+    def search(self, query: str, limit: int = 20) -> List[MitreTechnique]:
+        """
+        Prefix search over technique ids, names and name words. Id and
+        whole-name matches rank before word matches; ties sort by id.
+        """
+        prefix = query.strip().lower()
+        if not prefix:
+            return []
+        ranked = {}
+        position = bisect_left(self._prefix_index, (prefix, ""))
+        while position < len(self._prefix_index) and self._prefix_index[position][0].startswith(prefix):
+            key, technique_id = self._prefix_index[position]
+            technique = self.techniques[technique_id]
+            rank = 0 if key in (technique_id.lower(), technique.name.lower()) else 1
+            ranked[technique_id] = min(rank, ranked.get(technique_id, rank))
+            position += 1
+        return [
+            self.techniques[technique_id]
+            for technique_id in sorted(ranked, key=lambda technique_id: (ranked[technique_id], technique_id))[:limit]
+        ]
+
+    def tactic_names(self, technique: MitreTechnique) -> List[str]:
+        return [self.tactics[shortname].name for shortname in technique.tactics if shortname in self.tactics]
+
+
+@lru_cache(maxsize=1)
+def get_mitre_catalog() -> MitreCatalog:
+    """The process-wide catalog, parsed on first use"""
+    path = Path(settings.MITRE_ATTACK_CATALOG_PATH) if settings.MITRE_ATTACK_CATALOG_PATH else BUNDLED_CATALOG_PATH
+    with open(path, encoding="utf-8") as catalog_file:
+        data = json.load(catalog_file)
+    return MitreCatalog.from_stix(data) if data.get("type") == "bundle" else MitreCatalog.from_index(data)
+
+
+def validate_technique_id(technique_id: Optional[str]) -> Optional[str]:
+    """Normalize a technique id and check it exists in the catalog; blank means none"""
+    if technique_id is None or not technique_id.strip():
+        return None
+    normalized = technique_id.strip().upper()
+    if not TECHNIQUE_ID_PATTERN.match(normalized):
+        raise ValueError(f"'{technique_id}' is not a MITRE ATT&CK technique id (e.g. T1190 or T1059.001)")
+    if get_mitre_catalog().get(normalized) is None:
+        raise ValueError(f"Unknown MITRE ATT&CK technique '{normalized}'")
+    return normalized
@@ -0,0 +1,188 @@
+"""
+Open Policy Agent client
+
+One long-lived httpx.AsyncClient per process (per event loop) with a
+bounded connection pool, so policy evaluation reuses warm connections
+instead of opening one per request. HTTP/2 is negotiated over https.
+
+Each PolicyRule.rego_snippet is pushed to OPA as its own module once per
+(policy_rule_id, version), next to a small wrapper module that evaluates
+the policy for every element of input.items. A batch of inputs is then a
+single POST to the Data API, which works on any stock OPA server.
+
+Pass `transport` to target an in-process stand-in, e.g.
+httpx.MockTransport(handler) or httpx.ASGITransport(app=fake_opa), instead
+of a local `opa run --server`.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+import asyncio
+import re
+import httpx
+from app.core.config import settings
+
+POLICY_PACKAGE_ROOT = "sentinel.policies"
+BATCH_PACKAGE_ROOT = "sentinel.batch"
+
+_PACKAGE_PATTERN = re.compile(r"^\s*package\s+\S+[^\S\n]*$", re.MULTILINE)
+
+
+class OPAError(Exception):
+    """OPA could not be reached or answered with an unexpected response"""
+
+
+class OPAPolicyError(OPAError):
+    """OPA rejected a policy module, e.g. a Rego compile error"""
+
+
+def policy_package(policy_rule_id: UUID) -> str:
+    return f"{POLICY_PACKAGE_ROOT}.p_{policy_rule_id.hex}"
+
+
+def build_policy_module(policy_rule_id: UUID, rego_snippet: str) -> str:
+    """The snippet under its own package; a package line of its own is replaced"""
+    body = _PACKAGE_PATTERN.sub("", rego_snippet, count=1).strip()
+    return f"package {policy_package(policy_rule_id)}\n\n{body}\n"
+
+
+def build_batch_module(policy_rule_id: UUID) -> str:
+    """Evaluates the policy package once per element of input.items, in order"""
+    return (
+        f"package {BATCH_PACKAGE_ROOT}.p_{policy_rule_id.hex}\n\n"
+        f"results := [result | some i; item := input.items[i]; "
+        f"result := data.{policy_package(policy_rule_id)} with input as item]\n"
+    )
+
+
+class OPAClient:
+    def __init__(
+        self,
+        base_url: str,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        timeout: float = 5.0,
+        max_connections: int = 20,
+        http2: bool = True,
+        batch_size: int = 500
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            transport=transport,
+            timeout=timeout,
+            http2=http2 and transport is None,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+        # policy_rule_id -> version currently loaded in OPA by this process
+        self._loaded: Dict[UUID, int] = {}
+        self._load_lock = asyncio.Lock()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        try:
+            return await self._http.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            raise OPAError(f"OPA request failed: {e}") from e
+
+    async def _put_module(self, module_id: str, module: str) -> None:
+        response = await self._request(
+            "PUT", f"/v1/policies/{module_id}", content=module, headers={"Content-Type": "text/plain"}
+        )
+        if response.status_code == 400:
+            errors = response.json().get("errors") or []
+            details = "; ".join(error.get("message", "") for error in errors) or response.text
+            raise OPAPolicyError(f"Rego compile error: {details}")
+        if response.status_code != 200:
+            raise OPAError(f"OPA rejected module {module_id}: HTTP {response.status_code}")
+
+    async def ensure_policy(self, policy_rule_id: UUID, version: int, rego_snippet: str) -> None:
+        """Push the policy and its batch wrapper unless this version is already loaded"""
+        if self._loaded.get(policy_rule_id) == version:
+            return
+        async with self._load_lock:
+            if self._loaded.get(policy_rule_id) == version:
+                return
+            await self._put_module(f"sentinel/policies/{policy_rule_id}", build_policy_module(policy_rule_id, rego_snippet))
+            await self._put_module(f"sentinel/batch/{policy_rule_id}", build_batch_module(policy_rule_id))
+            self._loaded[policy_rule_id] = version
+
+    def forget_policy(self, policy_rule_id: UUID) -> None:
+        """Force the next ensure_policy to push again (e.g. OPA restarted)"""
+        self._loaded.pop(policy_rule_id, None)
+
+    async def _evaluate_chunk(self, policy_rule_id: UUID, inputs: Sequence[Any]) -> Optional[List[Any]]:
+        response = await self._request(
+            "POST",
+            f"/v1/data/sentinel/batch/p_{policy_rule_id.hex}/results",
+            json={"input": {"items": list(inputs)}}
+        )
+        if response.status_code != 200:
+            raise OPAError(f"OPA evaluation failed: HTTP {response.status_code} {response.text}")
+        # An undefined document means OPA does not have the modules (restarted or purged)
+        return response.json().get("result")
+
+    async def evaluate_batch(
+        self,
+        policy_rule_id: UUID,
+        version: int,
+        rego_snippet: str,
+        inputs: Sequence[Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate the policy for each input and return the policy package
+        document per input, in input order. Inputs are sent in chunks of
+        batch_size, concurrently over the shared connection pool.
+        """
+        if not inputs:
+            return []
+        await self.ensure_policy(policy_rule_id, version, rego_snippet)
+
+        chunks = [inputs[start:start + self.batch_size] for start in range(0, len(inputs), self.batch_size)]
+        results = await asyncio.gather(*(self._evaluate_chunk(policy_rule_id, chunk) for chunk in chunks))
+        if any(result is None for result in results):
+            self.forget_policy(policy_rule_id)
+            await self.ensure_policy(policy_rule_id, version, rego_snippet)
+            results = await asyncio.gather(*(self._evaluate_chunk(policy_rule_id, chunk) for chunk in chunks))
+            if any(result is None for result in results):
+                raise OPAError(f"OPA has no batch document for policy {policy_rule_id}")
+        return [document for chunk in results for document in chunk]
+
+    async def evaluate(self, policy_rule_id: UUID, version: int, rego_snippet: str, input_data: Any) -> Dict[str, Any]:
+        return (await self.evaluate_batch(policy_rule_id, version, rego_snippet, [input_data]))[0]
+
+
+_client: Optional[OPAClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_opa_client() -> OPAClient:
+    """
+    The process-wide client for the running event loop. httpx connections
+    are bound to the loop that opened them, so a new loop (e.g. a worker
+    running asyncio.run per task) gets a fresh client.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = OPAClient(
+            settings.OPA_URL,
+            timeout=settings.OPA_TIMEOUT_SECONDS,
+            max_connections=settings.OPA_MAX_CONNECTIONS,
+            http2=settings.OPA_HTTP2,
+            batch_size=settings.OPA_BATCH_SIZE
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_opa_client() -> None:
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
@@ -0,0 +1,844 @@
+"""
+Embedded evaluator for a subset of Rego
+
+Compiles a PolicyRule.rego_snippet into Python closures once, so a CI gate
+can decide in-process without a round trip to OPA. The result of
+CompiledPolicy.evaluate(input) has the same shape as the package document
+OPA returns, so the same gate mapping applies to both.
+
+Supported subset:
+
+    package sentinel.example             # ignored
+    import rego.v1                       # imports are ignored
+
+    default allow := false
+    allow if { input.severity == "LOW" }
+    allow if input.accepted              # single-expression body
+    is_critical if input.severity == "CRITICAL"
+    deny contains msg if {               # also: deny[msg] { ... }
+        is_critical                      # rules can reference other rules
+        some tag in input.tags           # iteration; also `some k, v in obj`
+        not startswith(tag, "waived-")
+        msg := sprintf("%s is critical (%v)", [input.title, tag])
+    }
+    risk := "high" if { input.cvss >= 7.0 }
+
+Body expressions are separated by newlines or `;`:
+  - comparisons ==, !=, <, <=, >, >= (`=` compares, or binds an unbound var)
+  - assignment `x := term`, membership `term in term`, negation `not expr`
+  - a bare term, which holds when it is defined and not false
+Terms: strings ("..." or `raw`), numbers, true/false/null, arrays, sets,
+objects, references such as input.a.b[0]["c"], bound variables, rule names
+and the builtins count, startswith, endswith, contains, lower, upper, trim,
+concat, sprintf, to_number and regex.match (literal patterns compile once).
+
+Anything else (functions, `else`, `with`, `every`, comprehensions, data.*)
+raises RegoSyntaxError; such policies need OPA.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import json
+import operator
+import re
+
+UNDEFINED = object()
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<skip>[ \t\r]+|\#[^\n]*)
+  | (?P<newline>\n)
+  | (?P<string>"(?:[^"\\\n]|\\.)*")
+  | (?P<raw>`[^`]*`)
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<op>:=|==|!=|<=|>=|<|>|=)
+  | (?P<punct>[{}\[\](),;.:])
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+""", re.VERBOSE)
+
+_COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+_KEYWORDS = {"package", "import", "default", "if", "contains", "some", "in", "not", "true", "false", "null"}
+
+
+class RegoSyntaxError(ValueError):
+    """The snippet is not valid Rego or uses something outside the supported subset"""
+
+
+@dataclass(frozen=True)
+class _Token:
+    kind: str
+    value: Any
+    line: int
+
+
+def _tokenize(source: str) -> List[_Token]:
+    tokens = []
+    line = 1
+    position = 0
+    while position < len(source):
+        match = _TOKEN_PATTERN.match(source, position)
+        if match is None:
+            raise RegoSyntaxError(f"line {line}: unexpected character {source[position]!r}")
+        kind = match.lastgroup
+        text = match.group()
+        if kind == "newline":
+            tokens.append(_Token("newline", text, line))
+            line += 1
+        elif kind == "string":
+            tokens.append(_Token("literal", json.loads(text), line))
+        elif kind == "raw":
+            tokens.append(_Token("literal", text[1:-1], line))
+            line += text.count("\n")
+        elif kind == "number":
+            tokens.append(_Token("literal", float(text) if "." in text else int(text), line))
+        elif kind != "skip":
+            tokens.append(_Token(kind, text, line))
+        position = match.end()
+    tokens.append(_Token("eof", None, line))
+    return tokens
+
+
+# Values
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _equal(left: Any, right: Any) -> bool:
+    if isinstance(left, bool) or isinstance(right, bool):
+        return left is right
+    return left == right
+
+
+def _compare(comparison: Callable, left: Any, right: Any) -> bool:
+    if comparison is operator.eq:
+        return _equal(left, right)
+    if comparison is operator.ne:
+        return not _equal(left, right)
+    if (_is_number(left) and _is_number(right)) or (isinstance(left, str) and isinstance(right, str)):
+        return comparison(left, right)
+    return False
+
+
+def _members(collection: Any) -> Any:
+    if isinstance(collection, dict):
+        return collection.values()
+    if isinstance(collection, (list, tuple, set, frozenset)):
+        return collection
+    return ()
+
+
+def _format_value(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, default=list)
+
+
+_FORMAT_VERB = re.compile(r"%([vsdfq%])")
+
+
+def _sprintf(template: str, arguments: list) -> str:
+    values = iter(arguments)
+
+    def substitute(match: "re.Match") -> str:
+        verb = match.group(1)
+        if verb == "%":
+            return "%"
+        value = next(values, None)
+        if verb == "d" and _is_number(value):
+            return str(int(value))
+        if verb == "q":
+            return json.dumps(value)
+        return _format_value(value)
+
+    return _FORMAT_VERB.sub(substitute, template)
+
+
+def _to_number(value: Any) -> Any:
+    if _is_number(value):
+        return value
+    try:
+        return float(value) if "." in str(value) else int(value)
+    except (TypeError, ValueError):
+        return UNDEFINED
+
+
+_BUILTINS: Dict[str, Tuple[int, Callable]] = {
+    "count": (1, lambda value: len(value) if isinstance(value, (str, list, dict, set, frozenset)) else UNDEFINED),
+    "startswith": (2, lambda value, prefix: value.startswith(prefix)),
+    "endswith": (2, lambda value, suffix: value.endswith(suffix)),
+    "contains": (2, lambda value, part: part in value),
+    "lower": (1, lambda value: value.lower()),
+    "upper": (1, lambda value: value.upper()),
+    "trim": (2, lambda value, cutset: value.strip(cutset)),
+    "concat": (2, lambda delimiter, values: delimiter.join(values)),
+    "sprintf": (2, _sprintf),
+    "to_number": (1, _to_number),
+    "regex.match": (2, lambda pattern, value: re.search(pattern, value) is not None),
+}
+
+
+# Compiled form: a term is fn(ctx, env) -> value | UNDEFINED; a body step is
+# fn(ctx, env, k) -> bool that calls its successor once per solution and
+# returns True as soon as a continuation asks to stop.
+
+class _Context:
+    __slots__ = ("input", "rules", "_values")
+
+    def __init__(self, input_data: Any, rules: Dict[str, "_Rule"]):
+        self.input = input_data
+        self.rules = rules
+        self._values: Dict[str, Any] = {}
+
+    def rule(self, name: str) -> Any:
+        # Rules are evaluated at most once per input; cycles are rejected at compile time
+        value = self._values.get(name, _MISSING)
+        if value is _MISSING:
+            value = self._values[name] = self.rules[name].evaluate(self)
+        return value
+
+
+_MISSING = object()
+
+
+def _done(ctx: _Context, env: dict, k: Callable) -> bool:
+    return k(env)
+
+
+@dataclass
+class _Rule:
+    name: str
+    is_set: bool = False
+    default: Any = UNDEFINED
+    # (body runner, head term) per definition
+    definitions: Optional[list] = None
+
+    def evaluate(self, ctx: _Context) -> Any:
+        if self.is_set:
+            values, seen = [], set()
+
+            def collect(env: dict) -> bool:
+                value = head(ctx, env)
+                if value is not UNDEFINED:
+                    key = value if isinstance(value, (str, int, float)) else json.dumps(value, sort_keys=True, default=list)
+                    if key not in seen:
+                        seen.add(key)
+                        values.append(value)
+                return False
+
+            for body, head in self.definitions or []:
+                body(ctx, {}, collect)
+            return values
+
+        for body, head in self.definitions or []:
+            found = []
+
+            def first(env: dict) -> bool:
+                value = head(ctx, env)
+                if value is UNDEFINED:
+                    return False
+                found.append(value)
+                return True
+
+            if body(ctx, {}, first):
+                return found[0]
+        return self.default
+
+
+def _to_document(value: Any) -> Any:
+    """Sets become sorted arrays, as in OPA's JSON output"""
+    if isinstance(value, (str, int, float)) or value is None:
+        return value
+    if isinstance(value, frozenset):
+        return sorted(value, key=lambda member: json.dumps(member, sort_keys=True))
+    if isinstance(value, dict):
+        return {key: _to_document(member) for key, member in value.items()}
+    if isinstance(value, list):
+        return [_to_document(member) for member in value]
+    return value
+
+
+class CompiledPolicy:
+    """A parsed and compiled policy module; evaluate() is safe to call concurrently"""
+
+    def __init__(self, rules: Dict[str, _Rule]):
+        self._rules = rules
+
+    @property
+    def rule_names(self) -> List[str]:
+        return list(self._rules)
+
+    def evaluate(self, input_data: Any) -> Dict[str, Any]:
+        ctx = _Context(input_data, self._rules)
+        document = {}
+        for name in self._rules:
+            value = ctx.rule(name)
+            if value is not UNDEFINED:
+                document[name] = _to_document(value)
+        return document
+
+
+class _Parser:
+    def __init__(self, source: str):
+        self.tokens = _tokenize(source)
+        self.position = 0
+        self.rules: Dict[str, _Rule] = {}
+        self.dependencies: Dict[str, Set[str]] = {}
+        self._compiling: Optional[str] = None
+
+    # Token helpers
+
+    @property
+    def current(self) -> _Token:
+        return self.tokens[self.position]
+
+    def error(self, message: str) -> RegoSyntaxError:
+        return RegoSyntaxError(f"line {self.current.line}: {message}")
+
+    def at(self, value: str) -> bool:
+        return self.current.kind in ("op", "punct", "ident") and self.current.value == value
+
+    def accept(self, value: str) -> bool:
+        if self.at(value):
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, value: str) -> None:
+        if not self.accept(value):
+            raise self.error(f"expected '{value}'")
+
+    def skip_newlines(self) -> None:
+        while self.current.kind == "newline":
+            self.position += 1
+
+    def skip_line(self) -> None:
+        while self.current.kind not in ("newline", "eof"):
+            self.position += 1
+
+    def end_of_statement(self) -> None:
+        if self.current.kind not in ("newline", "eof"):
+            raise self.error(f"unexpected {self.current.value!r}")
+
+    # Module
+
+    def parse_module(self) -> CompiledPolicy:
+        pending = []
+        self.skip_newlines()
+        while self.current.kind != "eof":
+            if self.accept("package") or self.accept("import"):
+                self.skip_line()
+            elif self.accept("default"):
+                name = self.rule_name()
+                if not (self.accept(":=") or self.accept("=")):
+                    raise self.error("expected ':=' after default rule name")
+                value = getattr(self.parse_term(set()), "constant", UNDEFINED)
+                if value is UNDEFINED:
+                    raise self.error("default value must be a constant")
+                rule = self.rules.setdefault(name, _Rule(name))
+                rule.default = value
+                self.end_of_statement()
+            else:
+                pending.append(self.parse_rule())
+            self.skip_newlines()
+
+        # Bodies may reference any rule in the module, so compile them last
+        for rule, compile_definition in pending:
+            self._compiling = rule.name
+            rule.definitions = (rule.definitions or []) + [compile_definition()]
+        self.check_recursion()
+        return CompiledPolicy(self.rules)
+
+    def check_recursion(self) -> None:
+        visiting, done = set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise RegoSyntaxError(f"rule '{name}' depends on itself")
+            visiting.add(name)
+            for dependency in self.dependencies.get(name, ()):
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.rules:
+            visit(name)
+
+    def rule_name(self) -> str:
+        token = self.current
+        if token.kind != "ident" or token.value in _KEYWORDS:
+            raise self.error("expected a rule name")
+        self.position += 1
+        return token.value
+
+    def parse_rule(self) -> Tuple[_Rule, Callable]:
+        line = self.current.line
+        name = self.rule_name()
+        is_set = False
+        head_start = head_end = None
+        if self.at("("):
+            raise self.error("functions are not supported")
+        if self.accept("contains"):
+            is_set = True
+            head_start = self.position
+            head_end = self.skip_term()
+        elif self.accept("["):
+            is_set = True
+            head_start = self.position
+            head_end = self.skip_term()
+            self.expect("]")
+        elif self.accept(":=") or self.accept("="):
+            head_start = self.position
+            head_end = self.skip_term()
+
+        rule = self.rules.setdefault(name, _Rule(name, is_set=is_set))
+        if rule.definitions is None:
+            rule.definitions = []
+        if rule.is_set != is_set:
+            raise RegoSyntaxError(f"line {line}: rule '{name}' is defined both as a set and as a value")
+
+        body_start = None
+        if self.accept("if"):
+            body_start = self.position
+            if self.at("{"):
+                self.skip_braces()
+            else:
+                self.skip_line()
+        elif self.at("{"):
+            body_start = self.position
+            self.skip_braces()
+        elif is_set or head_start is None:
+            raise self.error(f"rule '{name}' needs a body")
+        body_end = self.position
+        self.end_of_statement()
+        resume = self.position
+
+        def compile_definition():
+            bound: Set[str] = set()
+            body = _done
+            if body_start is not None:
+                self.position = body_start
+                body = self.parse_body(bound)
+                if self.position != body_end:
+                    raise self.error(f"unexpected {self.current.value!r}")
+            if head_start is None:
+                head = _constant(True)
+            else:
+                self.position = head_start
+                head = self.parse_term(bound)
+                if self.position != head_end:
+                    raise self.error(f"unexpected {self.current.value!r}")
+            self.position = resume
+            return body, head
+
+        return rule, compile_definition
+
+    def skip_term(self) -> int:
+        """Skip a rule head term and return where it ends"""
+        start = self.position
+        depth = 0
+        while True:
+            token = self.current
+            if token.kind == "eof":
+                raise self.error("unexpected end of policy")
+            if depth == 0 and (
+                token.kind == "newline"
+                or (token.kind == "ident" and token.value == "if")
+                or (token.kind == "punct" and token.value == "]")
+                # A brace after the term opens a v0 body; at the start it is a set or object
+                or (token.kind == "punct" and token.value == "{" and self.position > start)
+            ):
+                if self.position == start:
+                    raise self.error("expected a term")
+                return self.position
+            if token.kind == "punct" and token.value in "([{":
+                depth += 1
+            elif token.kind == "punct" and token.value in ")]}":
+                depth -= 1
+            self.position += 1
+
+    def skip_braces(self) -> None:
+        depth = 0
+        while True:
+            token = self.current
+            if token.kind == "eof":
+                raise self.error("unclosed '{'")
+            if token.kind == "punct" and token.value == "{":
+                depth += 1
+            elif token.kind == "punct" and token.value == "}":
+                depth -= 1
+                if depth == 0:
+                    self.position += 1
+                    return
+            self.position += 1
+
+    # Bodies
+
+    def parse_body(self, bound: Set[str]) -> Callable:
+        expressions = []
+        if self.accept("{"):
+            while True:
+                while self.current.kind == "newline" or self.at(";"):
+                    self.position += 1
+                if self.accept("}"):
+                    break
+                expressions.append(self.parse_expression(bound))
+                if not (self.current.kind == "newline" or self.at(";") or self.at("}")):
+                    raise self.error(f"unexpected {self.current.value!r}")
+        else:
+            expressions.append(self.parse_expression(bound))
+            while self.accept(";"):
+                expressions.append(self.parse_expression(bound))
+        if not expressions:
+            raise self.error("empty rule body")
+
+        runner = _done
+        for make_step in reversed(expressions):
+            runner = make_step(runner)
+        return runner
+
+    def parse_expression(self, bound: Set[str]) -> Callable:
+        """Returns a factory that builds the step given its successor"""
+        line = self.current.line
+        if self.accept("not"):
+            inner_factory = self.parse_expression(set(bound))
+            inner = inner_factory(lambda ctx, env, k: True)
+
+            def make_not(successor):
+                def step(ctx, env, k):
+                    if inner(ctx, env, None):
+                        return False
+                    return successor(ctx, env, k)
+                return step
+            return make_not
+
+        if self.accept("some"):
+            names = [self.variable_name(bound)]
+            if self.accept(","):
+                names.append(self.variable_name(bound))
+            self.expect("in")
+            collection = self.parse_term(bound)
+            bound.update(names)
+            return _make_some(names, collection)
+
+        token = self.current
+        if token.kind == "ident" and token.value not in bound and token.value not in self.rules \
+                and token.value not in _KEYWORDS and token.value != "input" \
+                and self.tokens[self.position + 1].value in (":=", "="):
+            name = token.value
+            self.position += 2
+            value = self.parse_term(bound)
+            bound.add(name)
+            return _make_assign(name, value)
+        if token.kind == "ident" and token.value in bound and self.tokens[self.position + 1].value == ":=":
+            raise RegoSyntaxError(f"line {line}: variable '{token.value}' is already assigned")
+
+        left = self.parse_term(bound)
+        if self.current.kind == "op" and self.current.value in _COMPARISONS or self.at("="):
+            comparison = _COMPARISONS[self.current.value if self.current.value != "=" else "=="]
+            self.position += 1
+            right = self.parse_term(bound)
+            return _make_compare(comparison, left, right)
+        if self.accept("in"):
+            collection = self.parse_term(bound)
+            return _make_membership(left, collection)
+        return _make_truthy(left)
+
+    def variable_name(self, bound: Set[str]) -> str:
+        token = self.current
+        if token.kind != "ident" or token.value in _KEYWORDS or token.value == "input":
+            raise self.error("expected a variable name")
+        if token.value in bound:
+            raise self.error(f"variable '{token.value}' is already assigned")
+        self.position += 1
+        return token.value
+
+    # Terms
+
+    def parse_term(self, bound: Set[str]) -> Callable:
+        token = self.current
+        if token.kind == "literal":
+            self.position += 1
+            return _constant(token.value)
+        if self.accept("["):
+            items = self.parse_items("]", bound)
+            return _make_collection(items, list)
+        if self.accept("{"):
+            return self.parse_braced_term(bound)
+        if token.kind == "ident":
+            return self.parse_reference(bound)
+        raise self.error(f"unexpected {token.value!r}")
+
+    def parse_items(self, closing: str, bound: Set[str]) -> List[Callable]:
+        items = []
+        self.skip_newlines()
+        while not self.accept(closing):
+            items.append(self.parse_term(bound))
+            self.skip_newlines()
+            if not self.accept(","):
+                self.skip_newlines()
+                self.expect(closing)
+                break
+            self.skip_newlines()
+        return items
+
+    def parse_braced_term(self, bound: Set[str]) -> Callable:
+        self.skip_newlines()
+        if self.accept("}"):
+            return _constant({})
+        first = self.parse_term(bound)
+        self.skip_newlines()
+        if not self.accept(":"):
+            items = [first]
+            if not self.accept("}"):
+                self.expect(",")
+                items.extend(self.parse_items("}", bound))
+            return _make_collection(items, frozenset)
+
+        pairs = [(first, self.parse_term(bound))]
+        self.skip_newlines()
+        while self.accept(","):
+            self.skip_newlines()
+            if self.at("}"):
+                break
+            key = self.parse_term(bound)
+            self.expect(":")
+            pairs.append((key, self.parse_term(bound)))
+            self.skip_newlines()
+        self.skip_newlines()
+        self.expect("}")
+        return _make_object(pairs)
+
+    def parse_reference(self, bound: Set[str]) -> Callable:
+        line = self.current.line
+        name = self.current.value
+        self.position += 1
+        if name in ("true", "false", "null"):
+            return _constant({"true": True, "false": False, "null": None}[name])
+
+        path: List[Any] = []
+        plain = True
+        while True:
+            if self.at(".") and self.tokens[self.position + 1].kind == "ident":
+                path.append(_constant(self.tokens[self.position + 1].value))
+                self.position += 2
+            elif self.at("["):
+                self.position += 1
+                path.append(self.parse_term(bound))
+                self.expect("]")
+                plain = False
+            else:
+                break
+
+        if self.at("("):
+            function_name = ".".join([name] + [segment.constant for segment in path]) if plain else None
+            if function_name not in _BUILTINS:
+                raise RegoSyntaxError(f"line {line}: unsupported function '{function_name or name}'")
+            self.position += 1
+            arguments = self.parse_items(")", bound)
+            arity, function = _BUILTINS[function_name]
+            if len(arguments) != arity:
+                raise RegoSyntaxError(f"line {line}: {function_name} takes {arity} argument(s)")
+            return _make_call(function_name, function, arguments)
+
+        if name == "input":
+            base = lambda ctx, env: ctx.input
+        elif name in bound:
+            base = lambda ctx, env: env[name]
+        elif name in self.rules:
+            self.dependencies.setdefault(self._compiling, set()).add(name)
+            base = lambda ctx, env: ctx.rule(name)
+        elif name == "data":
+            raise RegoSyntaxError(f"line {line}: references to data are not supported")
+        else:
+            raise RegoSyntaxError(f"line {line}: unknown variable or rule '{name}'")
+        return _make_reference(base, path) if path else base
+
+
+# Closure builders
+
+def _constant(value: Any) -> Callable:
+    def term(ctx, env):
+        return value
+    term.constant = value
+    return term
+
+
+def _make_collection(items: List[Callable], kind: type) -> Callable:
+    if all(hasattr(item, "constant") for item in items):
+        try:
+            return _constant(kind(item.constant for item in items))
+        except TypeError:
+            pass
+    if kind is frozenset:
+        # Sets hold hashable scalars in this subset
+        def term(ctx, env):
+            values = [item(ctx, env) for item in items]
+            if any(value is UNDEFINED for value in values):
+                return UNDEFINED
+            try:
+                return frozenset(values)
+            except TypeError:
+                return UNDEFINED
+        return term
+
+    def term(ctx, env):
+        values = [item(ctx, env) for item in items]
+        return UNDEFINED if any(value is UNDEFINED for value in values) else values
+    return term
+
+
+def _make_object(pairs: List[Tuple[Callable, Callable]]) -> Callable:
+    if all(hasattr(key, "constant") and hasattr(value, "constant") for key, value in pairs):
+        return _constant({key.constant: value.constant for key, value in pairs})
+
+    def term(ctx, env):
+        result = {}
+        for key_term, value_term in pairs:
+            key, value = key_term(ctx, env), value_term(ctx, env)
+            if key is UNDEFINED or value is UNDEFINED:
+                return UNDEFINED
+            result[key] = value
+        return result
+    return term
+
+
+def _make_reference(base: Callable, path: List[Callable]) -> Callable:
+    def term(ctx, env):
+        value = base(ctx, env)
+        for segment in path:
+            key = segment(ctx, env)
+            if isinstance(value, dict):
+                value = value.get(key, UNDEFINED) if isinstance(key, str) else UNDEFINED
+            elif isinstance(value, list) and _is_number(key) and int(key) == key and 0 <= key < len(value):
+                value = value[int(key)]
+            else:
+                return UNDEFINED
+            if value is UNDEFINED:
+                return UNDEFINED
+        return value
+    return term
+
+
+def _make_call(name: str, function: Callable, arguments: List[Callable]) -> Callable:
+    if name == "regex.match" and isinstance(getattr(arguments[0], "constant", None), str):
+        try:
+            pattern = re.compile(arguments[0].constant)
+        except re.error as e:
+            raise RegoSyntaxError(f"invalid regex.match pattern: {e}")
+        value_term = arguments[1]
+
+        def match(ctx, env):
+            value = value_term(ctx, env)
+            return pattern.search(value) is not None if isinstance(value, str) else UNDEFINED
+        return match
+
+    def call(ctx, env):
+        values = []
+        for argument in arguments:
+            value = argument(ctx, env)
+            if value is UNDEFINED:
+                return UNDEFINED
+            values.append(value)
+        try:
+            return function(*values)
+        except (AttributeError, TypeError, ValueError, re.error):
+            # Builtins applied to the wrong types are undefined, as in OPA
+            return UNDEFINED
+    return call
+
+
+def _make_compare(comparison: Callable, left: Callable, right: Callable) -> Callable:
+    def make(successor):
+        def step(ctx, env, k):
+            left_value = left(ctx, env)
+            if left_value is UNDEFINED:
+                return False
+            right_value = right(ctx, env)
+            if right_value is UNDEFINED or not _compare(comparison, left_value, right_value):
+                return False
+            return successor(ctx, env, k)
+        return step
+    return make
+
+
+def _make_membership(item: Callable, collection: Callable) -> Callable:
+    def make(successor):
+        def step(ctx, env, k):
+            value = item(ctx, env)
+            if value is UNDEFINED:
+                return False
+            members = collection(ctx, env)
+            if isinstance(members, frozenset) and isinstance(value, (str, int, float)) and not isinstance(value, bool):
+                found = value in members
+            else:
+                found = any(_equal(value, member) for member in _members(members))
+            if not found:
+                return False
+            return successor(ctx, env, k)
+        return step
+    return make
+
+
+def _make_truthy(term: Callable) -> Callable:
+    def make(successor):
+        def step(ctx, env, k):
+            value = term(ctx, env)
+            if value is UNDEFINED or value is False:
+                return False
+            return successor(ctx, env, k)
+        return step
+    return make
+
+
+def _make_assign(name: str, value_term: Callable) -> Callable:
+    def make(successor):
+        def step(ctx, env, k):
+            value = value_term(ctx, env)
+            if value is UNDEFINED:
+                return False
+            env[name] = value
+            try:
+                return successor(ctx, env, k)
+            finally:
+                del env[name]
+        return step
+    return make
+
+
+def _make_some(names: List[str], collection: Callable) -> Callable:
+    def make(successor):
+        def step(ctx, env, k):
+            values = collection(ctx, env)
+            if len(names) == 1:
+                pairs = ((None, member) for member in _members(values))
+            elif isinstance(values, dict):
+                pairs = values.items()
+            elif isinstance(values, list):
+                pairs = enumerate(values)
+            else:
+                return False
+            try:
+                for key, member in pairs:
+                    if len(names) == 2:
+                        env[names[0]] = key
+                    env[names[-1]] = member
+                    if successor(ctx, env, k):
+                        return True
+                return False
+            finally:
+                for name in names:
+                    env.pop(name, None)
+        return step
+    return make
+
+
+def compile_policy(source: str) -> CompiledPolicy:
+    """Parse and compile a policy module; raises RegoSyntaxError outside the subset"""
+    return _Parser(source).parse_module()
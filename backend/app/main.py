@@ -6,6 +6,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.core.database import engine
+from app.core.opa import close_opa_client
 from sqlalchemy import text
 import logging
 
@@ -30,6 +31,7 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down...")
+    await close_opa_client()
 
 
 app = FastAPI(
@@ -51,7 +53,7 @@ app.add_middleware(
 )
 
 # Include routers
-from app.api.v1.endpoints import assets, auth, threats, findings, risk_acceptances, policies
+from app.api.v1.endpoints import assets, auth, threats, findings, risk_acceptances, policies, analytics, mitre, gates, compliance
 
 app.include_router(auth.router, prefix="/v1/auth", tags=["Authentication"])
 app.include_router(assets.router, prefix="/v1/assets", tags=["Assets"])
@@ -59,6 +61,10 @@ app.include_router(threats.router, prefix="/v1/threats", tags=["Threats"])
 app.include_router(findings.router, prefix="/v1/findings", tags=["Findings"])
 app.include_router(risk_acceptances.router, prefix="/v1/risk-acceptances", tags=["Risk Acceptances"])
 app.include_router(policies.router, prefix="/v1/policies", tags=["Policies"])
+app.include_router(analytics.router, prefix="/v1/analytics", tags=["Analytics"])
+app.include_router(mitre.router, prefix="/v1/mitre", tags=["MITRE ATT&CK"])
+app.include_router(gates.router, prefix="/v1/gates", tags=["Gates"])
+app.include_router(compliance.router, prefix="/v1/compliance", tags=["Compliance"])
 
 
 @app.get("/")
@@ -2,28 +2,41 @@
 Database Models
 """
 from app.models.user import User, Role
-from app.models.asset import Asset, AssetRelationship
-from app.models.threat import Threat, ThreatStateHistory, ThreatModelDiagram
+from app.models.asset import Asset, AssetRelationship, AssetRiskRollup, AssetComponent
+from app.models.threat import Threat, ThreatStateHistory, ThreatModelDiagram, DiagramElementState
 from app.models.finding import Finding, ScanResult
-from app.models.policy import PolicyRule, PolicyControlMapping, Control, PolicyViolation
+from app.models.policy import (
+    PolicyRule, PolicyControlMapping, Control, PolicyViolation, PolicyEvaluationCounter, ControlCrosswalk,
+    PolicyViolationMonthlySummary
+)
 from app.models.risk import RiskAcceptance
 from app.models.audit import AuditLog
+from app.models.cache import CacheVersion
+from app.models.analytics import RiskPostureSnapshot
 
 __all__ = [
     "User",
     "Role",
     "Asset",
     "AssetRelationship",
+    "AssetRiskRollup",
+    "AssetComponent",
     "Threat",
     "ThreatStateHistory",
     "ThreatModelDiagram",
+    "DiagramElementState",
     "Finding",
     "ScanResult",
     "PolicyRule",
     "PolicyControlMapping",
     "Control",
     "PolicyViolation",
+    "PolicyEvaluationCounter",
+    "ControlCrosswalk",
+    "PolicyViolationMonthlySummary",
     "RiskAcceptance",
     "AuditLog",
+    "CacheVersion",
+    "RiskPostureSnapshot",
 ]
 
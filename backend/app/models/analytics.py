@@ -0,0 +1,34 @@
+"""
+Analytics Models
+"""
+from sqlalchemy import Column, Integer, Date, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class RiskPostureSnapshot(Base):
+    """Organization-wide risk posture at the end of one day, written by analytics_service"""
+    __tablename__ = "risk_posture_snapshots"
+
+    snapshot_date = Column(Date, primary_key=True)
+    open_critical_count = Column(Integer, nullable=False, default=0)
+    open_high_count = Column(Integer, nullable=False, default=0)
+    open_medium_count = Column(Integer, nullable=False, default=0)
+    open_low_count = Column(Integer, nullable=False, default=0)
+    open_info_count = Column(Integer, nullable=False, default=0)
+    threat_count = Column(Integer, nullable=False, default=0)
+    threat_status_counts = Column(JSONB, nullable=False, default=dict)  # {ThreatStatus: count}
+    # {ClassificationLevel: {"asset_count", "threat_count", "avg_risk_score", "max_risk_score"}}
+    risk_by_classification = Column(JSONB, nullable=False, default=dict)
+    captured_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def open_findings_by_severity(self) -> dict:
+        return {
+            "CRITICAL": self.open_critical_count or 0,
+            "HIGH": self.open_high_count or 0,
+            "MEDIUM": self.open_medium_count or 0,
+            "LOW": self.open_low_count or 0,
+            "INFO": self.open_info_count or 0,
+        }
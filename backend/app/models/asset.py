@@ -1,8 +1,8 @@
 """
 Asset Models
 """
-from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey, ARRAY, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey, ARRAY, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -63,6 +63,23 @@ class Asset(Base):
         foreign_keys="AssetRelationship.target_asset_id",
         back_populates="target_asset"
     )
+    risk_rollup = relationship(
+        "AssetRiskRollup",
+        back_populates="asset",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+    components = relationship(
+        "AssetComponent",
+        back_populates="asset",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    __table_args__ = (
+        Index("ix_assets_technology_stack", technology_stack, postgresql_using="gin"),
+    )
 
 
 class AssetRelationship(Base):
@@ -78,4 +95,54 @@ class AssetRelationship(Base):
     target_asset = relationship("Asset", foreign_keys=[target_asset_id], back_populates="target_relationships")
 
 
+class AssetRiskRollup(Base):
+    """Per-asset finding/threat aggregates, maintained by asset_rollup_service"""
+    __tablename__ = "asset_risk_rollups"
+
+    asset_id = Column(UUID(as_uuid=True), ForeignKey("assets.asset_id", ondelete="CASCADE"), primary_key=True)
+    open_critical_count = Column(Integer, nullable=False, default=0)
+    open_high_count = Column(Integer, nullable=False, default=0)
+    open_medium_count = Column(Integer, nullable=False, default=0)
+    open_low_count = Column(Integer, nullable=False, default=0)
+    open_info_count = Column(Integer, nullable=False, default=0)
+    threat_count = Column(Integer, nullable=False, default=0)
+    threat_status_counts = Column(JSONB, nullable=False, default=dict)  # {ThreatStatus: count}
+    max_risk_score = Column(Numeric(5, 2), nullable=True, index=True)
+    # Risk inherited from dependent assets, written by risk_propagation_service
+    inherited_risk_score = Column(Numeric(5, 2), nullable=True, index=True)
+    inherited_risk_updated_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Relationships
+    asset = relationship("Asset", back_populates="risk_rollup")
+
+    @property
+    def open_findings_by_severity(self) -> dict:
+        return {
+            "CRITICAL": self.open_critical_count or 0,
+            "HIGH": self.open_high_count or 0,
+            "MEDIUM": self.open_medium_count or 0,
+            "LOW": self.open_low_count or 0,
+            "INFO": self.open_info_count or 0,
+        }
+
+
+class AssetComponent(Base):
+    """Normalized technology_stack entry, maintained by technology_service"""
+    __tablename__ = "asset_components"
+
+    component_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    asset_id = Column(UUID(as_uuid=True), ForeignKey("assets.asset_id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(255), nullable=False)  # lowercased component name, e.g. "log4j"
+    raw_entry = Column(String, nullable=False)  # original technology_stack entry
+    version = Column(String(100), nullable=True)
+    version_major = Column(Integer, nullable=True)
+    version_minor = Column(Integer, nullable=True)
+    version_patch = Column(Integer, nullable=True)
+
+    # Relationships
+    asset = relationship("Asset", back_populates="components")
+
+    __table_args__ = (
+        Index("ix_asset_components_name_version", name, version_major, version_minor, version_patch),
+    )
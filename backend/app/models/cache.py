@@ -0,0 +1,15 @@
+"""
+Cache Version Model
+"""
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class CacheVersion(Base):
+    """Monotonic version counters used to key and invalidate in-process caches across workers"""
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,7 +1,7 @@
 """
 Finding and Scan Result Models
 """
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, ARRAY, Enum as SQLEnum, Text, JSON
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, ARRAY, Enum as SQLEnum, Text, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -47,7 +47,7 @@ class ScanResult(Base):
     asset_id = Column(UUID(as_uuid=True), ForeignKey("assets.asset_id"), nullable=False)
     scanner_type = Column(SQLEnum(ScannerType), nullable=False)
     scanner_name = Column(String, nullable=False)
-    pipeline_run_id = Column(String, nullable=True)
+    pipeline_run_id = Column(String, nullable=True, index=True)
     raw_data = Column(JSONB, nullable=False)
     processing_status = Column(SQLEnum(ProcessingStatus), nullable=False, default=ProcessingStatus.PENDING)
     scan_timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -72,6 +72,8 @@ class Finding(Base):
     scanner_sources = Column(ARRAY(String), nullable=True)
     first_detected = Column(DateTime(timezone=True), server_default=func.now())
     remediated_at = Column(DateTime(timezone=True), nullable=True)
+    # Watermark for incremental policy evaluation
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     scan_result = relationship("ScanResult", back_populates="findings")
@@ -79,5 +81,10 @@ class Finding(Base):
     threat = relationship("Threat", back_populates="findings")
     policy_violations = relationship("PolicyViolation", back_populates="finding")
 
+    __table_args__ = (
+        # Keyset pagination over recently changed findings
+        Index("ix_findings_updated_at_finding_id", updated_at, finding_id),
+    )
+
 
 
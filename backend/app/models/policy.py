@@ -1,10 +1,13 @@
 """
 Policy and Compliance Models
 """
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import (
+    Column, String, Integer, Boolean, Date, DateTime, ForeignKey, Text, CheckConstraint, Index, UniqueConstraint,
+    Enum as SQLEnum
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import uuid
 from app.core.database import Base
 import enum
@@ -34,6 +37,7 @@ class GateDecision(str, enum.Enum):
 
 class Control(Base):
     __tablename__ = "controls"
+    __table_args__ = (UniqueConstraint("framework", "control_code", name="uq_controls_framework_control_code"),)
 
     control_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     framework = Column(SQLEnum(ComplianceFramework), nullable=False)
@@ -55,6 +59,8 @@ class PolicyRule(Base):
     active = Column(Boolean, default=True)
     version = Column(Integer, default=1)
     last_evaluated = Column(DateTime(timezone=True), nullable=True)
+    # Version last evaluated against every finding; differs from version after an edit
+    evaluated_version = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -65,6 +71,9 @@ class PolicyRule(Base):
 
 class PolicyControlMapping(Base):
     __tablename__ = "policy_control_mappings"
+    __table_args__ = (
+        UniqueConstraint("policy_rule_id", "control_id", name="uq_policy_control_mappings_rule_control"),
+    )
 
     mapping_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     policy_rule_id = Column(UUID(as_uuid=True), ForeignKey("policy_rules.policy_rule_id"), nullable=False)
@@ -76,17 +85,101 @@ class PolicyControlMapping(Base):
 
 
 class PolicyViolation(Base):
+    """
+    Range-partitioned by month on evaluated_at; partitions are named
+    policy_violations_yYYYYmMM, with policy_violations_default catching rows
+    no monthly partition covers, and are managed by violation_retention_service
+    """
     __tablename__ = "policy_violations"
+    __table_args__ = (
+        Index("ix_policy_violations_policy_evaluated_at", "policy_rule_id", text("evaluated_at DESC")),
+        Index(
+            "ix_policy_violations_active_finding_policy",
+            "finding_id",
+            "policy_rule_id",
+            postgresql_where=text("retired_at IS NULL")
+        ),
+        {"postgresql_partition_by": "RANGE (evaluated_at)"},
+    )
 
     violation_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     finding_id = Column(UUID(as_uuid=True), ForeignKey("findings.finding_id"), nullable=False)
     policy_rule_id = Column(UUID(as_uuid=True), ForeignKey("policy_rules.policy_rule_id"), nullable=False)
     gate_decision = Column(SQLEnum(GateDecision), nullable=False)
-    evaluated_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Partition key, so part of the primary key
+    evaluated_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    # Set when a later evaluation no longer produces this decision
+    retired_at = Column(DateTime(timezone=True), nullable=True)
+    # Active violation moved out of an expired partition; already counted in that month's summary
+    carried_forward = Column(Boolean, nullable=False, default=False, server_default=text("false"))
 
     # Relationships
     finding = relationship("Finding", back_populates="policy_violations")
     policy_rule = relationship("PolicyRule", back_populates="violations")
 
 
+class PolicyEvaluationCounter(Base):
+    """Evaluations of one policy rule on one day (UTC), incremented by the evaluator"""
+    __tablename__ = "policy_evaluation_counters"
+
+    policy_rule_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("policy_rules.policy_rule_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    bucket_date = Column(Date, primary_key=True)
+    evaluations = Column(Integer, nullable=False, default=0)
+    passed = Column(Integer, nullable=False, default=0)
+    warned = Column(Integer, nullable=False, default=0)
+    blocked = Column(Integer, nullable=False, default=0)
+    last_evaluated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ControlCrosswalk(Base):
+    """An undirected equivalence between controls of two frameworks"""
+    __tablename__ = "control_crosswalks"
+    __table_args__ = (
+        CheckConstraint("source_control_id <> target_control_id", name="ck_control_crosswalks_distinct"),
+        Index(
+            "uq_control_crosswalks_pair",
+            func.least(text("source_control_id"), text("target_control_id")),
+            func.greatest(text("source_control_id"), text("target_control_id")),
+            unique=True
+        ),
+    )
+
+    crosswalk_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    source_control_id = Column(
+        UUID(as_uuid=True), ForeignKey("controls.control_id", ondelete="CASCADE"), nullable=False
+    )
+    target_control_id = Column(
+        UUID(as_uuid=True), ForeignKey("controls.control_id", ondelete="CASCADE"), nullable=False
+    )
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Relationships
+    source_control = relationship("Control", foreign_keys=[source_control_id])
+    target_control = relationship("Control", foreign_keys=[target_control_id])
+
+
+class PolicyViolationMonthlySummary(Base):
+    """
+    Violations of one policy rule with one gate decision in one UTC month,
+    rolled up from policy_violations so history outlives dropped partitions
+    """
+    __tablename__ = "policy_violation_monthly_summaries"
+    __table_args__ = (
+        Index("ix_policy_violation_monthly_summaries_policy_month", "policy_rule_id", "month"),
+    )
+
+    month = Column(Date, primary_key=True)  # first day of the month
+    policy_rule_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("policy_rules.policy_rule_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    gate_decision = Column(SQLEnum(GateDecision), primary_key=True)
+    violation_count = Column(Integer, nullable=False, default=0)
+    retired_count = Column(Integer, nullable=False, default=0)
+    finding_count = Column(Integer, nullable=False, default=0)
+    rolled_up_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
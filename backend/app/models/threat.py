@@ -1,7 +1,7 @@
 """
 Threat Models
 """
-from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey, Boolean, Enum as SQLEnum, Text, JSON
+from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey, Boolean, Index, ARRAY, Enum as SQLEnum, Text, JSON
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -66,6 +66,10 @@ class ThreatStateHistory(Base):
     threat = relationship("Threat", back_populates="state_history")
     user = relationship("User", foreign_keys=[changed_by])
 
+    __table_args__ = (
+        Index("ix_threat_state_history_threat_id_changed_at", threat_id, changed_at),
+    )
+
 
 class ThreatModelDiagram(Base):
     __tablename__ = "threat_model_diagrams"
@@ -76,6 +80,12 @@ class ThreatModelDiagram(Base):
     description = Column(Text, nullable=True)
     # Store the entire canvas state as JSON
     canvas_data = Column(JSONB, nullable=False)  # Contains nodes, links, positions, etc.
+    revision = Column(Integer, nullable=False, default=1)  # Bumped on every canvas save
+    # Listing summary, kept in step with canvas_data by diagram_service
+    node_count = Column(Integer, nullable=False, default=0)
+    link_count = Column(Integer, nullable=False, default=0)
+    thumbnail_svg = Column(Text, nullable=True)  # Rendered by a worker after each save
+    thumbnail_revision = Column(Integer, nullable=True)
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -85,4 +95,16 @@ class ThreatModelDiagram(Base):
     creator = relationship("User", foreign_keys=[created_by])
 
 
+class DiagramElementState(Base):
+    """Fingerprint of a diagram element as of its last STRIDE threat generation"""
+    __tablename__ = "diagram_element_states"
 
+    diagram_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("threat_model_diagrams.diagram_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    element_key = Column(String(255), primary_key=True)  # "node:<id>" or "link:<id>"
+    fingerprint = Column(String(64), nullable=False)
+    threat_ids = Column(ARRAY(UUID(as_uuid=True)), nullable=False, default=list)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
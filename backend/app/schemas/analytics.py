@@ -0,0 +1,31 @@
+"""
+Analytics Schemas
+"""
+from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+from datetime import date
+
+
+class ClassificationRisk(BaseModel):
+    asset_count: int
+    threat_count: int
+    avg_risk_score: Optional[float] = None
+    max_risk_score: Optional[float] = None
+
+
+class RiskTrendPoint(BaseModel):
+    """Risk posture as of the end of snapshot_date"""
+    snapshot_date: date
+    open_findings_by_severity: Dict[str, int]
+    threat_count: int
+    threat_status_counts: Dict[str, int]
+    risk_by_classification: Dict[str, ClassificationRisk]
+
+    model_config = {"from_attributes": True}
+
+
+class RiskTrendResponse(BaseModel):
+    from_date: date
+    to_date: date
+    granularity: Literal["day", "week", "month"]
+    points: List[RiskTrendPoint]
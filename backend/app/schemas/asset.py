@@ -2,10 +2,13 @@
 Asset Schemas
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from uuid import UUID
 from app.models.asset import AssetType, ClassificationLevel
+from app.schemas.common import PaginatedResponse
+from app.schemas.threat import ThreatResponse
+from app.schemas.finding import FindingResponse
 
 
 class AssetBase(BaseModel):
@@ -34,10 +37,24 @@ class AssetUpdate(BaseModel):
     technology_stack: Optional[List[str]] = None
 
 
+class AssetRiskRollupResponse(BaseModel):
+    """Precomputed finding/threat aggregates for an asset"""
+    open_findings_by_severity: Dict[str, int]
+    threat_count: int
+    threat_status_counts: Dict[str, int]
+    max_risk_score: Optional[float] = None
+    inherited_risk_score: Optional[float] = None
+    inherited_risk_updated_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
 class AssetResponse(AssetBase):
     asset_id: UUID
     sensitivity_score: float
     created_at: datetime
+    risk_rollup: Optional[AssetRiskRollupResponse] = None  # None until the asset has findings or threats
 
     model_config = {"from_attributes": True}
 
@@ -58,6 +75,56 @@ class AssetRelationshipResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class AssetOverviewResponse(BaseModel):
+    """Composite payload for the asset detail page"""
+    asset: AssetResponse
+    relationships: List[AssetRelationshipResponse]
+    threats: PaginatedResponse[ThreatResponse]
+    findings: PaginatedResponse[FindingResponse]
+    open_findings_by_severity: Dict[str, int]
+    threat_status_counts: Dict[str, int]
+
+
+class AttackPathHop(BaseModel):
+    asset_id: UUID
+    name: str
+    type: AssetType
+    classification_level: ClassificationLevel
+    hop_risk: float
+
+
+class AttackPath(BaseModel):
+    path_risk: float  # Product of hop probabilities, 0-100
+    hops: List[AttackPathHop]
+
+
+class AttackPathsResponse(BaseModel):
+    source_asset_id: UUID
+    target_asset_id: UUID
+    graph_version: int
+    paths: List[AttackPath]
+
+
+class TechnologyMatchResponse(BaseModel):
+    """An asset running a matching technology stack component"""
+    asset_id: UUID
+    asset_name: str
+    asset_type: AssetType
+    classification_level: ClassificationLevel
+    owner_id: UUID
+    component: str
+    version: Optional[str] = None
+    raw_entry: str
+
+
+class InheritedRiskRecalculationResponse(BaseModel):
+    """Result of a graph-wide inherited risk recalculation"""
+    assets: int
+    edges: int
+    updated: int
+    duration_ms: float
+
+
 class BulkImportResponse(BaseModel):
     """Response for bulk import operation"""
     total: int
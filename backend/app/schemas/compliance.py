@@ -0,0 +1,153 @@
+"""
+Compliance Schemas
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+import enum
+from app.models.policy import ComplianceFramework, PolicySeverity
+from app.schemas.policy import ControlResponse
+
+
+class ControlStatus(str, enum.Enum):
+    PASSING = "PASSING"
+    WARNING = "WARNING"
+    FAILING = "FAILING"
+    NOT_MAPPED = "NOT_MAPPED"
+
+
+class ComplianceMatrixRule(BaseModel):
+    """An active policy rule mapped to a control, with its active violations"""
+    policy_rule_id: UUID
+    name: str
+    severity: PolicySeverity
+    blocking_violations: int
+    warning_violations: int
+
+
+class ComplianceMatrixControl(BaseModel):
+    control_id: UUID
+    control_code: str
+    description: str
+    status: ControlStatus
+    mapped_rule_count: int
+    blocking_violations: int
+    warning_violations: int
+    rules: List[ComplianceMatrixRule]
+
+
+class ComplianceMatrixResponse(BaseModel):
+    framework: ComplianceFramework
+    total_controls: int
+    mapped_controls: int
+    passing_controls: int
+    warning_controls: int
+    failing_controls: int
+    coverage: Optional[float] = None  # % of controls with at least one active rule
+    compliance_rate: Optional[float] = None  # % of mapped controls that are PASSING
+    refreshed_at: Optional[datetime] = None
+    controls: List[ComplianceMatrixControl]
+
+
+class ControlImportResponse(BaseModel):
+    framework: ComplianceFramework
+    total: int
+    created: int
+    updated: int
+    unchanged: int
+    subset: Optional[bool] = None  # bundled loads only: the bundled file is a subset of the framework
+
+
+class UnmatchedControlMapping(BaseModel):
+    row: int
+    policy_name: str
+    framework: str
+    control_code: str
+    reason: str
+
+
+class ControlMappingImportResponse(BaseModel):
+    total: int
+    created: int
+    existing: int  # already mapped, or repeated in the file
+    unmatched_count: int
+    unmatched: List[UnmatchedControlMapping]  # first rows that named an unknown policy or control
+
+
+class ControlCrosswalkCreate(BaseModel):
+    source_control_id: UUID
+    target_control_id: UUID
+
+
+class ControlCrosswalkResponse(BaseModel):
+    crosswalk_id: UUID
+    source_control_id: UUID
+    target_control_id: UUID
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class CrosswalkLinkedControl(BaseModel):
+    crosswalk_id: UUID
+    control_id: UUID
+    framework: ComplianceFramework
+    control_code: str
+    description: str
+    status: ControlStatus
+
+
+class ControlCrosswalkDetail(BaseModel):
+    """A control, the rules mapped to it and the controls of other frameworks it satisfies"""
+    control: ControlResponse
+    status: ControlStatus
+    rules: List[ComplianceMatrixRule]
+    linked_controls: List[CrosswalkLinkedControl]
+
+
+class UnmatchedControlCrosswalk(BaseModel):
+    row: int
+    source_framework: str
+    source_control_code: str
+    target_framework: str
+    target_control_code: str
+    reason: str
+
+
+class ControlCrosswalkImportResponse(BaseModel):
+    total: int
+    created: int
+    existing: int  # already linked in either direction, or repeated in the file
+    unmatched_count: int
+    unmatched: List[UnmatchedControlCrosswalk]
+
+
+class DerivedLinkedControl(BaseModel):
+    control_id: UUID
+    framework: ComplianceFramework
+    control_code: str
+    status: ControlStatus
+
+
+class DerivedComplianceControl(BaseModel):
+    control_id: UUID
+    control_code: str
+    description: str
+    status: ControlStatus  # worst status of the linked controls that have rules mapped
+    direct_status: ControlStatus  # from rules mapped to this control itself
+    linked_controls: List[DerivedLinkedControl]
+
+
+class DerivedComplianceMatrixResponse(BaseModel):
+    framework: ComplianceFramework
+    source_frameworks: List[ComplianceFramework]
+    total_controls: int
+    covered_controls: int
+    passing_controls: int
+    warning_controls: int
+    failing_controls: int
+    coverage: Optional[float] = None  # % of controls linked to at least one mapped control
+    compliance_rate: Optional[float] = None  # % of covered controls that are PASSING
+    refreshed_at: Optional[datetime] = None
+    controls: List[DerivedComplianceControl]
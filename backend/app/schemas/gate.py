@@ -0,0 +1,52 @@
+"""
+CI/CD Gate Schemas
+"""
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+from app.models.finding import FindingSeverity, FindingStatus
+from app.models.policy import GateDecision, PolicySeverity
+
+
+class GateFindingInput(BaseModel):
+    """A finding reported inline by the pipeline; same fields policies see for stored findings"""
+    finding_id: Optional[str] = None
+    asset_id: Optional[UUID] = None
+    vulnerability_type: str = Field(..., min_length=1)
+    cve_id: Optional[str] = None
+    severity: FindingSeverity
+    status: FindingStatus = FindingStatus.OPEN
+    location: Optional[str] = None
+    scanner_sources: List[str] = []
+
+
+class GateEvaluateRequest(BaseModel):
+    pipeline_run_id: Optional[str] = Field(None, min_length=1, max_length=255)
+    findings: Optional[List[GateFindingInput]] = Field(None, max_length=10000)
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if (self.pipeline_run_id is None) == (self.findings is None):
+            raise ValueError("Provide either pipeline_run_id or findings")
+        return self
+
+
+class GateRuleViolation(BaseModel):
+    policy_rule_id: UUID
+    policy_name: str
+    severity: PolicySeverity
+    gate_decision: GateDecision
+    finding_ids: List[str]
+    messages: List[str]
+
+
+class GateEvaluateResponse(BaseModel):
+    decision: GateDecision
+    pipeline_run_id: Optional[str] = None
+    findings_evaluated: int
+    rules_evaluated: int
+    violations: List[GateRuleViolation]
+    evaluated_at: datetime
+    cached: bool = False
+    duration_ms: float
@@ -0,0 +1,50 @@
+"""
+MITRE ATT&CK Schemas
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class MitreTechniqueResponse(BaseModel):
+    technique_id: str
+    name: str
+    tactics: List[str]  # tactic names
+    parent_id: Optional[str] = None
+    is_subtechnique: bool
+    subtechniques: List[str]
+    url: Optional[str] = None
+
+
+class MitreTacticResponse(BaseModel):
+    tactic_id: str
+    name: str
+    shortname: str
+    techniques: List[str]
+
+
+class TacticTechniqueThreats(BaseModel):
+    technique_id: str
+    name: str
+    threat_count: int
+    max_risk_score: Optional[float] = None
+
+
+class TacticThreats(BaseModel):
+    tactic_id: str
+    name: str
+    shortname: str
+    threat_count: int
+    max_risk_score: Optional[float] = None
+    techniques: List[TacticTechniqueThreats]
+
+
+class UnknownTechniqueThreats(BaseModel):
+    technique_id: str
+    threat_count: int
+
+
+class ThreatsByTacticResponse(BaseModel):
+    tactics: List[TacticThreats]
+    unmapped_threat_count: int  # no technique
+    unknown_threat_count: int = 0  # a well-formed technique id not in the loaded catalog
+    unknown_techniques: List[UnknownTechniqueThreats] = []
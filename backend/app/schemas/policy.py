@@ -3,7 +3,7 @@ Policy Schemas
 """
 from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 from app.models.policy import PolicySeverity, ComplianceFramework, GateDecision
 
@@ -80,6 +80,7 @@ class PolicyViolationResponse(BaseModel):
     policy_rule_id: UUID
     gate_decision: GateDecision
     evaluated_at: datetime
+    retired_at: Optional[datetime] = None
     
     # Enriched fields
     policy_name: Optional[str] = None
@@ -100,3 +101,42 @@ class PolicyTestResponse(BaseModel):
     message: Optional[str] = None
     violations: Optional[List[dict]] = None
 
+
+class PolicyEvaluationTrendPoint(BaseModel):
+    """Evaluation counts for one day"""
+    date: date
+    evaluations: int
+    passed: int
+    warned: int
+    blocked: int
+    pass_rate: Optional[float] = None
+
+
+class PolicyStatisticsResponse(BaseModel):
+    """Evaluation statistics for a policy rule over a window of days"""
+    policy_rule_id: UUID
+    window_days: int
+    violations_count: int
+    controls_mapped_count: int
+    evaluations: int
+    passed: int
+    warned: int
+    blocked: int
+    pass_rate: Optional[float] = None
+    last_evaluated_at: Optional[datetime] = None
+    trend: List[PolicyEvaluationTrendPoint] = []
+
+
+class PolicyViolationHistoryPoint(BaseModel):
+    """Violations recorded in one month"""
+    month: date
+    blocked: int
+    warned: int
+    retired: int
+    findings: int
+
+
+class PolicyViolationHistoryResponse(BaseModel):
+    """Monthly violation history for a policy rule, oldest month first"""
+    policy_rule_id: UUID
+    months: List[PolicyViolationHistoryPoint]
@@ -0,0 +1,77 @@
+"""
+Risk Simulation Schemas
+"""
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+from uuid import UUID
+from app.models.asset import AssetType, ClassificationLevel
+from app.models.threat import STRIDECategory, ThreatStatus
+
+
+class RiskSimulationModification(BaseModel):
+    """
+    One what-if change. The filters select threats (all of them when none
+    are given); the remaining fields say what happens to the selection.
+    CIA deltas change the matched assets and therefore every threat on them,
+    so they can only be scoped by asset filters.
+    """
+    classification_levels: Optional[List[ClassificationLevel]] = None
+    asset_types: Optional[List[AssetType]] = None
+    asset_ids: Optional[List[UUID]] = None
+    stride_categories: Optional[List[STRIDECategory]] = None
+    statuses: Optional[List[ThreatStatus]] = None
+
+    mitigate: bool = False
+    likelihood_delta: int = Field(0, ge=-4, le=4)
+    impact_delta: int = Field(0, ge=-4, le=4)
+    confidentiality_delta: int = Field(0, ge=-4, le=4)
+    integrity_delta: int = Field(0, ge=-4, le=4)
+    availability_delta: int = Field(0, ge=-4, le=4)
+
+    @model_validator(mode="after")
+    def check_modification(self):
+        asset_level = self.confidentiality_delta or self.integrity_delta or self.availability_delta
+        threat_level = self.mitigate or self.likelihood_delta or self.impact_delta
+        if not asset_level and not threat_level:
+            raise ValueError("Modification does not change anything")
+        if asset_level and (self.stride_categories or self.statuses):
+            raise ValueError("CIA deltas cannot be scoped by STRIDE category or threat status")
+        return self
+
+
+class RiskSimulationRequest(BaseModel):
+    modifications: List[RiskSimulationModification] = Field(..., min_length=1, max_length=20)
+
+
+class RiskHistogramBucket(BaseModel):
+    min_score: float
+    max_score: float
+    count: int
+
+
+class RiskHeatmapCell(BaseModel):
+    likelihood: int
+    impact: int
+    count: int
+    risk: str
+
+
+class RiskDistribution(BaseModel):
+    """Statistics over threats that are not MITIGATED"""
+    active_threats: int
+    total_risk: float
+    mean_risk: float
+    max_risk: float
+    p50_risk: float
+    p90_risk: float
+    histogram: List[RiskHistogramBucket]
+    heatmap: List[RiskHeatmapCell]
+
+
+class RiskSimulationResponse(BaseModel):
+    threat_count: int
+    changed_threats: int
+    portfolio_version: int
+    before: RiskDistribution
+    after: RiskDistribution
+    duration_ms: float
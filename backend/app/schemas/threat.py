@@ -1,11 +1,12 @@
 """
 Threat Schemas
 """
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Any, List, Literal, Optional
 from datetime import datetime
 from uuid import UUID
 from app.models.threat import STRIDECategory, ThreatStatus
+from app.core.mitre_attack import validate_technique_id
 
 
 class ThreatBase(BaseModel):
@@ -18,7 +19,11 @@ class ThreatBase(BaseModel):
 
 
 class ThreatCreate(ThreatBase):
-    pass
+    # Validated on input only, so responses still load threats stored before validation existed
+    @field_validator("mitre_attack_id")
+    @classmethod
+    def validate_mitre_attack_id(cls, v: Optional[str]) -> Optional[str]:
+        return validate_technique_id(v)
 
 
 class ThreatUpdate(BaseModel):
@@ -29,6 +34,11 @@ class ThreatUpdate(BaseModel):
     impact_score: Optional[int] = Field(None, ge=1, le=5)
     status: Optional[ThreatStatus] = None
 
+    @field_validator("mitre_attack_id")
+    @classmethod
+    def validate_mitre_attack_id(cls, v: Optional[str]) -> Optional[str]:
+        return validate_technique_id(v)
+
 
 class ThreatResponse(ThreatBase):
     threat_id: UUID
@@ -46,6 +56,38 @@ class ThreatTransition(BaseModel):
     comment: Optional[str] = None
 
 
+class ThreatBulkCreate(BaseModel):
+    threats: List[ThreatCreate] = Field(..., min_length=1, max_length=10000)
+
+
+class ThreatBulkCreateResponse(BaseModel):
+    created: int
+    threat_ids: List[UUID]
+
+
+class ThreatBulkTransition(ThreatTransition):
+    threat_ids: List[UUID] = Field(..., min_length=1, max_length=5000)
+
+
+class ThreatBulkTransitionResponse(BaseModel):
+    """Threats that moved; the rest are listed in errors and left unchanged"""
+    total: int
+    transitioned: List[UUID]
+    errors: List[str]
+
+
+class ThreatStateHistoryResponse(BaseModel):
+    history_id: UUID
+    threat_id: UUID
+    from_state: ThreatStatus
+    to_state: ThreatStatus
+    changed_by: UUID
+    changed_by_name: str
+    changed_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
 # Threat Model Diagram Schemas
 class ThreatModelDiagramBase(BaseModel):
     name: str = Field(..., max_length=255)
@@ -63,9 +105,59 @@ class ThreatModelDiagramUpdate(BaseModel):
     canvas_data: Optional[dict] = None
 
 
+class JsonPatchOperation(BaseModel):
+    """A single RFC 6902 operation"""
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None
+    from_: Optional[str] = Field(None, alias="from")
+
+
+class ThreatModelDiagramPatch(BaseModel):
+    """
+    Incremental canvas save. `operations` are applied to the canvas only if
+    `revision` still matches the stored one; a client that lost the race
+    re-sends its full state as `canvas_data`, which replaces the canvas.
+    """
+    revision: int = Field(..., ge=1)
+    operations: List[JsonPatchOperation] = []
+    canvas_data: Optional[dict] = None
+    name: Optional[str] = Field(None, max_length=255)
+    description: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_operations_or_replace(self):
+        if self.operations and self.canvas_data is not None:
+            raise ValueError("Send either operations or canvas_data, not both")
+        return self
+
+
+class ThreatModelDiagramPatchResponse(BaseModel):
+    """Acknowledgement of a canvas save, without echoing the canvas back"""
+    diagram_id: UUID
+    revision: int
+    updated_at: datetime
+
+
+class ThreatModelDiagramSummary(ThreatModelDiagramBase):
+    """Listing projection: everything but the canvas itself"""
+    diagram_id: UUID
+    revision: int
+    node_count: int
+    link_count: int
+    thumbnail_svg: Optional[str] = None
+    created_by: UUID
+    created_at: datetime
+    updated_at: datetime
+    creator_name: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
+
 class ThreatModelDiagramResponse(ThreatModelDiagramBase):
     diagram_id: UUID
     canvas_data: dict
+    revision: int
     created_by: UUID
     created_at: datetime
     updated_at: datetime
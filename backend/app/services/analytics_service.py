@@ -0,0 +1,98 @@
+"""
+Analytics Service - Daily risk posture snapshots and trend series
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, distinct
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import List, Optional
+from datetime import date, datetime, timezone
+from app.models.analytics import RiskPostureSnapshot
+from app.models.asset import Asset, AssetRiskRollup
+from app.models.threat import Threat
+from app.services.asset_rollup_service import SEVERITY_COLUMNS
+
+TREND_GRANULARITIES = ("day", "week", "month")
+
+
+def capture_risk_snapshot(db: Session, snapshot_date: Optional[date] = None) -> RiskPostureSnapshot:
+    """
+    Record the current risk posture as the snapshot for snapshot_date
+    (today in UTC by default). Re-running for the same day overwrites it.
+    """
+    snapshot_date = snapshot_date or datetime.now(timezone.utc).date()
+
+    # Open finding counts are already maintained per asset in the rollups
+    severity_totals = db.query(
+        *[func.coalesce(func.sum(getattr(AssetRiskRollup, column)), 0) for column in SEVERITY_COLUMNS.values()]
+    ).one()
+
+    threat_status_counts = {
+        status.value: count
+        for status, count in db.query(Threat.status, func.count(Threat.threat_id)).group_by(Threat.status).all()
+    }
+
+    risk_by_classification = {
+        classification.value: {
+            "asset_count": asset_count,
+            "threat_count": threat_count,
+            "avg_risk_score": round(float(avg_risk), 2) if avg_risk is not None else None,
+            "max_risk_score": float(max_risk) if max_risk is not None else None,
+        }
+        for classification, asset_count, threat_count, avg_risk, max_risk in db.query(
+            Asset.classification_level,
+            func.count(distinct(Asset.asset_id)),
+            func.count(Threat.threat_id),
+            func.avg(Threat.risk_score),
+            func.max(Threat.risk_score)
+        ).outerjoin(Threat, Threat.asset_id == Asset.asset_id).group_by(Asset.classification_level).all()
+    }
+
+    values = {
+        "snapshot_date": snapshot_date,
+        **dict(zip(SEVERITY_COLUMNS.values(), severity_totals)),
+        "threat_count": sum(threat_status_counts.values()),
+        "threat_status_counts": threat_status_counts,
+        "risk_by_classification": risk_by_classification,
+    }
+    stmt = pg_insert(RiskPostureSnapshot).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RiskPostureSnapshot.snapshot_date],
+        set_={
+            **{column: stmt.excluded[column] for column in values if column != "snapshot_date"},
+            "captured_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+    db.commit()
+
+    return db.query(RiskPostureSnapshot).filter(RiskPostureSnapshot.snapshot_date == snapshot_date).first()
+
+
+def get_risk_trend(
+    db: Session,
+    start: date,
+    end: date,
+    granularity: str = "day"
+) -> List[RiskPostureSnapshot]:
+    """
+    Snapshots between start and end (inclusive), one per granularity period.
+    Snapshots are point-in-time levels, so each period is represented by
+    its latest snapshot rather than a sum.
+    """
+    if granularity not in TREND_GRANULARITIES:
+        raise ValueError(f"Granularity must be one of: {', '.join(TREND_GRANULARITIES)}")
+    if start > end:
+        raise ValueError("'from' must not be after 'to'")
+
+    query = db.query(RiskPostureSnapshot).filter(
+        RiskPostureSnapshot.snapshot_date >= start,
+        RiskPostureSnapshot.snapshot_date <= end
+    )
+    if granularity == "day":
+        return query.order_by(RiskPostureSnapshot.snapshot_date).all()
+
+    period = func.date_trunc(granularity, RiskPostureSnapshot.snapshot_date)
+    latest = query.distinct(period).order_by(period, RiskPostureSnapshot.snapshot_date.desc()).subquery()
+    return db.query(RiskPostureSnapshot).join(
+        latest, latest.c.snapshot_date == RiskPostureSnapshot.snapshot_date
+    ).order_by(RiskPostureSnapshot.snapshot_date).all()
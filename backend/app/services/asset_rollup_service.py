@@ -0,0 +1,108 @@
+"""
+Asset Risk Rollup Service - Maintains per-asset finding/threat aggregates
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Iterable
+from uuid import UUID
+from app.core.cache import bump_cache_version
+from app.services.attack_path_service import ASSET_GRAPH_CACHE
+from app.models.asset import Asset, AssetRiskRollup
+from app.models.finding import Finding, FindingSeverity, FindingStatus
+from app.models.threat import Threat
+
+# Findings in these statuses still count towards an asset's open exposure
+OPEN_FINDING_STATUSES = (FindingStatus.OPEN, FindingStatus.IN_PROGRESS)
+
+SEVERITY_COLUMNS = {
+    FindingSeverity.CRITICAL: "open_critical_count",
+    FindingSeverity.HIGH: "open_high_count",
+    FindingSeverity.MEDIUM: "open_medium_count",
+    FindingSeverity.LOW: "open_low_count",
+    FindingSeverity.INFO: "open_info_count",
+}
+
+
+def refresh_asset_rollups(db: Session, asset_ids: Iterable) -> None:
+    """
+    Recompute the rollup rows for the given assets.
+
+    Called by the finding and threat services inside their write transaction,
+    so the aggregates are re-read from the (indexed) per-asset rows only and
+    committed together with the change that caused them.
+    """
+    asset_ids = sorted({UUID(str(asset_id)) for asset_id in asset_ids if asset_id is not None})
+    if not asset_ids:
+        return
+
+    # Make pending findings/threats visible to the aggregate queries below
+    db.flush()
+
+    # Serialize concurrent refreshes of the same asset. NO KEY UPDATE does not
+    # conflict with the KEY SHARE locks taken by finding/threat foreign keys.
+    locked = db.query(Asset.asset_id, AssetRiskRollup.max_risk_score).outerjoin(
+        AssetRiskRollup, AssetRiskRollup.asset_id == Asset.asset_id
+    ).filter(
+        Asset.asset_id.in_(asset_ids)
+    ).order_by(Asset.asset_id).with_for_update(key_share=True, of=Asset).all()
+    if not locked:
+        return
+    previous_max_risk = {row.asset_id: row.max_risk_score for row in locked}
+    asset_ids = list(previous_max_risk)
+
+    rollups = {
+        asset_id: {
+            "asset_id": asset_id,
+            **{column: 0 for column in SEVERITY_COLUMNS.values()},
+            "threat_count": 0,
+            "threat_status_counts": {},
+            "max_risk_score": None,
+        }
+        for asset_id in asset_ids
+    }
+
+    finding_counts = db.query(
+        Finding.asset_id,
+        Finding.severity,
+        func.count(Finding.finding_id)
+    ).filter(
+        Finding.asset_id.in_(asset_ids),
+        Finding.status.in_(OPEN_FINDING_STATUSES)
+    ).group_by(Finding.asset_id, Finding.severity).all()
+
+    for asset_id, severity, count in finding_counts:
+        rollups[asset_id][SEVERITY_COLUMNS[severity]] = count
+
+    threat_counts = db.query(
+        Threat.asset_id,
+        Threat.status,
+        func.count(Threat.threat_id),
+        func.max(Threat.risk_score)
+    ).filter(
+        Threat.asset_id.in_(asset_ids)
+    ).group_by(Threat.asset_id, Threat.status).all()
+
+    for asset_id, status, count, max_risk in threat_counts:
+        rollup = rollups[asset_id]
+        rollup["threat_count"] += count
+        rollup["threat_status_counts"][status.value] = count
+        if rollup["max_risk_score"] is None or max_risk > rollup["max_risk_score"]:
+            rollup["max_risk_score"] = max_risk
+
+    stmt = pg_insert(AssetRiskRollup).values(list(rollups.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AssetRiskRollup.asset_id],
+        set_={
+            **{column: stmt.excluded[column] for column in SEVERITY_COLUMNS.values()},
+            "threat_count": stmt.excluded.threat_count,
+            "threat_status_counts": stmt.excluded.threat_status_counts,
+            "max_risk_score": stmt.excluded.max_risk_score,
+            "updated_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+
+    # Attack path hop weights come from max risk, so cached paths are stale
+    if any(rollups[asset_id]["max_risk_score"] != previous_max_risk[asset_id] for asset_id in asset_ids):
+        bump_cache_version(db, ASSET_GRAPH_CACHE)
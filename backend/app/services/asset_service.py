@@ -1,10 +1,17 @@
 """
 Asset Service - Business Logic
 """
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from sqlalchemy import func
 from typing import List, Optional
 from uuid import UUID
-from app.models.asset import Asset, AssetRelationship
+from app.models.asset import Asset, AssetRelationship, AssetRiskRollup
+from app.models.finding import Finding, FindingSeverity
+from app.models.threat import Threat
+from app.core.cache import bump_cache_version
+from app.services.attack_path_service import ASSET_GRAPH_CACHE
+from app.services.technology_service import sync_asset_components
+from app.services.threat_service import THREAT_HEATMAP_CACHE
 from app.schemas.asset import AssetCreate, AssetUpdate
 from decimal import Decimal
 
@@ -32,6 +39,9 @@ def create_asset(db: Session, asset_data: AssetCreate) -> Asset:
     )
     
     db.add(asset)
+    db.flush()
+    sync_asset_components(db, [asset])
+    bump_cache_version(db, ASSET_GRAPH_CACHE)
     db.commit()
     db.refresh(asset)
     return asset
@@ -42,24 +52,98 @@ def get_asset(db: Session, asset_id: str) -> Optional[Asset]:
     return db.query(Asset).filter(Asset.asset_id == asset_id).first()
 
 
+ASSET_SORT_COLUMNS = {
+    "name": Asset.name.asc(),
+    "max_risk_score": AssetRiskRollup.max_risk_score.desc().nullslast(),
+    "inherited_risk_score": AssetRiskRollup.inherited_risk_score.desc().nullslast(),
+}
+
+
 def get_assets(
     db: Session,
     skip: int = 0,
     limit: int = 50,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    sort_by: Optional[str] = None
 ) -> tuple[List[Asset], int]:
     """Get paginated list of assets"""
-    query = db.query(Asset)
+    query = db.query(Asset).outerjoin(AssetRiskRollup, AssetRiskRollup.asset_id == Asset.asset_id)
     
     if search:
         query = query.filter(Asset.name.ilike(f"%{search}%"))
     
     total = query.count()
-    assets = query.offset(skip).limit(limit).all()
+    
+    if sort_by:
+        query = query.order_by(ASSET_SORT_COLUMNS[sort_by], Asset.asset_id)
+    
+    assets = query.options(contains_eager(Asset.risk_rollup)).offset(skip).limit(limit).all()
     
     return assets, total
 
 
+def get_asset_overview(
+    db: Session,
+    asset_id: UUID,
+    threat_skip: int = 0,
+    finding_skip: int = 0,
+    limit: int = 20
+) -> Optional[dict]:
+    """
+    Load everything the asset detail page needs in four queries:
+    asset + rollup, relationships + related assets, one threat page and
+    one finding page (each page carries its total via a window count).
+    """
+    asset = db.query(Asset).options(
+        joinedload(Asset.risk_rollup)
+    ).filter(Asset.asset_id == asset_id).first()
+    if not asset:
+        return None
+    
+    relationships = db.query(AssetRelationship).options(
+        joinedload(AssetRelationship.source_asset),
+        joinedload(AssetRelationship.target_asset)
+    ).filter(
+        (AssetRelationship.source_asset_id == asset_id) |
+        (AssetRelationship.target_asset_id == asset_id)
+    ).all()
+    
+    threat_rows = db.query(Threat, func.count().over().label("total")).filter(
+        Threat.asset_id == asset_id
+    ).order_by(Threat.risk_score.desc(), Threat.threat_id).offset(threat_skip).limit(limit).all()
+    
+    finding_rows = db.query(Finding, func.count().over().label("total")).filter(
+        Finding.asset_id == asset_id
+    ).order_by(
+        Finding.severity.desc(), Finding.first_detected.desc(), Finding.finding_id
+    ).offset(finding_skip).limit(limit).all()
+    
+    rollup = asset.risk_rollup
+    
+    # A page past the end has no rows to carry the window count
+    threat_total = threat_rows[0].total if threat_rows else (rollup.threat_count if rollup else 0)
+    if finding_rows:
+        finding_total = finding_rows[0].total
+    elif finding_skip:
+        finding_total = db.query(Finding).filter(Finding.asset_id == asset_id).count()
+    else:
+        finding_total = 0
+    
+    return {
+        "asset": asset,
+        "relationships": relationships,
+        "threats": [row.Threat for row in threat_rows],
+        "threat_total": threat_total,
+        "findings": [row.Finding for row in finding_rows],
+        "finding_total": finding_total,
+        "open_findings_by_severity": (
+            rollup.open_findings_by_severity if rollup
+            else {severity.value: 0 for severity in FindingSeverity}
+        ),
+        "threat_status_counts": rollup.threat_status_counts if rollup else {},
+    }
+
+
 def update_asset(
     db: Session,
     asset_id: str,
@@ -84,6 +168,17 @@ def update_asset(
     for key, value in update_data.items():
         setattr(asset, key, value)
     
+    if 'technology_stack' in update_data:
+        sync_asset_components(db, [asset])
+    
+    # The heatmap can be filtered by asset classification; the risk
+    # simulation also reads asset type and sensitivity
+    if any(key in update_data for key in ['classification_level', 'type', 'sensitivity_score']):
+        bump_cache_version(db, THREAT_HEATMAP_CACHE)
+    # Attack paths report asset names and types and only target RESTRICTED assets
+    if any(key in update_data for key in ['name', 'type', 'classification_level']):
+        bump_cache_version(db, ASSET_GRAPH_CACHE)
+    
     db.commit()
     db.refresh(asset)
     return asset
@@ -96,6 +191,8 @@ def delete_asset(db: Session, asset_id: str) -> bool:
         return False
     
     db.delete(asset)
+    bump_cache_version(db, THREAT_HEATMAP_CACHE)
+    bump_cache_version(db, ASSET_GRAPH_CACHE)
     db.commit()
     return True
 
@@ -136,6 +233,7 @@ def create_asset_relationship(
     )
     
     db.add(relationship)
+    bump_cache_version(db, ASSET_GRAPH_CACHE)
     db.commit()
     db.refresh(relationship)
     return relationship
@@ -151,6 +249,7 @@ def delete_asset_relationship(db: Session, relationship_id: UUID) -> bool:
         return False
     
     db.delete(relationship)
+    bump_cache_version(db, ASSET_GRAPH_CACHE)
     db.commit()
     return True
 
@@ -167,6 +266,7 @@ def bulk_import_assets(
     created = 0
     updated = 0
     errors = []
+    imported_assets = []
     
     for idx, asset_dict in enumerate(assets_data):
         try:
@@ -204,15 +304,24 @@ def bulk_import_assets(
                 for key, value in asset_data.items():
                     setattr(existing_asset, key, value)
                 existing_asset.sensitivity_score = sensitivity_score
+                imported_assets.append(existing_asset)
                 updated += 1
             else:
                 # Create new asset
                 new_asset = Asset(**asset_data, sensitivity_score=sensitivity_score)
                 db.add(new_asset)
+                imported_assets.append(new_asset)
                 created += 1
                 
         except Exception as e:
             errors.append(f"Row {idx + 1}: {str(e)}")
     
+    db.flush()
+    sync_asset_components(db, imported_assets)
+    if imported_assets:
+        bump_cache_version(db, ASSET_GRAPH_CACHE)
+    # Classification and C/I/A may have changed on existing assets
+    if updated:
+        bump_cache_version(db, THREAT_HEATMAP_CACHE)
     db.commit()
     return created, updated, errors
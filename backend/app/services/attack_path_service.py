@@ -0,0 +1,183 @@
+"""
+Attack Path Service - k highest-risk paths over the asset graph
+"""
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+import heapq
+import math
+from app.core.cache import LRUCache, get_cache_version
+from app.models.asset import Asset, AssetRelationship, AssetRiskRollup, ClassificationLevel, RelationshipType
+
+# Bumped on asset and relationship writes and whenever an asset's max threat risk changes
+ASSET_GRAPH_CACHE = "asset_graph"
+
+# Assets without threats are still traversable, just unlikely hops
+MIN_HOP_RISK = 1.0
+
+_path_cache = LRUCache(maxsize=512)
+
+
+def _shortest_path(
+    adjacency: Dict[UUID, List[UUID]],
+    hop_cost: Dict[UUID, float],
+    source: UUID,
+    target: UUID,
+    removed_edges: Set[Tuple[UUID, UUID]],
+    removed_nodes: Set[UUID]
+) -> Optional[Tuple[float, List[UUID]]]:
+    """Dijkstra where entering an asset costs -log(hop probability)"""
+    distances = {source: 0.0}
+    previous: Dict[UUID, UUID] = {}
+    visited: Set[UUID] = set()
+    heap = [(0.0, 0, source)]
+    counter = 1
+
+    while heap:
+        distance, _, node = heapq.heappop(heap)
+        if node in visited:
+            continue
+        visited.add(node)
+        if node == target:
+            break
+        for neighbour in adjacency.get(node, ()):
+            if neighbour in removed_nodes or (node, neighbour) in removed_edges:
+                continue
+            candidate = distance + hop_cost[neighbour]
+            if candidate < distances.get(neighbour, math.inf):
+                distances[neighbour] = candidate
+                previous[neighbour] = node
+                heapq.heappush(heap, (candidate, counter, neighbour))
+                counter += 1
+
+    if target not in visited:
+        return None
+
+    path = [target]
+    while path[-1] != source:
+        path.append(previous[path[-1]])
+    path.reverse()
+    return distances[target], path
+
+
+def k_highest_risk_paths(
+    adjacency: Dict[UUID, List[UUID]],
+    hop_cost: Dict[UUID, float],
+    source: UUID,
+    target: UUID,
+    k: int
+) -> List[Tuple[float, List[UUID]]]:
+    """Yen's algorithm: the k loop-free paths with the lowest total cost"""
+    first = _shortest_path(adjacency, hop_cost, source, target, set(), set())
+    if first is None:
+        return []
+
+    found = [first]
+    seen = {tuple(first[1])}
+    candidates: List[Tuple[float, List[UUID]]] = []
+
+    while len(found) < k:
+        _, last_path = found[-1]
+        for index in range(len(last_path) - 1):
+            spur_node = last_path[index]
+            root_path = last_path[:index + 1]
+            removed_edges = {
+                (path[index], path[index + 1])
+                for _, path in found
+                if len(path) > index + 1 and path[:index + 1] == root_path
+            }
+            spur = _shortest_path(adjacency, hop_cost, spur_node, target, removed_edges, set(root_path[:-1]))
+            if spur is None:
+                continue
+            total_path = root_path[:-1] + spur[1]
+            if tuple(total_path) in seen:
+                continue
+            seen.add(tuple(total_path))
+            root_cost = sum(hop_cost[node] for node in root_path[1:])
+            heapq.heappush(candidates, (root_cost + spur[0], total_path))
+
+        if not candidates:
+            break
+        found.append(heapq.heappop(candidates))
+
+    return found
+
+
+def find_attack_paths(
+    db: Session,
+    source_asset_id: UUID,
+    target_asset_id: UUID,
+    k: int = 3
+) -> Optional[dict]:
+    """
+    Compute the k highest-risk attack paths from an entry asset to a
+    RESTRICTED asset. Each hop's probability is the hop asset's max threat
+    risk / 100 and a path's risk is the product over its hops.
+    Results are cached per asset graph version.
+    """
+    if source_asset_id == target_asset_id:
+        raise ValueError("Source and target assets must differ")
+
+    graph_version = get_cache_version(db, ASSET_GRAPH_CACHE)
+    cache_key = (graph_version, source_asset_id, target_asset_id, k)
+    cached = _path_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    assets = {
+        row.asset_id: row
+        for row in db.query(
+            Asset.asset_id,
+            Asset.name,
+            Asset.type,
+            Asset.classification_level,
+            AssetRiskRollup.max_risk_score
+        ).outerjoin(AssetRiskRollup, AssetRiskRollup.asset_id == Asset.asset_id).all()
+    }
+
+    if source_asset_id not in assets or target_asset_id not in assets:
+        return None
+    if assets[target_asset_id].classification_level != ClassificationLevel.RESTRICTED:
+        raise ValueError("Target asset must have RESTRICTED classification")
+
+    adjacency: Dict[UUID, List[UUID]] = {}
+    edges = db.query(
+        AssetRelationship.source_asset_id,
+        AssetRelationship.target_asset_id,
+        AssetRelationship.relationship_type
+    ).all()
+    for source, target, relationship_type in edges:
+        adjacency.setdefault(source, []).append(target)
+        if relationship_type == RelationshipType.COMMUNICATES_WITH:
+            adjacency.setdefault(target, []).append(source)
+
+    hop_risk = {
+        asset_id: max(float(row.max_risk_score or 0), MIN_HOP_RISK) / 100.0
+        for asset_id, row in assets.items()
+    }
+    hop_cost = {asset_id: -math.log(risk) for asset_id, risk in hop_risk.items()}
+
+    paths = []
+    for cost, path in k_highest_risk_paths(adjacency, hop_cost, source_asset_id, target_asset_id, k):
+        paths.append({
+            "path_risk": round(math.exp(-cost) * 100.0, 4),
+            "hops": [
+                {
+                    "asset_id": asset_id,
+                    "name": assets[asset_id].name,
+                    "type": assets[asset_id].type,
+                    "classification_level": assets[asset_id].classification_level,
+                    "hop_risk": round(hop_risk[asset_id] * 100.0, 2),
+                }
+                for asset_id in path
+            ],
+        })
+
+    result = {
+        "source_asset_id": source_asset_id,
+        "target_asset_id": target_asset_id,
+        "graph_version": graph_version,
+        "paths": paths,
+    }
+    _path_cache.set(cache_key, result)
+    return result
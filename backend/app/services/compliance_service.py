@@ -0,0 +1,98 @@
+"""
+Compliance Service - Control coverage per compliance framework
+
+The per-control status (mapped active rules and their active violations)
+lives in the compliance_control_status materialized view, refreshed
+concurrently after policy evaluation runs. Readers never join findings or
+violations; a matrix is one indexed read of the view, cached in process
+until the next refresh bumps the compliance_matrix cache version.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import List, Optional, Tuple
+from app.core.cache import LRUCache, bump_cache_version
+from app.models.cache import CacheVersion
+from app.models.policy import ComplianceFramework, Control
+
+# Bumped by every refresh of the materialized view
+COMPLIANCE_MATRIX_CACHE = "compliance_matrix"
+
+_matrices = LRUCache(maxsize=32)
+
+
+def get_controls(
+    db: Session,
+    framework: Optional[ComplianceFramework] = None,
+    search: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50
+) -> Tuple[List[Control], int]:
+    """Get paginated list of controls"""
+    query = db.query(Control)
+    
+    if framework:
+        query = query.filter(Control.framework == framework)
+    
+    if search:
+        query = query.filter(
+            Control.control_code.ilike(f"%{search}%") | Control.description.ilike(f"%{search}%")
+        )
+    
+    total = query.count()
+    controls = query.order_by(Control.framework, Control.control_code).offset(skip).limit(limit).all()
+    
+    return controls, total
+
+
+def refresh_compliance_matrix(db: Session) -> None:
+    """
+    Recompute the control status view without blocking readers. Concurrent
+    refreshes queue behind each other on the view's lock. Commits.
+    """
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY compliance_control_status"))
+    bump_cache_version(db, COMPLIANCE_MATRIX_CACHE)
+    db.commit()
+
+
+def _percentage(part: int, whole: int) -> Optional[float]:
+    return round(part / whole * 100, 2) if whole else None
+
+
+def _compute_matrix(db: Session, framework: ComplianceFramework) -> dict:
+    rows = db.execute(text("""
+        SELECT control_id, control_code, description, status, mapped_rule_count,
+               blocking_violations, warning_violations, rules
+        FROM compliance_control_status
+        WHERE framework = :framework
+        ORDER BY control_code
+    """), {"framework": framework.value}).mappings().all()
+
+    controls = [dict(row) for row in rows]
+    counts = {"PASSING": 0, "WARNING": 0, "FAILING": 0, "NOT_MAPPED": 0}
+    for control in controls:
+        counts[control["status"]] += 1
+    mapped = len(controls) - counts["NOT_MAPPED"]
+    return {
+        "framework": framework,
+        "total_controls": len(controls),
+        "mapped_controls": mapped,
+        "passing_controls": counts["PASSING"],
+        "warning_controls": counts["WARNING"],
+        "failing_controls": counts["FAILING"],
+        "coverage": _percentage(mapped, len(controls)),
+        "compliance_rate": _percentage(counts["PASSING"], mapped),
+        "controls": controls,
+    }
+
+
+def get_compliance_matrix(db: Session, framework: ComplianceFramework) -> dict:
+    """
+    Every control of a framework with its mapped rules, violation counts and
+    status (PASSING, WARNING, FAILING or NOT_MAPPED), as of the last refresh
+    """
+    state = db.query(CacheVersion.version, CacheVersion.updated_at).filter(
+        CacheVersion.name == COMPLIANCE_MATRIX_CACHE
+    ).first()
+    version, refreshed_at = state if state else (0, None)
+    matrix = _matrices.get_or_compute((version, framework), lambda: _compute_matrix(db, framework))
+    return {**matrix, "refreshed_at": refreshed_at}
@@ -0,0 +1,235 @@
+"""
+Crosswalk Service - Cross-framework control equivalences
+
+Crosswalk links are undirected. Each process keeps a bidirectional
+adjacency index (control -> linked controls) built in one query and keyed
+by the control_crosswalk cache version, which every crosswalk write bumps.
+Coverage for one framework is derived from the compliance matrices already
+computed for the others: a control takes the worst status of the mapped
+controls it is linked to, so no policy is re-evaluated.
+"""
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import or_
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from dataclasses import dataclass
+from app.core.cache import LRUCache, bump_cache_version, get_cache_version
+from app.models.policy import ComplianceFramework, Control, ControlCrosswalk
+from app.services.compliance_service import get_compliance_matrix
+
+# Bumped by every crosswalk create, delete and bulk load
+CONTROL_CROSSWALK_CACHE = "control_crosswalk"
+
+# Worst first; NOT_MAPPED controls say nothing about a linked control
+STATUS_PRECEDENCE = ("FAILING", "WARNING", "PASSING")
+
+_indexes = LRUCache(maxsize=2)
+
+
+@dataclass(frozen=True)
+class CrosswalkControl:
+    control_id: UUID
+    framework: ComplianceFramework
+    control_code: str
+    description: str
+
+
+class CrosswalkIndex:
+    """Bidirectional adjacency over crosswalked controls"""
+
+    def __init__(self, controls: Dict[UUID, CrosswalkControl], links: Dict[UUID, Dict[UUID, UUID]]):
+        self.controls = controls
+        self._links = links  # control_id -> {linked control_id: crosswalk_id}
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple[UUID, CrosswalkControl, CrosswalkControl]]) -> "CrosswalkIndex":
+        controls: Dict[UUID, CrosswalkControl] = {}
+        links: Dict[UUID, Dict[UUID, UUID]] = {}
+        for crosswalk_id, source, target in rows:
+            controls[source.control_id] = source
+            controls[target.control_id] = target
+            links.setdefault(source.control_id, {})[target.control_id] = crosswalk_id
+            links.setdefault(target.control_id, {})[source.control_id] = crosswalk_id
+        return cls(controls, links)
+
+    def linked(
+        self,
+        control_id: UUID,
+        frameworks: Optional[Sequence[ComplianceFramework]] = None
+    ) -> List[Tuple[UUID, CrosswalkControl]]:
+        """(crosswalk_id, control) pairs linked to a control, by framework and code"""
+        linked = [
+            (crosswalk_id, self.controls[linked_id])
+            for linked_id, crosswalk_id in self._links.get(control_id, {}).items()
+            if frameworks is None or self.controls[linked_id].framework in frameworks
+        ]
+        return sorted(linked, key=lambda pair: (pair[1].framework.value, pair[1].control_code))
+
+
+def _control(control: Control) -> CrosswalkControl:
+    return CrosswalkControl(control.control_id, control.framework, control.control_code, control.description)
+
+
+def _load_index(db: Session) -> CrosswalkIndex:
+    source = aliased(Control)
+    target = aliased(Control)
+    rows = db.query(ControlCrosswalk.crosswalk_id, source, target).join(
+        source, source.control_id == ControlCrosswalk.source_control_id
+    ).join(
+        target, target.control_id == ControlCrosswalk.target_control_id
+    ).all()
+    return CrosswalkIndex.from_rows([
+        (crosswalk_id, _control(source_control), _control(target_control))
+        for crosswalk_id, source_control, target_control in rows
+    ])
+
+
+def get_crosswalk_index(db: Session) -> CrosswalkIndex:
+    """The process-wide crosswalk index for the current crosswalk version"""
+    version = get_cache_version(db, CONTROL_CROSSWALK_CACHE)
+    return _indexes.get_or_compute(version, lambda: _load_index(db))
+
+
+def create_crosswalk(db: Session, source_control_id: UUID, target_control_id: UUID) -> Optional[ControlCrosswalk]:
+    """Link two controls of different frameworks; None if either control does not exist"""
+    controls = {
+        control.control_id: control
+        for control in db.query(Control).filter(Control.control_id.in_([source_control_id, target_control_id]))
+    }
+    if source_control_id not in controls or target_control_id not in controls:
+        return None
+    if controls[source_control_id].framework == controls[target_control_id].framework:
+        raise ValueError("Crosswalks link controls of different frameworks")
+
+    existing = db.query(ControlCrosswalk).filter(or_(
+        (ControlCrosswalk.source_control_id == source_control_id) &
+        (ControlCrosswalk.target_control_id == target_control_id),
+        (ControlCrosswalk.source_control_id == target_control_id) &
+        (ControlCrosswalk.target_control_id == source_control_id)
+    )).first()
+    if existing:
+        raise ValueError("Controls are already linked")
+
+    crosswalk = ControlCrosswalk(source_control_id=source_control_id, target_control_id=target_control_id)
+    db.add(crosswalk)
+    bump_cache_version(db, CONTROL_CROSSWALK_CACHE)
+    db.commit()
+    db.refresh(crosswalk)
+
+    return crosswalk
+
+
+def delete_crosswalk(db: Session, crosswalk_id: UUID) -> bool:
+    """Remove a crosswalk link"""
+    crosswalk = db.query(ControlCrosswalk).filter(ControlCrosswalk.crosswalk_id == crosswalk_id).first()
+    if not crosswalk:
+        return False
+
+    db.delete(crosswalk)
+    bump_cache_version(db, CONTROL_CROSSWALK_CACHE)
+    db.commit()
+
+    return True
+
+
+def get_linked_controls(
+    db: Session,
+    control_id: UUID,
+    framework: Optional[ComplianceFramework] = None
+) -> Optional[dict]:
+    """
+    A control, the policy rules mapped to it and the controls it is linked
+    to (optionally of one framework) with their status. None if the control
+    does not exist.
+    """
+    control = db.query(Control).filter(Control.control_id == control_id).first()
+    if not control:
+        return None
+
+    linked = get_crosswalk_index(db).linked(control_id, [framework] if framework else None)
+    statuses = _control_statuses(db, {control.framework} | {linked_control.framework for _, linked_control in linked})
+    own = statuses.get(control_id, {})
+    return {
+        "control": control,
+        "status": own.get("status", "NOT_MAPPED"),
+        "rules": own.get("rules", []),
+        "linked_controls": [
+            {
+                "crosswalk_id": crosswalk_id,
+                "control_id": linked_control.control_id,
+                "framework": linked_control.framework,
+                "control_code": linked_control.control_code,
+                "description": linked_control.description,
+                "status": statuses.get(linked_control.control_id, {}).get("status", "NOT_MAPPED"),
+            }
+            for crosswalk_id, linked_control in linked
+        ],
+    }
+
+
+def _control_statuses(db: Session, frameworks) -> Dict[UUID, dict]:
+    """control_id -> compliance matrix row, from the cached matrices of the frameworks"""
+    statuses = {}
+    for framework in frameworks:
+        for control in get_compliance_matrix(db, framework)["controls"]:
+            statuses[control["control_id"]] = control
+    return statuses
+
+
+def derive_compliance_matrix(
+    db: Session,
+    framework: ComplianceFramework,
+    source_frameworks: Optional[Sequence[ComplianceFramework]] = None
+) -> dict:
+    """
+    Coverage of a framework carried over through crosswalks: each control
+    takes the worst status (FAILING, WARNING, PASSING) of its linked
+    controls in the source frameworks (default: every other framework) that
+    have rules mapped, or NOT_MAPPED when none do. Its direct status is
+    reported alongside.
+    """
+    sources = [
+        source for source in (source_frameworks or list(ComplianceFramework)) if source != framework
+    ]
+    target = get_compliance_matrix(db, framework)
+    statuses = _control_statuses(db, sources)
+    index = get_crosswalk_index(db)
+
+    controls = []
+    counts = {"PASSING": 0, "WARNING": 0, "FAILING": 0, "NOT_MAPPED": 0}
+    for control in target["controls"]:
+        linked = [
+            {
+                "control_id": linked_control.control_id,
+                "framework": linked_control.framework,
+                "control_code": linked_control.control_code,
+                "status": statuses.get(linked_control.control_id, {}).get("status", "NOT_MAPPED"),
+            }
+            for _, linked_control in index.linked(control["control_id"], sources)
+        ]
+        linked_statuses = {linked_control["status"] for linked_control in linked}
+        status = next((candidate for candidate in STATUS_PRECEDENCE if candidate in linked_statuses), "NOT_MAPPED")
+        counts[status] += 1
+        controls.append({
+            "control_id": control["control_id"],
+            "control_code": control["control_code"],
+            "description": control["description"],
+            "status": status,
+            "direct_status": control["status"],
+            "linked_controls": linked,
+        })
+
+    covered = len(controls) - counts["NOT_MAPPED"]
+    return {
+        "framework": framework,
+        "source_frameworks": sources,
+        "total_controls": len(controls),
+        "covered_controls": covered,
+        "passing_controls": counts["PASSING"],
+        "warning_controls": counts["WARNING"],
+        "failing_controls": counts["FAILING"],
+        "coverage": round(covered / len(controls) * 100, 2) if controls else None,
+        "compliance_rate": round(counts["PASSING"] / covered * 100, 2) if covered else None,
+        "refreshed_at": target["refreshed_at"],
+        "controls": controls,
+    }
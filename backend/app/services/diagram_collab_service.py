@@ -0,0 +1,236 @@
+"""
+Diagram Collaboration Service - Real-time multi-editor diagram sessions
+
+Every API worker keeps one DiagramRoom per diagram that has local editors.
+Operations from an editor are appended to the diagram's pending log (a
+Redis list) and published on its channel in one MULTI, so every worker
+sees them in the same order as the log. Rooms relay channel messages to
+their local sockets in batches, and whichever worker holds the diagram's
+flush lock applies the pending log to Postgres every
+DIAGRAM_COLLAB_FLUSH_SECONDS.
+"""
+from fastapi import WebSocket
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
+import asyncio
+import json
+import logging
+import redis.asyncio as aioredis
+from redis.exceptions import LockError
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.threat import ThreatModelDiagram
+from app.services.diagram_service import apply_diagram_operations, queue_thumbnail_render
+
+logger = logging.getLogger(__name__)
+
+# A flush holds the lock for one DB transaction; the timeout only matters if a worker dies mid-flush
+FLUSH_LOCK_TIMEOUT_SECONDS = 30
+
+
+def _load_canvas(diagram_id: UUID) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        row = db.query(
+            ThreatModelDiagram.canvas_data,
+            ThreatModelDiagram.revision
+        ).filter(ThreatModelDiagram.diagram_id == diagram_id).first()
+        return {"canvas_data": row.canvas_data, "revision": row.revision} if row else None
+    finally:
+        db.close()
+
+
+def _persist_operations(diagram_id: UUID, operations: List[dict]) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        result = apply_diagram_operations(db, diagram_id, operations)
+    finally:
+        db.close()
+    if result:
+        queue_thumbnail_render(diagram_id)
+    return result
+
+
+class DiagramRoom:
+    """The editors of one diagram connected to this worker"""
+
+    def __init__(self, redis: aioredis.Redis, diagram_id: UUID):
+        self.redis = redis
+        self.diagram_id = diagram_id
+        self.clients: Dict[str, WebSocket] = {}
+        self._outbox: List[dict] = []
+        self._pubsub = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def channel(self) -> str:
+        return f"diagram:{self.diagram_id}:events"
+
+    @property
+    def log_key(self) -> str:
+        return f"diagram:{self.diagram_id}:pending"
+
+    @property
+    def lock_key(self) -> str:
+        return f"diagram:{self.diagram_id}:flush-lock"
+
+    async def start(self) -> None:
+        self._pubsub = self.redis.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._tasks = [
+            asyncio.create_task(self._relay()),
+            asyncio.create_task(self._broadcast_loop()),
+            asyncio.create_task(self._flush_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._pubsub.unsubscribe(self.channel)
+        await self._pubsub.aclose()
+        # Persist what is pending now rather than waiting for another editor
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Final flush of diagram {self.diagram_id} failed: {e}")
+
+    async def snapshot(self, client_id: str) -> Optional[dict]:
+        """
+        Persisted canvas plus the operations not yet flushed into it. Taken
+        under the flush lock so no operation is both persisted and pending.
+        Events listed in `pending` may also arrive in the first batches;
+        clients skip events whose id they have already applied.
+        """
+        async with self.redis.lock(self.lock_key, timeout=FLUSH_LOCK_TIMEOUT_SECONDS, blocking_timeout=10):
+            diagram = await run_in_threadpool(_load_canvas, self.diagram_id)
+            entries = await self.redis.lrange(self.log_key, 0, -1)
+        if diagram is None:
+            return None
+        return {
+            "type": "snapshot",
+            "client_id": client_id,
+            "revision": diagram["revision"],
+            "canvas_data": diagram["canvas_data"],
+            "pending": [json.loads(entry) for entry in entries],
+        }
+
+    async def submit(self, client_id: str, user_id: UUID, operations: List[dict]) -> dict:
+        """Append operations to the pending log and fan them out to every worker"""
+        event = {
+            "type": "ops",
+            "id": uuid4().hex,
+            "client_id": client_id,
+            "user_id": str(user_id),
+            "operations": operations,
+        }
+        payload = json.dumps(event)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(self.log_key, payload)
+            pipe.publish(self.channel, payload)
+            await pipe.execute()
+        return event
+
+    async def flush(self) -> Optional[dict]:
+        """Apply the pending log to Postgres if no other worker is doing so"""
+        lock = self.redis.lock(self.lock_key, timeout=FLUSH_LOCK_TIMEOUT_SECONDS)
+        if not await lock.acquire(blocking=False):
+            return None
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.lrange(self.log_key, 0, -1)
+                pipe.delete(self.log_key)
+                entries, _ = await pipe.execute()
+            if not entries:
+                return None
+
+            operations = [operation for entry in entries for operation in json.loads(entry)["operations"]]
+            try:
+                result = await run_in_threadpool(_persist_operations, self.diagram_id, operations)
+            except Exception:
+                # Put the batch back in front of anything submitted meanwhile
+                await self.redis.lpush(self.log_key, *reversed(entries))
+                raise
+
+            if result:
+                await self.redis.publish(self.channel, json.dumps({
+                    "type": "saved",
+                    "revision": result["revision"],
+                    "skipped": result["skipped"],
+                }))
+            return result
+        finally:
+            try:
+                await lock.release()
+            except LockError:
+                pass
+
+    async def _relay(self) -> None:
+        async for message in self._pubsub.listen():
+            if message["type"] == "message":
+                self._outbox.append(json.loads(message["data"]))
+
+    async def _broadcast_loop(self) -> None:
+        interval = settings.DIAGRAM_COLLAB_BROADCAST_INTERVAL_MS / 1000
+        while True:
+            await asyncio.sleep(interval)
+            if self._outbox:
+                batch, self._outbox = self._outbox, []
+                await self._broadcast(batch)
+
+    async def _broadcast(self, batch: List[dict]) -> None:
+        for client_id, websocket in list(self.clients.items()):
+            # Editors already applied their own operations locally
+            events = [event for event in batch if event.get("client_id") != client_id]
+            if not events:
+                continue
+            try:
+                await websocket.send_json({"type": "batch", "events": events})
+            except Exception:
+                self.clients.pop(client_id, None)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.DIAGRAM_COLLAB_FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Flushing diagram {self.diagram_id} failed: {e}")
+
+
+class DiagramCollabHub:
+    """Per-worker registry of active diagram rooms"""
+
+    def __init__(self, redis: Optional[aioredis.Redis] = None):
+        self._redis = redis
+        self.rooms: Dict[UUID, DiagramRoom] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.Redis.from_url(settings.REDIS_URL)
+        return self._redis
+
+    async def join(self, diagram_id: UUID, websocket: WebSocket) -> tuple:
+        async with self._lock:
+            room = self.rooms.get(diagram_id)
+            if room is None:
+                room = DiagramRoom(self.redis, diagram_id)
+                await room.start()
+                self.rooms[diagram_id] = room
+            client_id = uuid4().hex
+            room.clients[client_id] = websocket
+        return room, client_id
+
+    async def leave(self, room: DiagramRoom, client_id: str) -> None:
+        async with self._lock:
+            room.clients.pop(client_id, None)
+            if room.clients or self.rooms.get(room.diagram_id) is not room:
+                return
+            del self.rooms[room.diagram_id]
+        await room.stop()
+
+
+collab_hub = DiagramCollabHub()
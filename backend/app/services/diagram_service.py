@@ -0,0 +1,264 @@
+"""
+Diagram Service - Threat model diagram canvas persistence
+"""
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime, timezone
+import logging
+from app.core.json_patch import JsonPatchError, apply_json_patch
+from app.models.threat import ThreatModelDiagram
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTH = 240
+THUMBNAIL_HEIGHT = 150
+THUMBNAIL_PADDING = 6
+MAX_THUMBNAIL_ELEMENTS = 900
+
+# Canvas defaults when a node has no explicit size
+DEFAULT_NODE_SIZE = (120.0, 80.0)
+
+# (fill, stroke) per canvas node type
+NODE_COLOURS = {
+    "asset": ("#dbeafe", "#3b82f6"),
+    "threat": ("#fee2e2", "#ef4444"),
+    "trust-boundary": ("none", "#f59e0b"),
+}
+LINK_COLOUR = "#94a3b8"
+
+
+class DiagramRevisionConflict(ValueError):
+    """The client patched a canvas revision that is no longer current"""
+
+    def __init__(self, current_revision: int):
+        super().__init__(f"Diagram has been modified (current revision {current_revision})")
+        self.current_revision = current_revision
+
+
+def patch_diagram(
+    db: Session,
+    diagram_id: UUID,
+    revision: int,
+    operations: List[dict],
+    canvas_data: Optional[dict] = None,
+    name: Optional[str] = None,
+    description: Optional[str] = None
+) -> Optional[dict]:
+    """
+    Apply JSON Patch operations to a diagram canvas under optimistic locking.
+    Returns the new revision rather than the diagram so that the saved
+    canvas is not reloaded after commit.
+
+    The row is locked for the read-modify-write so concurrent patches against
+    the same revision serialize and the loser gets DiagramRevisionConflict.
+    A full `canvas_data` replace is the conflict fallback and is accepted
+    regardless of revision. JSON Patch failures raise JsonPatchError.
+    """
+    diagram = db.query(ThreatModelDiagram).filter(
+        ThreatModelDiagram.diagram_id == diagram_id
+    ).with_for_update().first()
+    if not diagram:
+        return None
+
+    if canvas_data is not None:
+        diagram.canvas_data = canvas_data
+        diagram.revision += 1
+        update_canvas_counts(diagram)
+    elif operations:
+        if revision != diagram.revision:
+            db.rollback()
+            raise DiagramRevisionConflict(diagram.revision)
+        try:
+            diagram.canvas_data = apply_json_patch(diagram.canvas_data, operations)
+        except ValueError:
+            db.rollback()
+            raise
+        diagram.revision += 1
+        update_canvas_counts(diagram)
+
+    if name is not None:
+        diagram.name = name
+    if description is not None:
+        diagram.description = description
+
+    result = {
+        "diagram_id": diagram.diagram_id,
+        "revision": diagram.revision,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    diagram.updated_at = result["updated_at"]
+    db.commit()
+    return result
+
+
+def apply_diagram_operations(
+    db: Session,
+    diagram_id: UUID,
+    operations: List[dict]
+) -> Optional[dict]:
+    """
+    Persist operations from a collaborative session. Concurrent editors'
+    operations arrive already ordered, so there is no revision check;
+    operations that no longer apply (e.g. to a node another editor removed)
+    are skipped individually instead of failing the batch.
+    """
+    diagram = db.query(ThreatModelDiagram).filter(
+        ThreatModelDiagram.diagram_id == diagram_id
+    ).with_for_update().first()
+    if not diagram:
+        return None
+
+    canvas = diagram.canvas_data
+    skipped = 0
+    for operation in operations:
+        try:
+            canvas = apply_json_patch(canvas, [operation])
+        except JsonPatchError:
+            skipped += 1
+
+    diagram.canvas_data = canvas
+    diagram.revision += 1
+    update_canvas_counts(diagram)
+
+    result = {
+        "diagram_id": diagram.diagram_id,
+        "revision": diagram.revision,
+        "updated_at": datetime.now(timezone.utc),
+        "skipped": skipped,
+    }
+    diagram.updated_at = result["updated_at"]
+    db.commit()
+    return result
+
+
+def update_canvas_counts(diagram: ThreatModelDiagram) -> None:
+    """Keep the listing node/link counts in step with canvas_data"""
+    canvas = diagram.canvas_data if isinstance(diagram.canvas_data, dict) else {}
+    nodes = canvas.get("nodes")
+    links = canvas.get("links")
+    diagram.node_count = len(nodes) if isinstance(nodes, list) else 0
+    diagram.link_count = len(links) if isinstance(links, list) else 0
+
+
+def render_canvas_thumbnail(canvas_data: dict) -> str:
+    """
+    Render a small SVG overview of a canvas: links as lines, nodes as boxes
+    coloured by type, one <path> per kind. Coordinates are snapped to the
+    thumbnail pixel grid and duplicates dropped, so the SVG stays a few KB
+    however large the canvas is.
+    """
+    canvas = canvas_data if isinstance(canvas_data, dict) else {}
+    nodes = [node for node in canvas.get("nodes") or [] if isinstance(node, dict)]
+    links = [link for link in canvas.get("links") or [] if isinstance(link, dict)]
+
+    header = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{THUMBNAIL_WIDTH}" '
+        f'height="{THUMBNAIL_HEIGHT}" viewBox="0 0 {THUMBNAIL_WIDTH} {THUMBNAIL_HEIGHT}">'
+    )
+    boxes = {}
+    for node in nodes:
+        try:
+            x = float(node.get("x") or 0)
+            y = float(node.get("y") or 0)
+            width = float(node.get("width") or DEFAULT_NODE_SIZE[0])
+            height = float(node.get("height") or DEFAULT_NODE_SIZE[1])
+        except (TypeError, ValueError):
+            continue
+        node_type = node.get("type") if node.get("type") in NODE_COLOURS else "asset"
+        boxes[node.get("id")] = (x, y, width, height, node_type)
+    if not boxes:
+        return header + "</svg>"
+
+    min_x = min(box[0] for box in boxes.values())
+    min_y = min(box[1] for box in boxes.values())
+    max_x = max(box[0] + box[2] for box in boxes.values())
+    max_y = max(box[1] + box[3] for box in boxes.values())
+    scale = min(
+        (THUMBNAIL_WIDTH - 2 * THUMBNAIL_PADDING) / max(max_x - min_x, 1.0),
+        (THUMBNAIL_HEIGHT - 2 * THUMBNAIL_PADDING) / max(max_y - min_y, 1.0)
+    )
+
+    def project(x: float, y: float) -> tuple:
+        return (
+            round(THUMBNAIL_PADDING + (x - min_x) * scale),
+            round(THUMBNAIL_PADDING + (y - min_y) * scale)
+        )
+
+    # Dicts rather than sets keep segments in canvas order
+    segments = {"link": {}}
+    budget = MAX_THUMBNAIL_ELEMENTS // 3
+    for link in links:
+        source = boxes.get(link.get("source"))
+        target = boxes.get(link.get("target"))
+        if not source or not target:
+            continue
+        x1, y1 = project(source[0] + source[2] / 2, source[1] + source[3] / 2)
+        x2, y2 = project(target[0] + target[2] / 2, target[1] + target[3] / 2)
+        segments["link"].setdefault(f"M{x1} {y1}L{x2} {y2}", None)
+        if len(segments["link"]) >= budget:
+            break
+
+    budget = MAX_THUMBNAIL_ELEMENTS - len(segments["link"])
+    drawn = 0
+    for x, y, width, height, node_type in boxes.values():
+        left, top = project(x, y)
+        box_width = max(round(width * scale), 1)
+        box_height = max(round(height * scale), 1)
+        path = segments.setdefault(node_type, {})
+        key = f"M{left} {top}h{box_width}v{box_height}h-{box_width}z"
+        if key not in path:
+            path[key] = None
+            drawn += 1
+            if drawn >= budget:
+                break
+
+    elements = []
+    if segments["link"]:
+        elements.append(f'<path d="{"".join(segments["link"])}" stroke="{LINK_COLOUR}" stroke-width="0.75" fill="none"/>')
+    # Trust boundaries first so that nodes inside them stay visible
+    for node_type in ("trust-boundary", "asset", "threat"):
+        if segments.get(node_type):
+            fill, stroke = NODE_COLOURS[node_type]
+            dash = ' stroke-dasharray="3 2"' if node_type == "trust-boundary" else ""
+            elements.append(
+                f'<path d="{"".join(segments[node_type])}" fill="{fill}" stroke="{stroke}" stroke-width="0.75"{dash}/>'
+            )
+
+    return header + "".join(elements) + "</svg>"
+
+
+def refresh_diagram_thumbnail(db: Session, diagram_id: UUID) -> bool:
+    """
+    Render and store the thumbnail for a diagram's current revision.
+    The write is skipped if the canvas changed while rendering; the newer
+    save queued its own render.
+    """
+    row = db.query(
+        ThreatModelDiagram.canvas_data,
+        ThreatModelDiagram.revision,
+        ThreatModelDiagram.thumbnail_revision
+    ).filter(ThreatModelDiagram.diagram_id == diagram_id).first()
+    if not row or row.thumbnail_revision == row.revision:
+        return False
+
+    thumbnail = render_canvas_thumbnail(row.canvas_data)
+    updated = db.query(ThreatModelDiagram).filter(
+        ThreatModelDiagram.diagram_id == diagram_id,
+        ThreatModelDiagram.revision == row.revision
+    ).update(
+        {"thumbnail_svg": thumbnail, "thumbnail_revision": row.revision},
+        synchronize_session=False
+    )
+    db.commit()
+    return bool(updated)
+
+
+def queue_thumbnail_render(diagram_id: UUID) -> None:
+    """Render the listing thumbnail in a worker; a save never fails because the broker is down"""
+    from app.tasks.diagram_tasks import render_diagram_thumbnail_task
+
+    try:
+        render_diagram_thumbnail_task.apply_async(args=[str(diagram_id)], retry=False)
+    except Exception as e:
+        logger.warning(f"Could not queue thumbnail render for diagram {diagram_id}: {e}")
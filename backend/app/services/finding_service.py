@@ -6,6 +6,7 @@ from typing import List, Optional
 from uuid import UUID
 from app.models.finding import Finding, FindingStatus, FindingSeverity
 from app.schemas.finding import FindingCreate, FindingUpdate
+from app.services.asset_rollup_service import refresh_asset_rollups
 
 
 def create_finding(db: Session, finding_data: FindingCreate) -> Finding:
@@ -23,6 +24,7 @@ def create_finding(db: Session, finding_data: FindingCreate) -> Finding:
     )
     
     db.add(finding)
+    refresh_asset_rollups(db, [finding.asset_id])
     db.commit()
     db.refresh(finding)
     return finding
@@ -96,6 +98,9 @@ def update_finding(
     for key, value in update_data.items():
         setattr(finding, key, value)
     
+    if 'status' in update_data:
+        refresh_asset_rollups(db, [finding.asset_id])
+    
     db.commit()
     db.refresh(finding)
     return finding
@@ -108,6 +113,7 @@ def delete_finding(db: Session, finding_id: UUID) -> bool:
         return False
     
     db.delete(finding)
+    refresh_asset_rollups(db, [finding.asset_id])
     db.commit()
     return True
 
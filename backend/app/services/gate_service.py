@@ -0,0 +1,187 @@
+"""
+Gate Service - PASS/WARN/BLOCK decisions for CI/CD pipeline runs
+
+Active policy rules are compiled once per policy-rules cache version and
+kept in memory, so a decision needs two indexed reads (the cache version
+and the run's findings) and no network hop. Rules outside the embedded Rego
+subset are still sent to OPA, as one batch query per rule. Decisions for
+identical inputs are cached for GATE_DECISION_CACHE_TTL_SECONDS.
+"""
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from uuid import UUID
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import asyncio
+import hashlib
+import json
+import time
+from app.core.cache import LRUCache, get_cache_version
+from app.core.config import settings
+from app.core.opa import get_opa_client
+from app.core.rego_subset import CompiledPolicy, RegoSyntaxError
+from app.models.finding import Finding, FindingStatus, ScanResult
+from app.models.policy import GateDecision, PolicyRule, PolicySeverity
+from app.schemas.gate import GateFindingInput
+from app.services.policy_service import (
+    POLICY_RULES_CACHE, finding_policy_input, gate_decision_for, get_compiled_policy
+)
+
+# Findings in these states can hold a pipeline back
+GATING_STATUSES = (FindingStatus.OPEN, FindingStatus.IN_PROGRESS)
+
+DECISION_RANK = {GateDecision.PASS: 0, GateDecision.WARN: 1, GateDecision.BLOCK: 2}
+
+MAX_MESSAGES_PER_RULE = 20
+
+_rule_sets = LRUCache(maxsize=2)
+_decisions = LRUCache(maxsize=settings.GATE_DECISION_CACHE_SIZE, ttl=settings.GATE_DECISION_CACHE_TTL_SECONDS)
+
+
+@dataclass(frozen=True)
+class _GateRule:
+    policy_rule_id: UUID
+    name: str
+    severity: PolicySeverity
+    version: int
+    rego_snippet: str
+    compiled: Optional[CompiledPolicy]  # None when only OPA can evaluate it
+
+
+def _load_gate_rules(db: Session) -> List[_GateRule]:
+    rules = []
+    for policy in db.query(PolicyRule).filter(
+        PolicyRule.active.is_(True),
+        PolicyRule.rego_snippet.isnot(None),
+        PolicyRule.rego_snippet != ""
+    ).order_by(PolicyRule.name):
+        try:
+            compiled = get_compiled_policy(policy)
+        except RegoSyntaxError:
+            compiled = None
+        rules.append(_GateRule(
+            policy_rule_id=policy.policy_rule_id,
+            name=policy.name,
+            severity=policy.severity,
+            version=policy.version,
+            rego_snippet=policy.rego_snippet,
+            compiled=compiled
+        ))
+    return rules
+
+
+def get_gate_rules(db: Session) -> Tuple[int, List[_GateRule]]:
+    """The active rules, compiled, for the current policy-rules version"""
+    version = get_cache_version(db, POLICY_RULES_CACHE)
+    return version, _rule_sets.get_or_compute(version, lambda: _load_gate_rules(db))
+
+
+def load_pipeline_inputs(db: Session, pipeline_run_id: str) -> Optional[List[dict]]:
+    """Policy inputs for the gating findings of a pipeline run; None if the run is unknown"""
+    findings = db.query(Finding).join(
+        ScanResult, ScanResult.scan_result_id == Finding.scan_result_id
+    ).filter(
+        ScanResult.pipeline_run_id == pipeline_run_id,
+        Finding.status.in_(GATING_STATUSES)
+    ).order_by(Finding.finding_id).all()
+    if not findings and not db.query(
+        db.query(ScanResult).filter(ScanResult.pipeline_run_id == pipeline_run_id).exists()
+    ).scalar():
+        return None
+    return [finding_policy_input(finding) for finding in findings]
+
+
+def inline_inputs(findings: List[GateFindingInput]) -> List[dict]:
+    """Policy inputs for findings posted with the request, shaped like stored ones"""
+    return [
+        {
+            "finding_id": finding.finding_id or str(position),
+            "asset_id": str(finding.asset_id) if finding.asset_id else None,
+            "threat_id": None,
+            "vulnerability_type": finding.vulnerability_type,
+            "cve_id": finding.cve_id,
+            "severity": finding.severity.value,
+            "status": finding.status.value,
+            "location": finding.location,
+            "scanner_sources": finding.scanner_sources,
+            "first_detected": None,
+        }
+        for position, finding in enumerate(findings)
+        if finding.status in GATING_STATUSES
+    ]
+
+
+async def _rule_documents(rule: _GateRule, inputs: List[dict]) -> List[dict]:
+    if rule.compiled is not None:
+        return [rule.compiled.evaluate(item) for item in inputs]
+    return await get_opa_client().evaluate_batch(rule.policy_rule_id, rule.version, rule.rego_snippet, inputs)
+
+
+async def evaluate_gate(
+    db: Session,
+    pipeline_run_id: Optional[str] = None,
+    findings: Optional[List[GateFindingInput]] = None
+) -> Optional[dict]:
+    """
+    The gate decision for a pipeline run's findings or for inline findings:
+    the most severe decision of any active rule on any gating finding.
+    Returns None when the pipeline run is unknown.
+    """
+    started = time.perf_counter()
+    if pipeline_run_id is not None:
+        inputs = load_pipeline_inputs(db, pipeline_run_id)
+        if inputs is None:
+            return None
+    else:
+        inputs = inline_inputs(findings or [])
+
+    version, rules = get_gate_rules(db)
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+    key = (version, digest)
+
+    result = _decisions.get(key)
+    cached = result is not None
+    if not cached:
+        documents = await asyncio.gather(*(_rule_documents(rule, inputs) for rule in rules)) if inputs else []
+        decision = GateDecision.PASS
+        violations = []
+        for rule, rule_documents in zip(rules, documents):
+            rule_decision = GateDecision.PASS
+            finding_ids: List[str] = []
+            messages: List[str] = []
+            for item, document in zip(inputs, rule_documents):
+                item_decision, item_messages = gate_decision_for(document)
+                if item_decision == GateDecision.PASS:
+                    continue
+                finding_ids.append(item["finding_id"])
+                if len(messages) < MAX_MESSAGES_PER_RULE:
+                    messages.extend(message for message in item_messages if message not in messages)
+                if DECISION_RANK[item_decision] > DECISION_RANK[rule_decision]:
+                    rule_decision = item_decision
+            if rule_decision != GateDecision.PASS:
+                violations.append({
+                    "policy_rule_id": rule.policy_rule_id,
+                    "policy_name": rule.name,
+                    "severity": rule.severity,
+                    "gate_decision": rule_decision,
+                    "finding_ids": finding_ids,
+                    "messages": messages[:MAX_MESSAGES_PER_RULE],
+                })
+                if DECISION_RANK[rule_decision] > DECISION_RANK[decision]:
+                    decision = rule_decision
+        violations.sort(key=lambda violation: (-DECISION_RANK[violation["gate_decision"]], violation["policy_name"]))
+        result = {
+            "decision": decision,
+            "findings_evaluated": len(inputs),
+            "rules_evaluated": len(rules),
+            "violations": violations,
+            "evaluated_at": datetime.now(timezone.utc),
+        }
+        _decisions.set(key, result)
+
+    return {
+        **result,
+        "pipeline_run_id": pipeline_run_id,
+        "cached": cached,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
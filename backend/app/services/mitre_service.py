@@ -0,0 +1,83 @@
+"""
+MITRE Service - ATT&CK lookups and threat coverage by tactic
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Optional
+from uuid import UUID
+from app.core.mitre_attack import get_mitre_catalog
+from app.models.threat import Threat, ThreatStatus
+
+
+def get_threats_by_tactic(
+    db: Session,
+    asset_id: Optional[UUID] = None,
+    status: Optional[ThreatStatus] = None
+) -> dict:
+    """
+    Threat counts and max risk per ATT&CK tactic and technique. One GROUP BY
+    over mitre_attack_id is folded into tactics through the in-memory
+    catalog; a technique under several tactics counts towards each of them.
+    Well-formed ids the catalog does not know are counted separately.
+    """
+    catalog = get_mitre_catalog()
+
+    query = db.query(
+        Threat.mitre_attack_id,
+        func.count(Threat.threat_id),
+        func.max(Threat.risk_score)
+    )
+    if asset_id:
+        query = query.filter(Threat.asset_id == asset_id)
+    if status:
+        query = query.filter(Threat.status == status)
+    rows = query.group_by(Threat.mitre_attack_id).all()
+
+    tactics = {
+        shortname: {
+            "tactic_id": tactic.tactic_id,
+            "name": tactic.name,
+            "shortname": shortname,
+            "threat_count": 0,
+            "max_risk_score": None,
+            "techniques": [],
+        }
+        for shortname, tactic in catalog.tactics.items()
+    }
+    unmapped = 0
+    unknown = {}
+    for technique_id, count, max_risk in rows:
+        if not technique_id:
+            unmapped += count
+            continue
+        technique = catalog.get(technique_id)
+        if technique is None:
+            unknown[technique_id] = unknown.get(technique_id, 0) + count
+            continue
+        max_risk = float(max_risk) if max_risk is not None else None
+        for shortname in technique.tactics:
+            tactic = tactics.get(shortname)
+            if tactic is None:
+                continue
+            tactic["threat_count"] += count
+            if max_risk is not None and (tactic["max_risk_score"] is None or max_risk > tactic["max_risk_score"]):
+                tactic["max_risk_score"] = max_risk
+            tactic["techniques"].append({
+                "technique_id": technique.technique_id,
+                "name": technique.name,
+                "threat_count": count,
+                "max_risk_score": max_risk,
+            })
+
+    for tactic in tactics.values():
+        tactic["techniques"].sort(key=lambda technique: (-technique["threat_count"], technique["technique_id"]))
+
+    return {
+        "tactics": list(tactics.values()),
+        "unmapped_threat_count": unmapped,
+        "unknown_threat_count": sum(unknown.values()),
+        "unknown_techniques": [
+            {"technique_id": technique_id, "threat_count": count}
+            for technique_id, count in sorted(unknown.items(), key=lambda item: (-item[1], item[0]))
+        ],
+    }
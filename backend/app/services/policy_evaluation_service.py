@@ -0,0 +1,323 @@
+"""
+Policy Evaluation Service - Bulk and incremental evaluation of policies against findings
+
+A full run splits the OPEN findings into contiguous finding_id ranges of
+POLICY_EVALUATION_CHUNK_SIZE, which workers evaluate independently. Inside a
+chunk every policy is evaluated against every finding: policies within the
+embedded Rego subset run in-process from the compiled-rule cache, the rest
+go to OPA as one batch query per policy.
+
+The incremental run only looks at what changed since each policy's
+last_evaluated watermark (findings.updated_at), plus every finding for
+policies whose version moved past evaluated_version. Each (finding, policy)
+pair keeps at most one active violation: a decision that changes retires
+the old row and inserts a new one, and PASS or a closed finding retires it.
+
+Runs re-read findings they have already seen (the watermark overlap, and
+every finding when a policy is re-evaluated in full), so only decisions on
+findings updated since a policy's last_evaluated are added to its
+evaluation counters.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, text, tuple_
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta
+import asyncio
+import time
+from app.core.config import settings
+from app.core.opa import close_opa_client, get_opa_client
+from app.core.rego_subset import RegoSyntaxError
+from app.models.finding import Finding, FindingStatus
+from app.models.policy import GateDecision, PolicyRule, PolicyViolation
+from app.services.policy_service import (
+    VIOLATION_WRITE_LOCK, finding_policy_input, gate_decision_for, get_compiled_policy, record_policy_evaluations
+)
+
+EVALUABLE_POLICY = (
+    PolicyRule.active.is_(True),
+    PolicyRule.rego_snippet.isnot(None),
+    PolicyRule.rego_snippet != ""
+)
+
+
+def get_evaluable_policies(db: Session) -> List[PolicyRule]:
+    """Active policies that have a Rego snippet to evaluate"""
+    return db.query(PolicyRule).filter(*EVALUABLE_POLICY).order_by(PolicyRule.policy_rule_id).all()
+
+
+def plan_finding_chunks(db: Session, chunk_size: int) -> List[Tuple[str, str, int]]:
+    """
+    (first finding_id, last finding_id, count) ranges covering the OPEN
+    findings. Only ids are streamed, so the plan is cheap for large tables.
+    """
+    chunks = []
+    first = last = None
+    count = 0
+    ids = db.query(Finding.finding_id).filter(
+        Finding.status == FindingStatus.OPEN
+    ).order_by(Finding.finding_id).execution_options(yield_per=chunk_size)
+    for (finding_id,) in ids:
+        if first is None:
+            first = finding_id
+        last = finding_id
+        count += 1
+        if count == chunk_size:
+            chunks.append((str(first), str(last), count))
+            first, count = None, 0
+    if count:
+        chunks.append((str(first), str(last), count))
+    return chunks
+
+
+async def _evaluate_in_opa(policies: Sequence[PolicyRule], inputs: List[dict]) -> Dict[UUID, List[dict]]:
+    client = get_opa_client()
+    try:
+        documents = await asyncio.gather(*(
+            client.evaluate_batch(policy.policy_rule_id, policy.version, policy.rego_snippet, inputs)
+            for policy in policies
+        ))
+    finally:
+        await close_opa_client()
+    return {policy.policy_rule_id: policy_documents for policy, policy_documents in zip(policies, documents)}
+
+
+def _decide(policies: Sequence[PolicyRule], findings: Sequence[Finding]) -> Dict[UUID, List[GateDecision]]:
+    """Gate decision per policy, aligned with findings"""
+    inputs = [finding_policy_input(finding) for finding in findings]
+    decisions: Dict[UUID, List[GateDecision]] = {}
+    remote = []
+    for policy in policies:
+        try:
+            compiled = get_compiled_policy(policy)
+        except RegoSyntaxError:
+            remote.append(policy)
+            continue
+        decisions[policy.policy_rule_id] = [gate_decision_for(compiled.evaluate(item))[0] for item in inputs]
+    if remote and inputs:
+        for policy_rule_id, documents in asyncio.run(_evaluate_in_opa(remote, inputs)).items():
+            decisions[policy_rule_id] = [gate_decision_for(document)[0] for document in documents]
+    return decisions
+
+
+def apply_policy_decisions(
+    db: Session,
+    findings: Sequence[Finding],
+    policies: Sequence[PolicyRule],
+    retire_policy_ids: Optional[Sequence[UUID]] = None
+) -> dict:
+    """
+    Evaluate the policies against the OPEN findings and reconcile active
+    violations: unchanged decisions keep their row, changed decisions retire
+    the old row and insert a new one, and PASS retires. Active violations of
+    findings that are no longer OPEN are retired for retire_policy_ids
+    (default: the evaluated policies). Decisions on findings not updated
+    since a policy's last_evaluated were counted by an earlier run and are
+    left out of the evaluation counters. Commits.
+    """
+    open_findings = [finding for finding in findings if finding.status == FindingStatus.OPEN]
+    closed_ids = [finding.finding_id for finding in findings if finding.status != FindingStatus.OPEN]
+    policy_ids = [policy.policy_rule_id for policy in policies]
+    retire_policy_ids = list(retire_policy_ids if retire_policy_ids is not None else policy_ids)
+
+    # Policy evaluation runs in parallel across workers; only the writes are serialized
+    decisions = _decide(policies, open_findings) if open_findings and policies else {}
+
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": VIOLATION_WRITE_LOCK})
+    if decisions:
+        # update_policy_rule already retired the violations of a policy deactivated since this run started
+        evaluable = {policy_rule_id for (policy_rule_id,) in db.query(PolicyRule.policy_rule_id).filter(
+            PolicyRule.policy_rule_id.in_(list(decisions)), *EVALUABLE_POLICY
+        )}
+        decisions = {policy_rule_id: policy_decisions for policy_rule_id, policy_decisions in decisions.items()
+                     if policy_rule_id in evaluable}
+    active: Dict[Tuple[UUID, UUID], List[Tuple[UUID, GateDecision]]] = {}
+    if open_findings and decisions:
+        for violation_id, finding_id, policy_rule_id, decision in db.query(
+            PolicyViolation.violation_id,
+            PolicyViolation.finding_id,
+            PolicyViolation.policy_rule_id,
+            PolicyViolation.gate_decision
+        ).filter(
+            PolicyViolation.retired_at.is_(None),
+            PolicyViolation.finding_id.in_([finding.finding_id for finding in open_findings]),
+            PolicyViolation.policy_rule_id.in_(list(decisions))
+        ):
+            active.setdefault((finding_id, policy_rule_id), []).append((violation_id, decision))
+
+    retire_ids = []
+    rows = []
+    for policy_rule_id, policy_decisions in decisions.items():
+        for finding, decision in zip(open_findings, policy_decisions):
+            current = active.get((finding.finding_id, policy_rule_id), [])
+            keep = decision != GateDecision.PASS and any(existing == decision for _, existing in current)
+            kept = False
+            for violation_id, existing in current:
+                if keep and existing == decision and not kept:
+                    kept = True
+                else:
+                    retire_ids.append(violation_id)
+            if decision != GateDecision.PASS and not keep:
+                rows.append({
+                    "violation_id": uuid4(),
+                    "finding_id": finding.finding_id,
+                    "policy_rule_id": policy_rule_id,
+                    "gate_decision": decision,
+                })
+
+    retired = 0
+    if retire_ids:
+        retired += db.query(PolicyViolation).filter(
+            PolicyViolation.violation_id.in_(retire_ids)
+        ).update({PolicyViolation.retired_at: func.now()}, synchronize_session=False)
+    if closed_ids and retire_policy_ids:
+        retired += db.query(PolicyViolation).filter(
+            PolicyViolation.retired_at.is_(None),
+            PolicyViolation.finding_id.in_(closed_ids),
+            PolicyViolation.policy_rule_id.in_(retire_policy_ids)
+        ).update({PolicyViolation.retired_at: func.now()}, synchronize_session=False)
+    if rows:
+        db.execute(insert(PolicyViolation), rows)
+    record_policy_evaluations(db, {
+        policy.policy_rule_id: [
+            decision
+            for finding, decision in zip(open_findings, decisions[policy.policy_rule_id])
+            if policy.last_evaluated is None or finding.updated_at > policy.last_evaluated
+        ]
+        for policy in policies if policy.policy_rule_id in decisions
+    })
+    db.commit()
+
+    return {
+        "findings": len(findings),
+        "evaluations": len(open_findings) * len(decisions),
+        "violations": len(rows),
+        "retired": retired,
+    }
+
+
+def evaluate_finding_chunk(
+    db: Session,
+    first_finding_id: UUID,
+    last_finding_id: UUID,
+    policy_ids: Sequence[UUID]
+) -> dict:
+    """Evaluate the policies against the OPEN findings in [first_finding_id, last_finding_id]"""
+    started = time.perf_counter()
+    findings = db.query(Finding).filter(
+        Finding.status == FindingStatus.OPEN,
+        Finding.finding_id >= first_finding_id,
+        Finding.finding_id <= last_finding_id
+    ).all()
+    policies = db.query(PolicyRule).filter(
+        PolicyRule.policy_rule_id.in_(list(policy_ids)),
+        PolicyRule.active.is_(True)
+    ).all()
+    result = apply_policy_decisions(db, findings, policies)
+    return {**result, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def mark_policies_evaluated(db: Session, policy_ids: Sequence[UUID], evaluated_at: datetime) -> None:
+    """Stamp last_evaluated with the time the run started"""
+    if policy_ids:
+        db.query(PolicyRule).filter(
+            PolicyRule.policy_rule_id.in_(list(policy_ids))
+        ).update({PolicyRule.last_evaluated: evaluated_at}, synchronize_session=False)
+    db.commit()
+
+
+def summarize_evaluation_run(chunk_results: List[dict], started_at: datetime, finished_at: datetime) -> dict:
+    findings = sum(result["findings"] for result in chunk_results)
+    elapsed = max((finished_at - started_at).total_seconds(), 1e-6)
+    return {
+        "chunks": len(chunk_results),
+        "findings": findings,
+        "evaluations": sum(result["evaluations"] for result in chunk_results),
+        "violations": sum(result["violations"] for result in chunk_results),
+        "retired": sum(result.get("retired", 0) for result in chunk_results),
+        "elapsed_seconds": round(elapsed, 3),
+        "findings_per_second": round(findings / elapsed, 1),
+        # Time spent inside workers, which exceeds elapsed when chunks ran in parallel
+        "worker_seconds": round(sum(result.get("seconds", 0.0) for result in chunk_results), 3),
+    }
+
+
+def _findings_in_chunks(db: Session, chunk_size: int, order_by: Sequence, *criteria) -> Iterator[List[Finding]]:
+    """Keyset pagination over findings on the order_by columns, which must end in finding_id"""
+    last = None
+    while True:
+        query = db.query(Finding).filter(*criteria)
+        if last is not None:
+            query = query.filter(tuple_(*order_by) > tuple_(*last))
+        findings = query.order_by(*order_by).limit(chunk_size).all()
+        if not findings:
+            return
+        yield findings
+        last = [getattr(findings[-1], column.key) for column in order_by]
+
+
+def reevaluate_changed(db: Session, chunk_size: Optional[int] = None) -> dict:
+    """
+    Incremental evaluation. Policies whose version differs from
+    evaluated_version (new, edited or re-activated) are evaluated against
+    every finding; the others only against findings updated since their
+    last_evaluated, minus POLICY_EVALUATION_WATERMARK_OVERLAP_SECONDS for
+    writes that were still uncommitted when the previous run started.
+    Violations of deactivated policies are retired by update_policy_rule,
+    not here.
+    """
+    chunk_size = chunk_size or settings.POLICY_EVALUATION_CHUNK_SIZE
+    started = time.perf_counter()
+    run_started_at = db.execute(text("SELECT now()")).scalar()
+    results = []
+
+    policies = get_evaluable_policies(db)
+    evaluable_ids = [policy.policy_rule_id for policy in policies]
+    versions = {policy.policy_rule_id: policy.version for policy in policies}
+    retired_closed = 0
+
+    full = [
+        policy for policy in policies
+        if policy.evaluated_version != policy.version or policy.last_evaluated is None
+    ]
+    incremental = [policy for policy in policies if policy not in full]
+    full_ids = [policy.policy_rule_id for policy in full]
+
+    if full:
+        # Closed findings keep no active violations for these policies
+        retired_closed = db.query(PolicyViolation).filter(
+            PolicyViolation.retired_at.is_(None),
+            PolicyViolation.policy_rule_id.in_(full_ids),
+            PolicyViolation.finding_id.in_(
+                db.query(Finding.finding_id).filter(Finding.status != FindingStatus.OPEN)
+            )
+        ).update({PolicyViolation.retired_at: func.now()}, synchronize_session=False)
+        db.commit()
+        for findings in _findings_in_chunks(
+            db, chunk_size, [Finding.finding_id], Finding.status == FindingStatus.OPEN
+        ):
+            results.append(apply_policy_decisions(db, findings, full))
+
+    if incremental:
+        overlap = timedelta(seconds=settings.POLICY_EVALUATION_WATERMARK_OVERLAP_SECONDS)
+        watermark = min(policy.last_evaluated for policy in incremental) - overlap
+        for findings in _findings_in_chunks(
+            db, chunk_size, [Finding.updated_at, Finding.finding_id], Finding.updated_at > watermark
+        ):
+            # A finding that closed retires its violations for every policy
+            results.append(apply_policy_decisions(db, findings, incremental, retire_policy_ids=evaluable_ids))
+
+    mark_policies_evaluated(db, [policy.policy_rule_id for policy in incremental], run_started_at)
+    for policy_rule_id in full_ids:
+        # Record the version that was evaluated, so an edit made during the run stays pending
+        db.query(PolicyRule).filter(PolicyRule.policy_rule_id == policy_rule_id).update({
+            PolicyRule.last_evaluated: run_started_at,
+            PolicyRule.evaluated_version: versions[policy_rule_id],
+        }, synchronize_session=False)
+    db.commit()
+
+    summary = summarize_evaluation_run(results, run_started_at, run_started_at + timedelta(
+        seconds=time.perf_counter() - started
+    ))
+    summary["retired"] += retired_closed
+    return {**summary, "full_policies": len(full), "incremental_policies": len(incremental)}
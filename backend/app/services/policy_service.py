@@ -2,14 +2,30 @@
 Policy Service - Business Logic
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional, Tuple
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from uuid import UUID
-from datetime import datetime
-from app.models.policy import PolicyRule, PolicyViolation, PolicyControlMapping, Control
+from datetime import datetime, timedelta, timezone
+from app.models.policy import PolicyRule, PolicyViolation, PolicyControlMapping, Control, PolicyEvaluationCounter
 from app.models.finding import Finding
 from app.schemas.policy import PolicyRuleCreate, PolicyRuleUpdate
 from app.models.policy import GateDecision
+from app.core.cache import LRUCache, bump_cache_version
+from app.core.config import settings
+from app.core.opa import OPAError, OPAPolicyError, get_opa_client
+from app.core.rego_subset import CompiledPolicy, RegoSyntaxError, compile_policy
+
+# Compiled rego_snippets keyed by (policy_rule_id, version); an edit bumps the version
+_compiled_policies = LRUCache(maxsize=1024)
+
+# Version of the set of policy rules; bumped by every create, update and delete
+POLICY_RULES_CACHE = "policy_rules"
+
+# Serializes the violation read-and-write phase of concurrent chunks, so two
+# workers never both insert the active violation for the same pair, and
+# orders deactivation against them
+VIOLATION_WRITE_LOCK = "policy_violation_writes"
 
 
 def create_policy_rule(db: Session, policy_data: PolicyRuleCreate) -> PolicyRule:
@@ -29,6 +45,7 @@ def create_policy_rule(db: Session, policy_data: PolicyRuleCreate) -> PolicyRule
     )
     
     db.add(policy)
+    bump_cache_version(db, POLICY_RULES_CACHE)
     db.commit()
     db.refresh(policy)
     
@@ -65,15 +82,21 @@ def get_policy_rules(
     return policies, total
 
 
+def _is_evaluable(policy: PolicyRule) -> bool:
+    """Whether evaluation runs pick the policy up (see get_evaluable_policies)"""
+    return bool(policy.active and policy.rego_snippet)
+
+
 def update_policy_rule(
     db: Session,
     policy_id: UUID,
     policy_data: PolicyRuleUpdate
 ) -> Optional[PolicyRule]:
-    """Update a policy rule"""
+    """Update a policy rule; deactivating it or clearing its Rego retires its active violations"""
     policy = get_policy_rule(db, policy_id)
     if not policy:
         return None
+    was_evaluable = _is_evaluable(policy)
     
     if policy_data.name is not None:
         # Check if name is already taken by another policy
@@ -97,8 +120,20 @@ def update_policy_rule(
         policy.version += 1
     
     if policy_data.active is not None:
+        if policy_data.active and not policy.active:
+            # Violations were retired while inactive; re-evaluate against every finding
+            policy.evaluated_version = None
         policy.active = policy_data.active
     
+    if was_evaluable and not _is_evaluable(policy):
+        # Evaluation runs skip the policy from now on, so nothing else would retire them
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": VIOLATION_WRITE_LOCK})
+        db.query(PolicyViolation).filter(
+            PolicyViolation.policy_rule_id == policy_id,
+            PolicyViolation.retired_at.is_(None)
+        ).update({PolicyViolation.retired_at: func.now()}, synchronize_session=False)
+    
+    bump_cache_version(db, POLICY_RULES_CACHE)
     db.commit()
     db.refresh(policy)
     
@@ -112,15 +147,64 @@ def delete_policy_rule(db: Session, policy_id: UUID) -> bool:
         return False
     
     db.delete(policy)
+    bump_cache_version(db, POLICY_RULES_CACHE)
     db.commit()
     
     return True
 
 
-def test_policy_rule(db: Session, policy_id: UUID, test_data: dict) -> dict:
+def gate_decision_for(document: dict) -> Tuple[GateDecision, List[str]]:
+    """
+    Map a policy package document to a gate decision: any `deny` blocks,
+    any `warn` warns, and an explicit `allow = false` blocks.
+    """
+    def messages(value) -> List[str]:
+        if isinstance(value, (list, set, tuple)):
+            return [str(message) for message in value]
+        return [str(value)] if value else []
+
+    denials = messages(document.get("deny"))
+    if denials:
+        return GateDecision.BLOCK, denials
+    if document.get("allow") is False:
+        return GateDecision.BLOCK, ["Policy did not allow the input"]
+    warnings = messages(document.get("warn"))
+    if warnings:
+        return GateDecision.WARN, warnings
+    return GateDecision.PASS, []
+
+
+def get_compiled_policy(policy: PolicyRule) -> CompiledPolicy:
+    """
+    The policy compiled for the embedded evaluator. Raises RegoSyntaxError
+    when the snippet uses Rego outside the supported subset.
+    """
+    return _compiled_policies.get_or_compute(
+        (policy.policy_rule_id, policy.version),
+        lambda: compile_policy(policy.rego_snippet or "")
+    )
+
+
+def finding_policy_input(finding: Finding) -> dict:
+    """The OPA input document for a finding"""
+    return {
+        "finding_id": str(finding.finding_id),
+        "asset_id": str(finding.asset_id),
+        "threat_id": str(finding.threat_id) if finding.threat_id else None,
+        "vulnerability_type": finding.vulnerability_type,
+        "cve_id": finding.cve_id,
+        "severity": finding.severity.value,
+        "status": finding.status.value,
+        "location": finding.location,
+        "scanner_sources": finding.scanner_sources or [],
+        "first_detected": finding.first_detected.isoformat() if finding.first_detected else None,
+    }
+
+
+async def test_policy_rule(db: Session, policy_id: UUID, test_data: dict) -> dict:
     """
-    Test a policy rule against test data
-    For now, this is a placeholder - OPA integration would go here
+    Evaluate a policy rule against test data in OPA, falling back to the
+    embedded evaluator when OPA is unreachable
     """
     policy = get_policy_rule(db, policy_id)
     if not policy:
@@ -133,22 +217,36 @@ def test_policy_rule(db: Session, policy_id: UUID, test_data: dict) -> dict:
             "message": "Policy is inactive"
         }
     
-    # Basic validation - in production, this would use OPA to evaluate the rego_snippet
-    # For now, we'll do a simple check
-    if policy.rego_snippet:
-        # Placeholder: In real implementation, this would call OPA
-        # For now, return a basic response
-        return {
-            "passed": True,
-            "gate_decision": GateDecision.PASS,
-            "message": "Policy evaluation completed (OPA integration pending)"
-        }
-    else:
+    if not policy.rego_snippet:
         return {
             "passed": True,
             "gate_decision": GateDecision.PASS,
             "message": "Policy has no Rego snippet defined"
         }
+    
+    note = ""
+    try:
+        document = await get_opa_client().evaluate(
+            policy.policy_rule_id, policy.version, policy.rego_snippet, test_data
+        )
+    except OPAPolicyError:
+        raise
+    except OPAError as e:
+        try:
+            compiled = get_compiled_policy(policy)
+        except RegoSyntaxError:
+            # Outside the embedded subset, only OPA can answer
+            raise e
+        document = compiled.evaluate(test_data)
+        note = " (embedded evaluator; OPA unavailable)"
+    
+    decision, messages = gate_decision_for(document)
+    return {
+        "passed": decision == GateDecision.PASS,
+        "gate_decision": decision,
+        "message": ("; ".join(messages) if messages else "Policy evaluation passed") + note,
+        "violations": [{"message": message} for message in messages],
+    }
 
 
 def get_policy_violations(
@@ -156,11 +254,15 @@ def get_policy_violations(
     policy_id: Optional[UUID] = None,
     finding_id: Optional[UUID] = None,
     skip: int = 0,
-    limit: int = 50
+    limit: int = 50,
+    include_retired: bool = False
 ) -> Tuple[List[PolicyViolation], int]:
-    """Get policy violations with optional filters"""
+    """Get policy violations with optional filters; retired ones only on request"""
     query = db.query(PolicyViolation)
     
+    if not include_retired:
+        query = query.filter(PolicyViolation.retired_at.is_(None))
+    
     if policy_id:
         query = query.filter(PolicyViolation.policy_rule_id == policy_id)
     
@@ -173,38 +275,146 @@ def get_policy_violations(
     return violations, total
 
 
-def get_policy_statistics(db: Session, policy_id: UUID) -> dict:
-    """Get statistics for a policy rule"""
-    policy = get_policy_rule(db, policy_id)
-    if not policy:
+def record_policy_evaluations(db: Session, decisions: Dict[UUID, Iterable[GateDecision]]) -> None:
+    """
+    Add gate decisions to today's evaluation counters, one upsert for all
+    policies. Does not commit; the caller commits with the violations.
+    """
+    bucket_date = datetime.now(timezone.utc).date()
+    rows = []
+    for policy_rule_id in sorted(decisions):
+        counts = {GateDecision.PASS: 0, GateDecision.WARN: 0, GateDecision.BLOCK: 0}
+        for decision in decisions[policy_rule_id]:
+            counts[decision] += 1
+        total = sum(counts.values())
+        if total:
+            rows.append({
+                "policy_rule_id": policy_rule_id,
+                "bucket_date": bucket_date,
+                "evaluations": total,
+                "passed": counts[GateDecision.PASS],
+                "warned": counts[GateDecision.WARN],
+                "blocked": counts[GateDecision.BLOCK],
+            })
+    if not rows:
+        return
+
+    stmt = pg_insert(PolicyEvaluationCounter).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PolicyEvaluationCounter.policy_rule_id, PolicyEvaluationCounter.bucket_date],
+        set_={
+            **{
+                column: getattr(PolicyEvaluationCounter, column) + stmt.excluded[column]
+                for column in ("evaluations", "passed", "warned", "blocked")
+            },
+            "last_evaluated_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+
+
+def _window_start(days: Optional[int]):
+    """First counter bucket of a window of `days` days ending today"""
+    return datetime.now(timezone.utc).date() - timedelta(days=(days or settings.POLICY_STATISTICS_WINDOW_DAYS) - 1)
+
+
+def _pass_rate(passed: int, evaluations: int) -> Optional[float]:
+    return round(passed / evaluations * 100, 2) if evaluations else None
+
+
+def get_policies_statistics(
+    db: Session,
+    policy_ids: Sequence[UUID],
+    days: Optional[int] = None
+) -> Dict[UUID, dict]:
+    """
+    Statistics for several policy rules in three grouped queries: active
+    violations, mapped controls, and evaluation counters over the last
+    `days` days (default POLICY_STATISTICS_WINDOW_DAYS). pass_rate is None
+    for a policy with no evaluations in the window.
+    """
+    policy_ids = list(policy_ids)
+    if not policy_ids:
         return {}
+    since = _window_start(days)
     
-    # Count violations
-    violations_count = db.query(PolicyViolation).filter(
-        PolicyViolation.policy_rule_id == policy_id
-    ).count()
-    
-    # Count control mappings
-    controls_count = db.query(PolicyControlMapping).filter(
-        PolicyControlMapping.policy_rule_id == policy_id
-    ).count()
+    violations = dict(db.query(
+        PolicyViolation.policy_rule_id, func.count(PolicyViolation.violation_id)
+    ).filter(
+        PolicyViolation.policy_rule_id.in_(policy_ids),
+        PolicyViolation.retired_at.is_(None)
+    ).group_by(PolicyViolation.policy_rule_id).all())
     
-    # Calculate pass rate (simplified - would need total evaluations)
-    # For now, we'll use a placeholder calculation
-    total_evaluations = violations_count + 10  # Placeholder
-    pass_rate = ((total_evaluations - violations_count) / total_evaluations * 100) if total_evaluations > 0 else 100.0
+    controls = dict(db.query(
+        PolicyControlMapping.policy_rule_id, func.count(PolicyControlMapping.mapping_id)
+    ).filter(
+        PolicyControlMapping.policy_rule_id.in_(policy_ids)
+    ).group_by(PolicyControlMapping.policy_rule_id).all())
     
-    return {
-        "violations_count": violations_count,
-        "controls_mapped_count": controls_count,
-        "pass_rate": round(pass_rate, 2)
+    in_window = PolicyEvaluationCounter.bucket_date >= since
+    counters = {
+        policy_rule_id: (evaluations or 0, passed or 0, warned or 0, blocked or 0, last_evaluated_at)
+        for policy_rule_id, evaluations, passed, warned, blocked, last_evaluated_at in db.query(
+            PolicyEvaluationCounter.policy_rule_id,
+            func.sum(PolicyEvaluationCounter.evaluations).filter(in_window),
+            func.sum(PolicyEvaluationCounter.passed).filter(in_window),
+            func.sum(PolicyEvaluationCounter.warned).filter(in_window),
+            func.sum(PolicyEvaluationCounter.blocked).filter(in_window),
+            func.max(PolicyEvaluationCounter.last_evaluated_at)
+        ).filter(
+            PolicyEvaluationCounter.policy_rule_id.in_(policy_ids)
+        ).group_by(PolicyEvaluationCounter.policy_rule_id).all()
     }
+    
+    statistics = {}
+    for policy_id in policy_ids:
+        evaluations, passed, warned, blocked, last_evaluated_at = counters.get(policy_id, (0, 0, 0, 0, None))
+        statistics[policy_id] = {
+            "violations_count": violations.get(policy_id, 0),
+            "controls_mapped_count": controls.get(policy_id, 0),
+            "evaluations": evaluations,
+            "passed": passed,
+            "warned": warned,
+            "blocked": blocked,
+            "pass_rate": _pass_rate(passed, evaluations),
+            "last_evaluated_at": last_evaluated_at,
+        }
+    return statistics
 
 
-def evaluate_policy_for_finding(db: Session, policy_id: UUID, finding_id: UUID) -> Optional[PolicyViolation]:
+def get_policy_statistics(db: Session, policy_id: UUID, days: Optional[int] = None) -> dict:
+    """Get statistics for a policy rule"""
+    policy = get_policy_rule(db, policy_id)
+    if not policy:
+        return {}
+    
+    return get_policies_statistics(db, [policy_id], days)[policy_id]
+
+
+def get_policy_evaluation_trend(db: Session, policy_id: UUID, days: Optional[int] = None) -> List[dict]:
+    """Daily evaluation counts and pass rate for the last `days` days, oldest first; idle days are omitted"""
+    since = _window_start(days)
+    counters = db.query(PolicyEvaluationCounter).filter(
+        PolicyEvaluationCounter.policy_rule_id == policy_id,
+        PolicyEvaluationCounter.bucket_date >= since
+    ).order_by(PolicyEvaluationCounter.bucket_date).all()
+    return [
+        {
+            "date": counter.bucket_date,
+            "evaluations": counter.evaluations,
+            "passed": counter.passed,
+            "warned": counter.warned,
+            "blocked": counter.blocked,
+            "pass_rate": _pass_rate(counter.passed, counter.evaluations),
+        }
+        for counter in counters
+    ]
+
+
+async def evaluate_policy_for_finding(db: Session, policy_id: UUID, finding_id: UUID) -> Optional[PolicyViolation]:
     """
-    Evaluate a policy against a finding and create a violation if needed
-    This is a placeholder - real implementation would use OPA
+    Evaluate a policy against a finding in OPA and record a violation
+    unless the gate decision is PASS
     """
     policy = get_policy_rule(db, policy_id)
     finding = db.query(Finding).filter(Finding.finding_id == finding_id).first()
@@ -212,15 +422,33 @@ def evaluate_policy_for_finding(db: Session, policy_id: UUID, finding_id: UUID)
     if not policy or not finding:
         return None
     
-    if not policy.active:
+    if not policy.active or not policy.rego_snippet:
         return None
     
-    # Placeholder evaluation logic
-    # In production, this would:
-    # 1. Prepare input data from the finding
-    # 2. Call OPA with the policy's rego_snippet
-    # 3. Create violation if policy fails
+    document = await get_opa_client().evaluate(
+        policy.policy_rule_id, policy.version, policy.rego_snippet, finding_policy_input(finding)
+    )
+    decision, _ = gate_decision_for(document)
+    
+    # last_evaluated is the incremental evaluator's watermark, so it is not
+    # moved here; only this pair's active violation is reconciled
+    active = db.query(PolicyViolation).filter(
+        PolicyViolation.finding_id == finding.finding_id,
+        PolicyViolation.policy_rule_id == policy.policy_rule_id,
+        PolicyViolation.retired_at.is_(None)
+    ).all()
+    violation = next((existing for existing in active if existing.gate_decision == decision), None)
+    for existing in active:
+        if existing is not violation:
+            existing.retired_at = func.now()
+    if decision != GateDecision.PASS and violation is None:
+        violation = PolicyViolation(
+            finding_id=finding.finding_id,
+            policy_rule_id=policy.policy_rule_id,
+            gate_decision=decision
+        )
+        db.add(violation)
+    record_policy_evaluations(db, {policy.policy_rule_id: [decision]})
+    db.commit()
     
-    # For now, we'll skip automatic evaluation
-    return None
-
+    return violation if decision != GateDecision.PASS else None
@@ -0,0 +1,262 @@
+"""
+Risk Simulation Service - Portfolio-wide what-if analysis
+
+Threats are loaded grouped by (asset, STRIDE category, status, likelihood,
+impact) with a count per group, so a portfolio of a million threats
+collapses to the number of distinct combinations. Modifications and risk
+scoring are applied to the groups as NumPy arrays and every statistic is
+weighted by the group counts. Nothing is written back.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import List, Optional
+from dataclasses import dataclass
+import time
+import numpy as np
+from app.core.cache import LRUCache, get_cache_version
+from app.core.config import settings
+from app.models.asset import Asset, AssetType, ClassificationLevel
+from app.models.threat import STRIDECategory, Threat, ThreatStatus
+from app.schemas.risk_simulation import RiskSimulationModification
+from app.services.threat_service import THREAT_HEATMAP_CACHE
+
+MAX_RISK_SCORE = 100.0
+
+CLASSIFICATIONS = list(ClassificationLevel)
+ASSET_TYPES = list(AssetType)
+STRIDE_CATEGORIES = list(STRIDECategory)
+STATUSES = list(ThreatStatus)
+MITIGATED = STATUSES.index(ThreatStatus.MITIGATED)
+NO_STRIDE_CATEGORY = -1
+
+# Risk score histogram bucket edges: [0, 10), [10, 20), ... [90, 100]
+RISK_HISTOGRAM_EDGES = np.arange(0, MAX_RISK_SCORE + 10, 10)
+
+_portfolio_cache = LRUCache(maxsize=2, ttl=settings.RISK_SIMULATION_CACHE_TTL_SECONDS)
+
+
+@dataclass(frozen=True)
+class _Portfolio:
+    """Read-only column arrays; simulations copy what they modify"""
+    asset_ids: list
+    asset_classification: np.ndarray
+    asset_type: np.ndarray
+    confidentiality: np.ndarray
+    integrity: np.ndarray
+    availability: np.ndarray
+    group_asset: np.ndarray
+    group_stride: np.ndarray
+    group_status: np.ndarray
+    group_likelihood: np.ndarray
+    group_impact: np.ndarray
+    group_count: np.ndarray
+
+
+def _load_portfolio(db: Session) -> _Portfolio:
+    assets = db.query(
+        Asset.asset_id,
+        Asset.classification_level,
+        Asset.type,
+        Asset.confidentiality_score,
+        Asset.integrity_score,
+        Asset.availability_score
+    ).all()
+    asset_index = {row.asset_id: position for position, row in enumerate(assets)}
+    classification_codes = {value: code for code, value in enumerate(CLASSIFICATIONS)}
+    type_codes = {value: code for code, value in enumerate(ASSET_TYPES)}
+
+    groups = db.query(
+        Threat.asset_id,
+        Threat.stride_category,
+        Threat.status,
+        Threat.likelihood_score,
+        Threat.impact_score,
+        func.count(Threat.threat_id)
+    ).group_by(
+        Threat.asset_id,
+        Threat.stride_category,
+        Threat.status,
+        Threat.likelihood_score,
+        Threat.impact_score
+    ).all()
+    stride_codes = {value: code for code, value in enumerate(STRIDE_CATEGORIES)}
+    status_codes = {value: code for code, value in enumerate(STATUSES)}
+
+    def column(values, dtype, count):
+        return np.fromiter(values, dtype=dtype, count=count)
+
+    asset_count = len(assets)
+    group_count = len(groups)
+    return _Portfolio(
+        asset_ids=[row.asset_id for row in assets],
+        asset_classification=column((classification_codes[row.classification_level] for row in assets), np.int8, asset_count),
+        asset_type=column((type_codes[row.type] for row in assets), np.int8, asset_count),
+        confidentiality=column((row.confidentiality_score for row in assets), np.int16, asset_count),
+        integrity=column((row.integrity_score for row in assets), np.int16, asset_count),
+        availability=column((row.availability_score for row in assets), np.int16, asset_count),
+        group_asset=column((asset_index[row[0]] for row in groups), np.int32, group_count),
+        group_stride=column((stride_codes.get(row[1], NO_STRIDE_CATEGORY) for row in groups), np.int8, group_count),
+        group_status=column((status_codes[row[2]] for row in groups), np.int8, group_count),
+        group_likelihood=column((row[3] for row in groups), np.int16, group_count),
+        group_impact=column((row[4] for row in groups), np.int16, group_count),
+        group_count=column((row[5] for row in groups), np.int64, group_count),
+    )
+
+
+def risk_scores(
+    confidentiality: np.ndarray,
+    integrity: np.ndarray,
+    availability: np.ndarray,
+    likelihood: np.ndarray,
+    impact: np.ndarray
+) -> np.ndarray:
+    """Vectorized calculate_risk_score: (C+I+A)/3 x likelihood x impact, capped at 100"""
+    # Rounded like the stored Numeric(5,2) sensitivity_score, so the baseline matches stored risk scores
+    sensitivity = np.round((confidentiality + integrity + availability) / 3.0, 2)
+    return np.round(np.minimum(sensitivity * likelihood * impact, MAX_RISK_SCORE), 2)
+
+
+def _codes(values: Optional[list], catalogue: list) -> Optional[np.ndarray]:
+    if not values:
+        return None
+    return np.array([catalogue.index(value) for value in values], dtype=np.int8)
+
+
+def _asset_mask(portfolio: _Portfolio, modification: RiskSimulationModification) -> np.ndarray:
+    mask = np.ones(len(portfolio.asset_ids), dtype=bool)
+    classifications = _codes(modification.classification_levels, CLASSIFICATIONS)
+    if classifications is not None:
+        mask &= np.isin(portfolio.asset_classification, classifications)
+    asset_types = _codes(modification.asset_types, ASSET_TYPES)
+    if asset_types is not None:
+        mask &= np.isin(portfolio.asset_type, asset_types)
+    if modification.asset_ids:
+        selected = set(modification.asset_ids)
+        mask &= np.fromiter(
+            (asset_id in selected for asset_id in portfolio.asset_ids), dtype=bool, count=len(portfolio.asset_ids)
+        )
+    return mask
+
+
+def _distribution(
+    scores: np.ndarray,
+    likelihood: np.ndarray,
+    impact: np.ndarray,
+    status: np.ndarray,
+    counts: np.ndarray
+) -> dict:
+    """Count-weighted statistics over the threats that are not mitigated"""
+    active = status != MITIGATED
+    scores, likelihood, impact, counts = scores[active], likelihood[active], impact[active], counts[active]
+    total = int(counts.sum())
+
+    histogram, _ = np.histogram(scores, bins=RISK_HISTOGRAM_EDGES, weights=counts)
+    cells = np.bincount((likelihood - 1) * 5 + (impact - 1), weights=counts, minlength=25)
+
+    percentiles = {}
+    if total:
+        order = np.argsort(scores, kind="stable")
+        cumulative = np.cumsum(counts[order])
+        for name, fraction in (("p50", 0.5), ("p90", 0.9)):
+            percentiles[name] = float(scores[order][np.searchsorted(cumulative, fraction * total)])
+
+    heatmap = []
+    for cell in np.flatnonzero(cells).tolist():
+        cell_likelihood, cell_impact = cell // 5 + 1, cell % 5 + 1
+        # Same buckets as threat_service._compute_risk_heatmap
+        level_sum = cell_likelihood + cell_impact
+        risk = "critical" if level_sum >= 8 else "high" if level_sum >= 6 else "medium" if level_sum >= 4 else "low"
+        heatmap.append({
+            "likelihood": cell_likelihood,
+            "impact": cell_impact,
+            "count": int(cells[cell]),
+            "risk": risk,
+        })
+
+    total_risk = float(np.dot(scores, counts))
+    return {
+        "active_threats": total,
+        "total_risk": round(total_risk, 2),
+        "mean_risk": round(total_risk / total, 2) if total else 0.0,
+        "max_risk": float(scores.max()) if total else 0.0,
+        "p50_risk": percentiles.get("p50", 0.0),
+        "p90_risk": percentiles.get("p90", 0.0),
+        "histogram": [
+            {"min_score": float(low), "max_score": float(high), "count": int(count)}
+            for low, high, count in zip(RISK_HISTOGRAM_EDGES[:-1], RISK_HISTOGRAM_EDGES[1:], histogram)
+        ],
+        "heatmap": heatmap,
+    }
+
+
+def simulate_risk(db: Session, modifications: List[RiskSimulationModification]) -> dict:
+    """
+    Apply the modifications in order to an in-memory copy of the threat
+    portfolio and return before/after risk distributions and heatmaps.
+    """
+    started = time.perf_counter()
+    version = get_cache_version(db, THREAT_HEATMAP_CACHE)
+    portfolio = _portfolio_cache.get_or_compute(version, lambda: _load_portfolio(db))
+
+    confidentiality = portfolio.confidentiality.copy()
+    integrity = portfolio.integrity.copy()
+    availability = portfolio.availability.copy()
+    likelihood = portfolio.group_likelihood.copy()
+    impact = portfolio.group_impact.copy()
+    status = portfolio.group_status.copy()
+
+    for modification in modifications:
+        asset_mask = _asset_mask(portfolio, modification)
+
+        # CIA adjustments change the asset, so every threat on it is affected
+        for scores, delta in (
+            (confidentiality, modification.confidentiality_delta),
+            (integrity, modification.integrity_delta),
+            (availability, modification.availability_delta),
+        ):
+            if delta:
+                scores[asset_mask] = np.clip(scores[asset_mask] + delta, 1, 5)
+
+        mask = asset_mask[portfolio.group_asset]
+        stride_categories = _codes(modification.stride_categories, STRIDE_CATEGORIES)
+        if stride_categories is not None:
+            mask &= np.isin(portfolio.group_stride, stride_categories)
+        statuses = _codes(modification.statuses, STATUSES)
+        if statuses is not None:
+            mask &= np.isin(status, statuses)
+
+        if modification.likelihood_delta:
+            likelihood[mask] = np.clip(likelihood[mask] + modification.likelihood_delta, 1, 5)
+        if modification.impact_delta:
+            impact[mask] = np.clip(impact[mask] + modification.impact_delta, 1, 5)
+        if modification.mitigate:
+            status[mask] = MITIGATED
+
+    group_asset = portfolio.group_asset
+    before_scores = risk_scores(
+        portfolio.confidentiality[group_asset],
+        portfolio.integrity[group_asset],
+        portfolio.availability[group_asset],
+        portfolio.group_likelihood,
+        portfolio.group_impact
+    )
+    after_scores = risk_scores(
+        confidentiality[group_asset],
+        integrity[group_asset],
+        availability[group_asset],
+        likelihood,
+        impact
+    )
+
+    changed = (before_scores != after_scores) | (status != portfolio.group_status)
+    return {
+        "threat_count": int(portfolio.group_count.sum()),
+        "changed_threats": int(portfolio.group_count[changed].sum()),
+        "portfolio_version": version,
+        "before": _distribution(
+            before_scores, portfolio.group_likelihood, portfolio.group_impact,
+            portfolio.group_status, portfolio.group_count
+        ),
+        "after": _distribution(after_scores, likelihood, impact, status, portfolio.group_count),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
@@ -0,0 +1,187 @@
+"""
+Technology Service - Normalized technology stack components and version queries
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, tuple_
+from typing import Iterable, List, Optional, Tuple
+import re
+from app.models.asset import Asset, AssetComponent
+
+# "log4j 2.14.1", "log4j@2.14.1", "log4j:2.14.1", "nginx/1.25", "Python v3.11"
+# 007_add_asset_components backfilled existing stacks with a copy of this pattern.
+ENTRY_PATTERN = re.compile(r"^(?P<name>.*?)[\s@:/]+v?(?P<major>\d+)(?:\.(?P<minor>\d+))?(?:\.(?P<patch>\d+))?\S*$")
+# "log4j-core-2.14.1", "openssl-3.0.7": a hyphen only separates a purely numeric trailing version.
+# 021_reparse_hyphen_components re-parsed existing components with a copy of this pattern.
+HYPHENATED_ENTRY_PATTERN = re.compile(
+    r"^(?P<name>.+?)-v?(?P<major>\d+)(?:\.(?P<minor>\d+))?(?:\.(?P<patch>\d+))?(?:\.\d+)*$"
+)
+
+COMPARATOR_PATTERN = re.compile(r"^(>=|<=|>|<|==|=|\^|~)?\s*v?(\d+|[xX*])(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?$")
+
+Version = Tuple[int, int, int]
+
+
+def parse_technology_entry(entry: str) -> dict:
+    """Split a technology stack entry into a normalized name and numeric version"""
+    entry = entry.strip()
+    match = ENTRY_PATTERN.match(entry) or HYPHENATED_ENTRY_PATTERN.match(entry)
+    if not match or not match.group("name").strip():
+        return {
+            "name": entry.lower(),
+            "raw_entry": entry,
+            "version": None,
+            "version_major": None,
+            "version_minor": None,
+            "version_patch": None,
+        }
+    return {
+        "name": match.group("name").strip().lower(),
+        "raw_entry": entry,
+        "version": entry[match.start("major"):].strip(),
+        "version_major": int(match.group("major")),
+        "version_minor": int(match.group("minor") or 0),
+        "version_patch": int(match.group("patch") or 0),
+    }
+
+
+def sync_asset_components(db: Session, assets: Iterable[Asset]) -> None:
+    """Replace the component rows of the given (flushed) assets from their technology_stack"""
+    assets = {asset.asset_id: asset for asset in assets}
+    if not assets:
+        return
+    db.query(AssetComponent).filter(
+        AssetComponent.asset_id.in_(list(assets))
+    ).delete(synchronize_session=False)
+
+    rows = []
+    for asset in assets.values():
+        seen = set()
+        for entry in asset.technology_stack or []:
+            if not entry or not entry.strip() or entry.strip() in seen:
+                continue
+            seen.add(entry.strip())
+            rows.append(AssetComponent(asset_id=asset.asset_id, **parse_technology_entry(entry)))
+    db.add_all(rows)
+
+
+def _parse_comparator(comparator: str) -> List[Tuple[str, Version]]:
+    """Translate one semver comparator into (operator, version) bounds; [] matches any version"""
+    match = COMPARATOR_PATTERN.match(comparator)
+    if not match:
+        raise ValueError(f"Invalid version comparator '{comparator}'")
+    operator = match.group(1) or "="
+    parts = [match.group(2), match.group(3), match.group(4)]
+
+    # Wildcards and missing parts ("2", "2.x", "2.14.*") describe a range
+    specified = []
+    for part in parts:
+        if part is None or part in ("x", "X", "*"):
+            break
+        specified.append(int(part))
+    if not specified:
+        if operator in ("=", "=="):
+            return []
+        raise ValueError(f"Invalid version comparator '{comparator}'")
+    lower = tuple(specified + [0] * (3 - len(specified)))
+
+    def upper_bound(bump_index: int) -> Version:
+        return lower[:bump_index] + (lower[bump_index] + 1,) + (0,) * (2 - bump_index)
+
+    if operator in ("=", "=="):
+        if len(specified) == 3:
+            return [("=", lower)]
+        # "2.14" / "2.14.x" -> >=2.14.0 <2.15.0
+        bump_index = len(specified) - 1
+    elif operator == "~":
+        # "~2.14.1" -> >=2.14.1 <2.15.0, "~2" -> >=2.0.0 <3.0.0
+        bump_index = min(len(specified) - 1, 1)
+    elif operator == "^":
+        # Caret allows changes that do not modify the left-most non-zero part
+        bump_index = next((i for i, value in enumerate(specified) if value != 0), len(specified) - 1)
+    elif len(specified) == 3 or operator in (">=", "<"):
+        # ">=2.14" -> >=2.14.0, "<2.14" -> <2.14.0
+        return [(operator, lower)]
+    elif operator == "<=":
+        # "<=2.14" covers every 2.14.x -> <2.15.0
+        return [("<", upper_bound(len(specified) - 1))]
+    else:
+        # ">2" excludes every 2.x.x -> >=3.0.0
+        return [(">=", upper_bound(len(specified) - 1))]
+
+    return [(">=", lower), ("<", upper_bound(bump_index))]
+
+
+def parse_version_range(version_range: str) -> List[List[Tuple[str, Version]]]:
+    """
+    Parse a semver range into OR-ed groups of AND-ed bounds.
+    Supports ">=2.0.0 <2.15.0", ">=2.0,<2.15", "^1.2", "~1.2.3", "2.x",
+    exact versions and "||" alternatives. Partial versions expand as in
+    semver ("<=2.14" is <2.15.0, ">2" is >=3.0.0). A range that matches any
+    version ("*", "x", or an alternative that is) returns [].
+    """
+    groups = []
+    for alternative in version_range.split("||"):
+        comparators = [
+            token for token in re.split(r"[,\s]+", re.sub(r"(>=|<=|>|<|==|=|\^|~)\s+", r"\1", alternative.strip()))
+            if token
+        ]
+        if not comparators:
+            raise ValueError("Empty version range")
+        bounds = []
+        for comparator in comparators:
+            bounds.extend(_parse_comparator(comparator))
+        if not bounds:
+            return []
+        groups.append(bounds)
+    return groups
+
+
+def _bound_clause(operator: str, version: Version):
+    version_columns = tuple_(
+        AssetComponent.version_major,
+        AssetComponent.version_minor,
+        AssetComponent.version_patch
+    )
+    if operator == ">=":
+        return version_columns >= tuple_(*version)
+    if operator == ">":
+        return version_columns > tuple_(*version)
+    if operator == "<=":
+        return version_columns <= tuple_(*version)
+    if operator == "<":
+        return version_columns < tuple_(*version)
+    return version_columns == tuple_(*version)
+
+
+def find_assets_by_technology(
+    db: Session,
+    name: str,
+    version_range: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50
+) -> Tuple[List[Tuple[Asset, AssetComponent]], int]:
+    """
+    Find assets running a component, optionally within a semver range.
+    The name match and the row-wise version comparisons are both served by
+    ix_asset_components_name_version.
+    """
+    query = db.query(Asset, AssetComponent).join(
+        AssetComponent, AssetComponent.asset_id == Asset.asset_id
+    ).filter(AssetComponent.name == name.strip().lower())
+
+    groups = parse_version_range(version_range) if version_range else []
+    if groups:
+        query = query.filter(
+            AssetComponent.version_major.isnot(None),
+            or_(*[and_(*[_bound_clause(operator, version) for operator, version in bounds]) for bounds in groups])
+        )
+
+    total = query.count()
+    matches = query.order_by(
+        AssetComponent.version_major,
+        AssetComponent.version_minor,
+        AssetComponent.version_patch,
+        Asset.name
+    ).offset(skip).limit(limit).all()
+
+    return matches, total
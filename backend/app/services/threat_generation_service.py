@@ -0,0 +1,298 @@
+"""
+Threat Generation Service - STRIDE-per-element threats from diagrams
+
+Canvas elements are classified the way a data flow diagram is read:
+asset nodes backed by a DATABASE asset are data stores, asset nodes outside
+every trust boundary (when the diagram has any) are external entities, the
+remaining asset nodes are processes, and 'data-flow' links are data flows.
+Each class gets the STRIDE categories that apply to it from RULES.
+
+Generation is incremental: every element's threat-relevant properties are
+fingerprinted and only new or changed elements are regenerated. Generated
+threats that nobody has triaged yet are replaced when their element changes
+or disappears; threats that moved past IDENTIFIED are left alone.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import exists, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+import hashlib
+import json
+from app.models.asset import Asset, AssetType
+from app.models.finding import Finding
+from app.models.risk import RiskAcceptance
+from app.models.threat import (
+    DiagramElementState, STRIDECategory, Threat, ThreatModelDiagram, ThreatStateHistory, ThreatStatus
+)
+from app.services.threat_service import THREAT_HEATMAP_CACHE, calculate_risk_score, insert_threats_bulk
+from app.services.asset_rollup_service import refresh_asset_rollups
+from app.core.cache import bump_cache_version
+
+EXTERNAL_ENTITY = "external_entity"
+PROCESS = "process"
+DATA_STORE = "data_store"
+DATA_FLOW = "data_flow"
+
+# (STRIDE category, title template, likelihood, impact, MITRE ATT&CK technique)
+RULES = {
+    EXTERNAL_ENTITY: [
+        (STRIDECategory.SPOOFING, "Spoofing of external entity {name}", 3, 3, "T1078"),
+        (STRIDECategory.REPUDIATION, "{name} can deny actions it initiated", 2, 2, "T1070"),
+    ],
+    PROCESS: [
+        (STRIDECategory.SPOOFING, "Spoofing of {name} identity", 3, 4, "T1078"),
+        (STRIDECategory.TAMPERING, "Tampering with {name} code or configuration", 2, 4, "T1059"),
+        (STRIDECategory.REPUDIATION, "Insufficient audit logging in {name}", 3, 2, "T1070"),
+        (STRIDECategory.INFO_DISCLOSURE, "Information disclosure from {name}", 3, 4, "T1005"),
+        (STRIDECategory.DOS, "Denial of service against {name}", 3, 3, "T1499"),
+        (STRIDECategory.ELEVATION, "Elevation of privilege in {name}", 2, 5, "T1548"),
+    ],
+    DATA_STORE: [
+        (STRIDECategory.TAMPERING, "Tampering with data stored in {name}", 2, 5, None),
+        (STRIDECategory.REPUDIATION, "Unaudited changes to data in {name}", 2, 3, "T1070"),
+        (STRIDECategory.INFO_DISCLOSURE, "Unauthorized read access to {name}", 3, 5, "T1005"),
+        (STRIDECategory.DOS, "Denial of service against {name}", 2, 4, "T1499"),
+    ],
+    DATA_FLOW: [
+        (STRIDECategory.TAMPERING, "Tampering with data flow {name}", 2, 4, None),
+        (STRIDECategory.INFO_DISCLOSURE, "Eavesdropping on data flow {name}", 3, 4, None),
+        (STRIDECategory.DOS, "Disruption of data flow {name}", 2, 3, "T1499"),
+    ],
+}
+
+# Flows that cross a trust boundary are more exposed
+BOUNDARY_CROSSING_LIKELIHOOD_BONUS = 1
+
+DEFAULT_NODE_SIZE = (120.0, 80.0)
+
+
+def _node_asset_id(node: dict) -> Optional[UUID]:
+    data = node.get("data") if isinstance(node.get("data"), dict) else {}
+    candidates = [data.get("id"), data.get("asset_id")]
+    node_id = str(node.get("id") or "")
+    if node_id.startswith("asset-"):
+        candidates.append(node_id[len("asset-"):])
+    for candidate in candidates:
+        try:
+            return UUID(str(candidate))
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _rect(node: dict) -> tuple:
+    x = float(node.get("x") or 0)
+    y = float(node.get("y") or 0)
+    return (
+        x,
+        y,
+        x + float(node.get("width") or DEFAULT_NODE_SIZE[0]),
+        y + float(node.get("height") or DEFAULT_NODE_SIZE[1])
+    )
+
+
+def extract_elements(canvas_data: dict, assets: Dict[UUID, Asset]) -> Dict[str, dict]:
+    """Classify canvas nodes and links into DFD elements keyed by element_key"""
+    canvas = canvas_data if isinstance(canvas_data, dict) else {}
+    nodes = [node for node in canvas.get("nodes") or [] if isinstance(node, dict) and node.get("id")]
+    links = [link for link in canvas.get("links") or [] if isinstance(link, dict) and link.get("id")]
+
+    boundaries = {
+        str(node["id"]): _rect(node)
+        for node in nodes if node.get("type") == "trust-boundary"
+    }
+
+    def zones(node: dict) -> frozenset:
+        left, top, right, bottom = _rect(node)
+        center_x, center_y = (left + right) / 2, (top + bottom) / 2
+        return frozenset(
+            boundary_id for boundary_id, (b_left, b_top, b_right, b_bottom) in boundaries.items()
+            if b_left <= center_x <= b_right and b_top <= center_y <= b_bottom
+        )
+
+    elements = {}
+    asset_nodes = {}
+    for node in nodes:
+        if node.get("type") != "asset":
+            continue
+        asset = assets.get(_node_asset_id(node))
+        if asset is None:
+            continue
+        node_zones = zones(node)
+        if asset.type == AssetType.DATABASE:
+            kind = DATA_STORE
+        elif boundaries and not node_zones:
+            kind = EXTERNAL_ENTITY
+        else:
+            kind = PROCESS
+        asset_nodes[str(node["id"])] = (asset, node_zones)
+        elements[f"node:{node['id']}"] = {
+            "kind": kind,
+            "asset_id": asset.asset_id,
+            "name": asset.name,
+        }
+
+    for link in links:
+        if link.get("type", "data-flow") != "data-flow":
+            continue
+        source = asset_nodes.get(str(link.get("source")))
+        target = asset_nodes.get(str(link.get("target")))
+        if not source or not target:
+            continue
+        elements[f"link:{link['id']}"] = {
+            "kind": DATA_FLOW,
+            # The receiving asset owns threats against what flows into it
+            "asset_id": target[0].asset_id,
+            "name": f"{source[0].name} -> {target[0].name}",
+            "crosses_boundary": source[1] != target[1],
+        }
+
+    return elements
+
+
+def fingerprint_element(element: dict) -> str:
+    """Stable hash of the properties that threat generation depends on"""
+    payload = json.dumps(element, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def build_threats(element: dict) -> List[dict]:
+    """Apply the STRIDE rule table to one element"""
+    bonus = BOUNDARY_CROSSING_LIKELIHOOD_BONUS if element.get("crosses_boundary") else 0
+    suffix = " across a trust boundary" if element.get("crosses_boundary") else ""
+    return [
+        {
+            "asset_id": element["asset_id"],
+            "title": template.format(name=element["name"]) + suffix,
+            "stride_category": stride_category,
+            "mitre_attack_id": mitre_attack_id,
+            "likelihood_score": min(likelihood + bonus, 5),
+            "impact_score": impact,
+            "auto_generated": True,
+        }
+        for stride_category, template, likelihood, impact, mitre_attack_id in RULES[element["kind"]]
+    ]
+
+
+def _delete_untriaged_threats(db: Session, threat_ids: Set[UUID]) -> Dict[UUID, UUID]:
+    """Delete generated threats nobody has acted on; returns their asset ids by threat id"""
+    if not threat_ids:
+        return {}
+    deletable = {
+        threat_id: asset_id for threat_id, asset_id in db.query(Threat.threat_id, Threat.asset_id).filter(
+            Threat.threat_id.in_(list(threat_ids)),
+            Threat.auto_generated.is_(True),
+            Threat.status == ThreatStatus.IDENTIFIED,
+            ~exists().where(Finding.threat_id == Threat.threat_id),
+            ~exists().where(RiskAcceptance.threat_id == Threat.threat_id)
+        ).all()
+    }
+    if deletable:
+        db.query(ThreatStateHistory).filter(
+            ThreatStateHistory.threat_id.in_(list(deletable))
+        ).delete(synchronize_session=False)
+        db.query(Threat).filter(Threat.threat_id.in_(list(deletable))).delete(synchronize_session=False)
+        refresh_asset_rollups(db, set(deletable.values()))
+        bump_cache_version(db, THREAT_HEATMAP_CACHE)
+    return deletable
+
+
+def generate_diagram_threats(db: Session, diagram_id: UUID, generated_by: UUID) -> Optional[dict]:
+    """Generate STRIDE threats for the new or changed elements of a diagram"""
+    diagram = db.query(ThreatModelDiagram).filter(
+        ThreatModelDiagram.diagram_id == diagram_id
+    ).with_for_update().first()
+    if not diagram:
+        return None
+
+    canvas = diagram.canvas_data if isinstance(diagram.canvas_data, dict) else {}
+    referenced = {
+        asset_id for asset_id in (
+            _node_asset_id(node) for node in canvas.get("nodes") or []
+            if isinstance(node, dict) and node.get("type") == "asset"
+        ) if asset_id
+    }
+    assets = {
+        asset.asset_id: asset
+        for asset in db.query(Asset).filter(Asset.asset_id.in_(referenced)).all()
+    } if referenced else {}
+
+    elements = extract_elements(canvas, assets)
+    fingerprints = {key: fingerprint_element(element) for key, element in elements.items()}
+    states = {
+        state.element_key: state
+        for state in db.query(DiagramElementState).filter(DiagramElementState.diagram_id == diagram_id).all()
+    }
+
+    changed = [key for key in elements if key not in states or states[key].fingerprint != fingerprints[key]]
+    removed = [key for key in states if key not in elements]
+
+    deleted = _delete_untriaged_threats(
+        db, {threat_id for key in changed + removed if key in states for threat_id in states[key].threat_ids}
+    )
+
+    # Threats kept from a previous generation are not generated twice
+    kept = {}
+    for key in changed:
+        if key in states:
+            kept[key] = [threat_id for threat_id in states[key].threat_ids if threat_id not in deleted]
+    kept_titles = {
+        (asset_id, title)
+        for asset_id, title in db.query(Threat.asset_id, Threat.title).filter(
+            Threat.threat_id.in_([threat_id for ids in kept.values() for threat_id in ids])
+        ).all()
+    } if kept else set()
+
+    new_threats = []
+    owners = []
+    for key in changed:
+        for threat in build_threats(elements[key]):
+            if (threat["asset_id"], threat["title"]) in kept_titles:
+                continue
+            threat["risk_score"] = calculate_risk_score(
+                assets[threat["asset_id"]], threat["likelihood_score"], threat["impact_score"]
+            )
+            new_threats.append(threat)
+            owners.append(key)
+
+    created_ids = insert_threats_bulk(db, new_threats, generated_by)
+    threat_ids_by_element = {key: list(kept.get(key, [])) for key in changed}
+    for key, threat_id in zip(owners, created_ids):
+        threat_ids_by_element[key].append(threat_id)
+
+    if changed:
+        stmt = pg_insert(DiagramElementState).values([
+            {
+                "diagram_id": diagram_id,
+                "element_key": key,
+                "fingerprint": fingerprints[key],
+                "threat_ids": threat_ids_by_element[key],
+            }
+            for key in changed
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DiagramElementState.diagram_id, DiagramElementState.element_key],
+            set_={
+                "fingerprint": stmt.excluded.fingerprint,
+                "threat_ids": stmt.excluded.threat_ids,
+                "updated_at": func.now(),
+            }
+        )
+        db.execute(stmt)
+    if removed:
+        db.query(DiagramElementState).filter(
+            DiagramElementState.diagram_id == diagram_id,
+            DiagramElementState.element_key.in_(removed)
+        ).delete(synchronize_session=False)
+
+    db.commit()
+
+    return {
+        "diagram_id": diagram_id,
+        "elements": len(elements),
+        "changed": len(changed),
+        "removed": len(removed),
+        "created": len(created_ids),
+        "deleted": len(deleted),
+    }
@@ -2,13 +2,23 @@
 Threat Service - Business Logic
 """
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from uuid import UUID
+from sqlalchemy import case, func, insert
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
 from decimal import Decimal
+from app.core.cache import LRUCache, bump_cache_version, get_cache_version
+from app.core.config import settings
 from app.models.threat import Threat, ThreatStateHistory, ThreatStatus
-from app.models.asset import Asset
+from app.models.asset import Asset, ClassificationLevel
+from app.models.user import User
 from app.schemas.threat import ThreatCreate, ThreatUpdate, ThreatTransition
 from app.services.risk_service import RiskService
+from app.services.asset_rollup_service import refresh_asset_rollups
+
+# Bumped on every threat write that can move a threat between heatmap cells
+THREAT_HEATMAP_CACHE = "threat_heatmap"
+
+_heatmap_cache = LRUCache(maxsize=256, ttl=settings.RISK_HEATMAP_CACHE_TTL_SECONDS)
 
 
 def calculate_risk_score(
@@ -54,10 +64,9 @@ def create_threat(db: Session, threat_data: ThreatCreate, created_by_user_id: UU
     )
     
     db.add(threat)
-    db.commit()
-    db.refresh(threat)
+    db.flush()
     
-    # Create initial state history entry
+    # Create initial state history entry in the same transaction
     state_history = ThreatStateHistory(
         threat_id=threat.threat_id,
         from_state=ThreatStatus.IDENTIFIED,
@@ -65,11 +74,88 @@ def create_threat(db: Session, threat_data: ThreatCreate, created_by_user_id: UU
         changed_by=created_by_user_id
     )
     db.add(state_history)
+    refresh_asset_rollups(db, [threat.asset_id])
+    bump_cache_version(db, THREAT_HEATMAP_CACHE)
     db.commit()
+    db.refresh(threat)
     
     return threat
 
 
+def create_threats_bulk(db: Session, threats_data: List[ThreatCreate], created_by_user_id: UUID) -> List[UUID]:
+    """
+    Create many threats in one transaction. Each referenced asset is loaded
+    once; the whole batch is rejected if any of them does not exist.
+    """
+    asset_ids = {threat_data.asset_id for threat_data in threats_data}
+    assets = {
+        asset.asset_id: asset
+        for asset in db.query(Asset).filter(Asset.asset_id.in_(asset_ids)).all()
+    }
+    missing = asset_ids - assets.keys()
+    if missing:
+        raise ValueError(f"Assets not found: {', '.join(sorted(str(asset_id) for asset_id in missing))}")
+    
+    threat_ids = insert_threats_bulk(
+        db,
+        [
+            {
+                **threat_data.model_dump(),
+                "risk_score": calculate_risk_score(
+                    assets[threat_data.asset_id],
+                    threat_data.likelihood_score,
+                    threat_data.impact_score
+                ),
+            }
+            for threat_data in threats_data
+        ],
+        created_by_user_id
+    )
+    db.commit()
+    return threat_ids
+
+
+def insert_threats_bulk(db: Session, threats: List[dict], changed_by: UUID) -> List[UUID]:
+    """
+    Insert threats and their initial IDENTIFIED history rows with one
+    multi-row INSERT each. Rows must carry asset_id, title, likelihood_score,
+    impact_score and risk_score. Rollups and the heatmap cache are refreshed;
+    the caller commits.
+    """
+    if not threats:
+        return []
+    
+    threat_rows = []
+    history_rows = []
+    for threat in threats:
+        threat_id = uuid4()
+        threat_rows.append({
+            "threat_id": threat_id,
+            "asset_id": threat["asset_id"],
+            "title": threat["title"],
+            "stride_category": threat.get("stride_category"),
+            "mitre_attack_id": threat.get("mitre_attack_id"),
+            "likelihood_score": threat["likelihood_score"],
+            "impact_score": threat["impact_score"],
+            "risk_score": threat["risk_score"],
+            "status": ThreatStatus.IDENTIFIED,
+            "auto_generated": threat.get("auto_generated", False),
+        })
+        history_rows.append({
+            "history_id": uuid4(),
+            "threat_id": threat_id,
+            "from_state": ThreatStatus.IDENTIFIED,
+            "to_state": ThreatStatus.IDENTIFIED,
+            "changed_by": changed_by,
+        })
+    
+    db.execute(insert(Threat), threat_rows)
+    db.execute(insert(ThreatStateHistory), history_rows)
+    refresh_asset_rollups(db, {row["asset_id"] for row in threat_rows})
+    bump_cache_version(db, THREAT_HEATMAP_CACHE)
+    return [row["threat_id"] for row in threat_rows]
+
+
 def get_threat(db: Session, threat_id: UUID) -> Optional[Threat]:
     """Get threat by ID"""
     return db.query(Threat).filter(Threat.threat_id == threat_id).first()
@@ -143,6 +229,12 @@ def update_threat(
     for key, value in update_data.items():
         setattr(threat, key, value)
     
+    if 'risk_score' in update_data or 'status' in update_data:
+        refresh_asset_rollups(db, [threat.asset_id])
+    # stride_category only matters to the risk simulation, which shares the heatmap version
+    if any(key in update_data for key in ['likelihood_score', 'impact_score', 'status', 'stride_category']):
+        bump_cache_version(db, THREAT_HEATMAP_CACHE)
+    
     db.commit()
     db.refresh(threat)
     return threat
@@ -177,12 +269,66 @@ def transition_threat_status(
         changed_by=current_user_id
     )
     db.add(state_history)
+    refresh_asset_rollups(db, [threat.asset_id])
+    bump_cache_version(db, THREAT_HEATMAP_CACHE)
     
     db.commit()
     db.refresh(threat)
     return threat
 
 
+def transition_threats_bulk(
+    db: Session,
+    threat_ids: List[UUID],
+    transition: ThreatTransition,
+    current_user_id: UUID
+) -> Tuple[List[UUID], List[str]]:
+    """
+    Move many threats to one status in a single transaction. Threats that
+    do not exist or cannot make the transition are reported and skipped.
+    """
+    requested = list(dict.fromkeys(threat_ids))
+    rows = {
+        row.threat_id: row
+        for row in db.query(Threat.threat_id, Threat.asset_id, Threat.status).filter(
+            Threat.threat_id.in_(requested)
+        ).with_for_update().all()
+    }
+    new_status = transition.to_state
+    
+    transitioned = []
+    errors = []
+    for threat_id in requested:
+        row = rows.get(threat_id)
+        if row is None:
+            errors.append(f"Threat {threat_id} not found")
+        elif not is_valid_transition(row.status, new_status):
+            errors.append(f"Threat {threat_id}: invalid state transition from {row.status} to {new_status}")
+        else:
+            transitioned.append(threat_id)
+    
+    if transitioned:
+        db.query(Threat).filter(Threat.threat_id.in_(transitioned)).update(
+            {Threat.status: new_status},
+            synchronize_session=False
+        )
+        db.execute(insert(ThreatStateHistory), [
+            {
+                "history_id": uuid4(),
+                "threat_id": threat_id,
+                "from_state": rows[threat_id].status,
+                "to_state": new_status,
+                "changed_by": current_user_id,
+            }
+            for threat_id in transitioned
+        ])
+        refresh_asset_rollups(db, {rows[threat_id].asset_id for threat_id in transitioned})
+        bump_cache_version(db, THREAT_HEATMAP_CACHE)
+    db.commit()
+    
+    return transitioned, errors
+
+
 def is_valid_transition(from_status: ThreatStatus, to_status: ThreatStatus) -> bool:
     """Validate if a state transition is allowed"""
     # Same state is always valid (for initial creation)
@@ -211,16 +357,133 @@ def delete_threat(db: Session, threat_id: UUID) -> bool:
         return False
     
     db.delete(threat)
+    refresh_asset_rollups(db, [threat.asset_id])
+    bump_cache_version(db, THREAT_HEATMAP_CACHE)
     db.commit()
     return True
 
 
+def _compute_risk_heatmap(
+    db: Session,
+    asset_id: Optional[UUID],
+    status: Optional[ThreatStatus],
+    classification_level: Optional[ClassificationLevel]
+) -> List[dict]:
+    # (likelihood + impact) / 2 * 20 scaled to 0-100, bucketed at 80/60/40
+    risk_level = case(
+        (Threat.likelihood_score + Threat.impact_score >= 8, "critical"),
+        (Threat.likelihood_score + Threat.impact_score >= 6, "high"),
+        (Threat.likelihood_score + Threat.impact_score >= 4, "medium"),
+        else_="low"
+    )
+
+    query = db.query(
+        Threat.likelihood_score,
+        Threat.impact_score,
+        func.count(Threat.threat_id),
+        risk_level
+    )
+    if asset_id:
+        query = query.filter(Threat.asset_id == asset_id)
+    if status:
+        query = query.filter(Threat.status == status)
+    if classification_level:
+        query = query.join(Asset, Asset.asset_id == Threat.asset_id).filter(
+            Asset.classification_level == classification_level
+        )
+
+    results = query.group_by(Threat.likelihood_score, Threat.impact_score).all()
+
+    return [
+        {"likelihood": likelihood, "impact": impact, "count": count, "risk": risk}
+        for likelihood, impact, count, risk in results
+    ]
+
+
+def get_risk_heatmap(
+    db: Session,
+    asset_id: Optional[UUID] = None,
+    status: Optional[ThreatStatus] = None,
+    classification_level: Optional[ClassificationLevel] = None
+) -> List[dict]:
+    """
+    Threat counts per (likelihood, impact) cell with their risk level.
+    Results are cached per filter set and heatmap version, with a TTL as a
+    safety net; concurrent identical requests share one query.
+    """
+    version = get_cache_version(db, THREAT_HEATMAP_CACHE)
+    cache_key = (version, asset_id, status, classification_level)
+    return _heatmap_cache.get_or_compute(
+        cache_key,
+        lambda: _compute_risk_heatmap(db, asset_id, status, classification_level)
+    )
+
+
+def _state_history_query(db: Session):
+    """History rows with the changing user's name joined in"""
+    return db.query(
+        ThreatStateHistory.history_id,
+        ThreatStateHistory.threat_id,
+        ThreatStateHistory.from_state,
+        ThreatStateHistory.to_state,
+        ThreatStateHistory.changed_by,
+        func.coalesce(User.full_name, "Unknown").label("changed_by_name"),
+        ThreatStateHistory.changed_at
+    ).outerjoin(User, User.user_id == ThreatStateHistory.changed_by)
+
+
 def get_threat_state_history(
     db: Session,
     threat_id: UUID
-) -> List[ThreatStateHistory]:
+) -> List:
     """Get state history for a threat"""
-    return db.query(ThreatStateHistory).filter(
+    return _state_history_query(db).filter(
         ThreatStateHistory.threat_id == threat_id
     ).order_by(ThreatStateHistory.changed_at.desc()).all()
 
+
+def get_threat_timeline(
+    db: Session,
+    threat_id: UUID,
+    skip: int = 0,
+    limit: int = 50
+) -> Tuple[List, int]:
+    """
+    One page of a threat's state history, newest first. Served by
+    ix_threat_state_history_threat_id_changed_at; the page carries its
+    total via a window count.
+    """
+    rows = _state_history_query(db).add_columns(
+        func.count().over().label("total")
+    ).filter(
+        ThreatStateHistory.threat_id == threat_id
+    ).order_by(
+        ThreatStateHistory.changed_at.desc(), ThreatStateHistory.history_id
+    ).offset(skip).limit(limit).all()
+
+    if rows:
+        total = rows[0].total
+    elif skip:
+        # A page past the end has no rows to carry the window count
+        total = db.query(ThreatStateHistory).filter(ThreatStateHistory.threat_id == threat_id).count()
+    else:
+        total = 0
+
+    return rows, total
+
+
+def get_latest_transitions(db: Session, threat_ids: Iterable[UUID]) -> Dict[UUID, object]:
+    """Latest state history row per threat, for list views (one DISTINCT ON query)"""
+    threat_ids = list(set(threat_ids))
+    if not threat_ids:
+        return {}
+
+    rows = _state_history_query(db).filter(
+        ThreatStateHistory.threat_id.in_(threat_ids)
+    ).distinct(ThreatStateHistory.threat_id).order_by(
+        ThreatStateHistory.threat_id,
+        ThreatStateHistory.changed_at.desc(),
+        ThreatStateHistory.history_id
+    ).all()
+
+    return {row.threat_id: row for row in rows}
@@ -0,0 +1,238 @@
+"""
+Violation Retention Service - Monthly partitions of policy_violations
+
+policy_violations is range-partitioned by UTC month on evaluated_at, one
+partition per month named policy_violations_yYYYYmMM. Rows no monthly
+partition covers land in policy_violations_default, so inserts never depend
+on maintenance having run. The daily maintenance run splits any months
+found in the default partition into their own partitions, keeps
+POLICY_VIOLATION_PARTITIONS_AHEAD future partitions in place, rolls
+finished months up into policy_violation_monthly_summaries, and drops
+partitions older than POLICY_VIOLATION_RETENTION_MONTHS. Dropping a
+partition is a catalog operation, not a DELETE, so it takes no time
+regardless of how many rows it holds.
+
+Violations that are still active when their partition expires are carried
+into the oldest retained month, so the current state never depends on
+retention. Carried rows are flagged carried_forward and left out of
+rollups and history, which already counted them in their original month.
+History reads summaries for the months they cover and the raw rows for the
+rest.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from datetime import date, datetime, timezone
+import re
+from app.core.config import settings
+from app.models.policy import GateDecision, PolicyViolationMonthlySummary
+
+PARTITION_NAME = re.compile(r"^policy_violations_y(\d{4})m(\d{2})$")
+DEFAULT_PARTITION = "policy_violations_default"
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after (or before) month"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month() -> date:
+    return datetime.now(timezone.utc).date().replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"policy_violations_y{month.year:04d}m{month.month:02d}"
+
+
+def _month_bounds(month: date) -> Tuple[datetime, datetime]:
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    end_month = add_months(month, 1)
+    return start, datetime(end_month.year, end_month.month, 1, tzinfo=timezone.utc)
+
+
+def get_violation_partitions(db: Session) -> List[Tuple[date, str]]:
+    """(month, partition name) of every monthly partition, oldest first"""
+    partitions = []
+    for (name,) in db.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'policy_violations'::regclass
+    """)):
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions.append((date(int(match.group(1)), int(match.group(2)), 1), name))
+    return sorted(partitions)
+
+
+def _create_partition(db: Session, month: date) -> None:
+    """
+    Create a month's partition if missing. Rows of that month already in the
+    default partition are moved into it: a partition cannot be added while
+    the default one holds rows of its range.
+    """
+    name = partition_name(month)
+    if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return
+    start, end = _month_bounds(month)
+    # Identifiers and bounds come from dates, never from input
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    # Blocks inserts into the default partition until the new partition takes over its range
+    db.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN EXCLUSIVE MODE"))
+    params = {"start": start, "end": end}
+    stranded = db.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE evaluated_at >= :start AND evaluated_at < :end)"
+    ), params).scalar()
+    if not stranded:
+        db.execute(text(f"CREATE TABLE {name} PARTITION OF policy_violations {bounds}"))
+        return
+    db.execute(text(f"CREATE TABLE {name} (LIKE policy_violations INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION} WHERE evaluated_at >= :start AND evaluated_at < :end RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), params)
+    # Attaching builds the partitioned indexes and foreign keys on the new table
+    db.execute(text(f"ALTER TABLE policy_violations ATTACH PARTITION {name} {bounds}"))
+
+
+def ensure_violation_partitions(db: Session, months_ahead: Optional[int] = None) -> List[str]:
+    """
+    Create any missing partitions from the current month to months_ahead
+    months out, and for any month with rows in the default partition. Commits.
+    """
+    months_ahead = settings.POLICY_VIOLATION_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    existing = {month for month, _ in get_violation_partitions(db)}
+    months = {add_months(current_month(), offset) for offset in range(months_ahead + 1)}
+    months.update(month for (month,) in db.execute(text(f"""
+        SELECT DISTINCT (date_trunc('month', evaluated_at AT TIME ZONE 'UTC'))::date FROM {DEFAULT_PARTITION}
+    """)))
+    created = []
+    for month in sorted(months - existing):
+        _create_partition(db, month)
+        db.commit()
+        created.append(partition_name(month))
+    return created
+
+
+def rollup_violation_months(db: Session, months: Sequence[date]) -> int:
+    """
+    Recompute the monthly summaries of the given months from the raw rows;
+    re-running picks up violations retired since. Commits.
+    """
+    rows = 0
+    for month in months:
+        start, end = _month_bounds(month)
+        rows += db.execute(text("""
+            INSERT INTO policy_violation_monthly_summaries
+                (month, policy_rule_id, gate_decision, violation_count, retired_count, finding_count, rolled_up_at)
+            SELECT :month, policy_rule_id, gate_decision,
+                   count(*), count(retired_at), count(DISTINCT finding_id), now()
+            FROM policy_violations
+            WHERE evaluated_at >= :start AND evaluated_at < :end AND NOT carried_forward
+            GROUP BY policy_rule_id, gate_decision
+            ON CONFLICT (month, policy_rule_id, gate_decision) DO UPDATE SET
+                violation_count = EXCLUDED.violation_count,
+                retired_count = EXCLUDED.retired_count,
+                finding_count = EXCLUDED.finding_count,
+                rolled_up_at = EXCLUDED.rolled_up_at
+        """), {"month": month, "start": start, "end": end}).rowcount
+    db.commit()
+    return rows
+
+
+def drop_expired_violation_partitions(db: Session, retention_months: Optional[int] = None) -> dict:
+    """
+    Drop the partitions of months before the retention window (the current
+    month and the retention_months - 1 before it), after a final rollup.
+    Active violations in them are re-inserted at the start of the oldest
+    retained month first, flagged carried_forward so no later rollup counts
+    them again. Commits once per partition.
+    """
+    retention_months = retention_months or settings.POLICY_VIOLATION_RETENTION_MONTHS
+    cutoff = add_months(current_month(), -(retention_months - 1))
+    cutoff_start, _ = _month_bounds(cutoff)
+    dropped = []
+    carried_forward = 0
+    for month, name in get_violation_partitions(db):
+        if month >= cutoff:
+            break
+        rollup_violation_months(db, [month])
+        _create_partition(db, cutoff)
+        carried_forward += db.execute(text(f"""
+            INSERT INTO policy_violations
+                (violation_id, finding_id, policy_rule_id, gate_decision, evaluated_at, retired_at, carried_forward)
+            SELECT violation_id, finding_id, policy_rule_id, gate_decision, :cutoff_start, NULL, true
+            FROM {name}
+            WHERE retired_at IS NULL
+        """), {"cutoff_start": cutoff_start}).rowcount
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+        dropped.append(name)
+    return {"dropped": dropped, "carried_forward": carried_forward}
+
+
+def maintain_violation_partitions(db: Session) -> dict:
+    """
+    Daily upkeep: create upcoming partitions and split months out of the
+    default partition, roll up the previous month (again, to pick up late
+    retirements), and drop expired partitions
+    """
+    created = ensure_violation_partitions(db)
+    previous_month = add_months(current_month(), -1)
+    rollup_violation_months(db, [previous_month])
+    result = drop_expired_violation_partitions(db)
+    return {"created": created, "rolled_up": previous_month.isoformat(), **result}
+
+
+def get_violation_history(db: Session, policy_id: UUID, months: int = 12) -> List[dict]:
+    """
+    Violations per month for a policy rule over the last `months` months,
+    oldest first: monthly summaries where a month has been rolled up, raw
+    rows otherwise (always the case for the current month)
+    """
+    first_month = add_months(current_month(), -(months - 1))
+    history: Dict[date, dict] = {
+        add_months(first_month, offset): {"blocked": 0, "warned": 0, "retired": 0, "findings": 0}
+        for offset in range(months)
+    }
+
+    def add(month: date, gate_decision: GateDecision, violations: int, retired: int, findings: int) -> None:
+        entry = history[month]
+        if gate_decision == GateDecision.BLOCK:
+            entry["blocked"] += violations
+        elif gate_decision == GateDecision.WARN:
+            entry["warned"] += violations
+        entry["retired"] += retired
+        # Distinct per decision: a finding both warned about and blocked in a month counts twice
+        entry["findings"] += findings
+
+    summarized = set()
+    for summary in db.query(PolicyViolationMonthlySummary).filter(
+        PolicyViolationMonthlySummary.policy_rule_id == policy_id,
+        PolicyViolationMonthlySummary.month >= first_month
+    ):
+        summarized.add(summary.month)
+        add(summary.month, summary.gate_decision, summary.violation_count, summary.retired_count,
+            summary.finding_count)
+
+    live_months = [month for month in history if month not in summarized]
+    if live_months:
+        # Partition pruning and the (policy_rule_id, evaluated_at) index keep this to the live months
+        start, _ = _month_bounds(min(live_months))
+        _, end = _month_bounds(max(live_months))
+        for month, gate_decision, violations, retired, findings in db.execute(text("""
+            SELECT (date_trunc('month', evaluated_at AT TIME ZONE 'UTC'))::date, gate_decision,
+                   count(*), count(retired_at), count(DISTINCT finding_id)
+            FROM policy_violations
+            WHERE policy_rule_id = :policy_id AND evaluated_at >= :start AND evaluated_at < :end
+              AND NOT carried_forward
+            GROUP BY 1, 2
+        """), {"policy_id": policy_id, "start": start, "end": end}):
+            if month not in summarized:
+                add(month, GateDecision(gate_decision), violations, retired, findings)
+
+    return [{"month": month, **entry} for month, entry in sorted(history.items())]
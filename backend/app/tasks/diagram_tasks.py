@@ -0,0 +1,31 @@
+"""
+Threat Model Diagram Tasks
+"""
+from uuid import UUID
+from app.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.services.diagram_service import refresh_diagram_thumbnail
+from app.services.threat_generation_service import generate_diagram_threats
+
+
+@celery_app.task(queue="diagram_rendering_queue", ignore_result=True)
+def render_diagram_thumbnail_task(diagram_id: str):
+    """Render the listing thumbnail for a diagram's current canvas"""
+    db = SessionLocal()
+    try:
+        return refresh_diagram_thumbnail(db, diagram_id)
+    finally:
+        db.close()
+
+
+@celery_app.task(queue="risk_analysis_queue")
+def generate_diagram_threats_task(diagram_id: str, user_id: str):
+    """Generate STRIDE threats for the elements of a diagram changed since the last run"""
+    db = SessionLocal()
+    try:
+        result = generate_diagram_threats(db, UUID(diagram_id), UUID(user_id))
+        if result is None:
+            return None
+        return {**result, "diagram_id": str(result["diagram_id"])}
+    finally:
+        db.close()
@@ -0,0 +1,145 @@
+"""
+Policy Evaluation Tasks
+"""
+from celery import chord
+from sqlalchemy import text
+from datetime import datetime, timezone
+from uuid import UUID
+import logging
+from app.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.services.compliance_service import refresh_compliance_matrix
+from app.services.policy_evaluation_service import (
+    evaluate_finding_chunk,
+    get_evaluable_policies,
+    mark_policies_evaluated,
+    plan_finding_chunks,
+    reevaluate_changed,
+    summarize_evaluation_run
+)
+from app.services.violation_retention_service import maintain_violation_partitions
+
+logger = logging.getLogger(__name__)
+
+# Session-level advisory lock: one incremental run at a time across all workers
+REEVALUATION_LOCK = "policy_reevaluation"
+
+
+@celery_app.task(queue="policy_evaluation_queue")
+def evaluate_active_policies_task():
+    """
+    Evaluate every active policy against every OPEN finding: one chunk task
+    per finding_id range, fanned out across workers, then a summary callback
+    """
+    started_at = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        policy_ids = [str(policy.policy_rule_id) for policy in get_evaluable_policies(db)]
+        chunks = plan_finding_chunks(db, settings.POLICY_EVALUATION_CHUNK_SIZE) if policy_ids else []
+    finally:
+        db.close()
+
+    if not chunks:
+        return finish_policy_evaluation_task([], policy_ids, started_at.isoformat())
+
+    callback = finish_policy_evaluation_task.s(policy_ids, started_at.isoformat())
+    result = chord(
+        evaluate_policy_chunk_task.s(first_id, last_id, policy_ids) for first_id, last_id, _ in chunks
+    )(callback)
+    return {
+        "policies": len(policy_ids),
+        "chunks": len(chunks),
+        "findings": sum(count for _, _, count in chunks),
+        "summary_task_id": result.id,
+    }
+
+
+@celery_app.task(queue="policy_evaluation_queue")
+def evaluate_policy_chunk_task(first_finding_id: str, last_finding_id: str, policy_ids: list):
+    """Evaluate the policies against one finding_id range and bulk-insert violations"""
+    db = SessionLocal()
+    try:
+        return evaluate_finding_chunk(
+            db, UUID(first_finding_id), UUID(last_finding_id), [UUID(policy_id) for policy_id in policy_ids]
+        )
+    finally:
+        db.close()
+
+
+@celery_app.task(queue="policy_evaluation_queue")
+def finish_policy_evaluation_task(chunk_results: list, policy_ids: list, started_at: str):
+    """Stamp last_evaluated on the policies and report throughput"""
+    started = datetime.fromisoformat(started_at)
+    db = SessionLocal()
+    try:
+        mark_policies_evaluated(db, [UUID(policy_id) for policy_id in policy_ids], started)
+    finally:
+        db.close()
+
+    summary = summarize_evaluation_run(chunk_results, started, datetime.now(timezone.utc))
+    refresh_compliance_matrix_task.delay()
+    logger.info(
+        f"Policy evaluation: {summary['findings']} findings x {len(policy_ids)} policies in "
+        f"{summary['elapsed_seconds']}s ({summary['findings_per_second']} findings/sec, "
+        f"{summary['violations']} new violations)"
+    )
+    return {**summary, "policies": len(policy_ids)}
+
+
+@celery_app.task(queue="policy_evaluation_queue", ignore_result=True)
+def reevaluate_changed_policies_task():
+    """
+    Incremental evaluation of changed findings and edited policies. Runs
+    every minute; a run that finds the previous one still going skips.
+    """
+    with engine.connect() as lock_connection:
+        acquired = lock_connection.execute(
+            text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": REEVALUATION_LOCK}
+        ).scalar()
+        if not acquired:
+            logger.info("Policy re-evaluation skipped: previous run still in progress")
+            return None
+        db = SessionLocal()
+        try:
+            summary = reevaluate_changed(db)
+        finally:
+            db.close()
+            lock_connection.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": REEVALUATION_LOCK})
+            lock_connection.commit()
+
+    if summary["violations"] or summary["retired"] or summary["full_policies"]:
+        refresh_compliance_matrix_task.delay()
+    if summary["evaluations"] or summary["retired"]:
+        logger.info(
+            f"Policy re-evaluation: {summary['findings']} findings, {summary['full_policies']} full / "
+            f"{summary['incremental_policies']} incremental policies, {summary['violations']} new and "
+            f"{summary['retired']} retired violations ({summary['findings_per_second']} findings/sec)"
+        )
+    return summary
+
+
+@celery_app.task(queue="policy_evaluation_queue", ignore_result=True)
+def refresh_compliance_matrix_task():
+    """Recompute the compliance control status view after violations changed"""
+    db = SessionLocal()
+    try:
+        refresh_compliance_matrix(db)
+    finally:
+        db.close()
+
+
+@celery_app.task(queue="policy_evaluation_queue")
+def maintain_violation_partitions_task():
+    """Create upcoming violation partitions, roll up last month and drop expired months"""
+    db = SessionLocal()
+    try:
+        result = maintain_violation_partitions(db)
+    finally:
+        db.close()
+    if result["created"] or result["dropped"]:
+        logger.info(
+            f"Violation partitions: created {result['created']}, dropped {result['dropped']} "
+            f"({result['carried_forward']} active violations carried forward)"
+        )
+    return result
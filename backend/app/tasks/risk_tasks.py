@@ -0,0 +1,28 @@
+"""
+Risk Analysis Tasks
+"""
+from app.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.services.risk_propagation_service import recalculate_inherited_risk
+from app.services.analytics_service import capture_risk_snapshot
+
+
+@celery_app.task(queue="risk_analysis_queue")
+def recalculate_inherited_risk_task():
+    """Propagate threat risk along the asset graph and persist inherited scores"""
+    db = SessionLocal()
+    try:
+        return recalculate_inherited_risk(db)
+    finally:
+        db.close()
+
+
+@celery_app.task(queue="risk_analysis_queue")
+def capture_risk_snapshot_task():
+    """Write today's risk posture snapshot for the trend charts"""
+    db = SessionLocal()
+    try:
+        snapshot = capture_risk_snapshot(db)
+        return {"snapshot_date": snapshot.snapshot_date.isoformat(), "threat_count": snapshot.threat_count}
+    finally:
+        db.close()
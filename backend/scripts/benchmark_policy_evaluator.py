@@ -0,0 +1,124 @@
+"""
+Benchmark the embedded policy evaluator: compile time, compiled-cache hits
+and per-decision latency in microseconds. Needs no database or OPA.
+
+    python scripts/benchmark_policy_evaluator.py --iterations 100000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.rego_subset import compile_policy
+from app.services.policy_service import gate_decision_for, get_compiled_policy
+
+SAMPLE_POLICY = """
+package sentinel.gates.release
+
+import rego.v1
+
+default allow := false
+
+blocking_severities := {"CRITICAL", "HIGH"}
+
+allow if count(deny) == 0
+
+deny contains msg if {
+    input.severity in blocking_severities
+    input.status == "OPEN"
+    not waived
+    msg := sprintf("%s finding %s is open", [input.severity, input.vulnerability_type])
+}
+
+deny contains msg if {
+    regex.match(`^CVE-20(1[0-9]|2[0-4])-`, input.cve_id)
+    input.cvss >= 9.0
+    msg := sprintf("known exploited CVE %s", [input.cve_id])
+}
+
+warn contains msg if {
+    some source in input.scanner_sources
+    startswith(source, "legacy-")
+    msg := sprintf("scanner %s is deprecated", [source])
+}
+
+waived if {
+    some label in input.labels
+    label == "risk-accepted"
+}
+"""
+
+SEVERITIES = ["CRITICAL", "HIGH", "MEDIUM", "LOW", "INFO"]
+STATUSES = ["OPEN", "IN_PROGRESS", "REMEDIATED"]
+
+
+def make_inputs(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "severity": rng.choice(SEVERITIES),
+            "status": rng.choice(STATUSES),
+            "vulnerability_type": rng.choice(["SQL Injection", "XSS", "SSRF", "Outdated Dependency"]),
+            "cve_id": f"CVE-20{rng.randint(15, 25)}-{rng.randint(1000, 99999)}",
+            "cvss": round(rng.uniform(0, 10), 1),
+            "scanner_sources": rng.sample(["semgrep", "trivy", "legacy-zap", "snyk"], k=2),
+            "labels": ["risk-accepted"] if rng.random() < 0.1 else [],
+        }
+        for _ in range(count)
+    ]
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    for _ in range(100):
+        compile_policy(SAMPLE_POLICY)
+    compile_us = (time.perf_counter() - started) / 100 * 1e6
+
+    policy = SimpleNamespace(policy_rule_id=uuid.uuid4(), version=1, rego_snippet=SAMPLE_POLICY)
+    compiled = get_compiled_policy(policy)
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        get_compiled_policy(policy)
+    lookup_us = (time.perf_counter() - started) / args.iterations * 1e6
+
+    inputs = make_inputs(args.iterations)
+    for input_data in inputs[:1000]:  # warm up
+        gate_decision_for(compiled.evaluate(input_data))
+
+    latencies = []
+    decisions = {}
+    clock = time.perf_counter_ns
+    for input_data in inputs:
+        begin = clock()
+        decision, _ = gate_decision_for(compiled.evaluate(input_data))
+        latencies.append((clock() - begin) / 1000)
+        decisions[decision.value] = decisions.get(decision.value, 0) + 1
+    latencies.sort()
+
+    print(f"compile:            {compile_us:10.1f} us per policy")
+    print(f"compiled cache hit: {lookup_us:10.2f} us")
+    print(f"decisions:          {args.iterations} ({', '.join(f'{k}={v}' for k, v in sorted(decisions.items()))})")
+    print(f"  mean:             {statistics.fmean(latencies):10.2f} us")
+    print(f"  p50:              {percentile(latencies, 0.50):10.2f} us")
+    print(f"  p99:              {percentile(latencies, 0.99):10.2f} us")
+    print(f"  max:              {latencies[-1]:10.2f} us")
+    print(f"throughput:         {args.iterations / (sum(latencies) / 1e6):10.0f} decisions/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Build the bundled MITRE ATT&CK technique index from an ATT&CK STIX bundle
+
+    python scripts/build_mitre_attack_index.py enterprise-attack.json --attack-version 17.0
+
+enterprise-attack.json comes from https://github.com/mitre-attack/attack-stix-data
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.mitre_attack import BUNDLED_CATALOG_PATH, stix_to_index
+
+
+def write_index(index: dict, path: Path) -> None:
+    """One tactic or technique per line, so updates diff cleanly"""
+    lines = [
+        "{",
+        f'"attack_version": {json.dumps(index["attack_version"])},',
+        '"source": "MITRE ATT&CK Enterprise (https://attack.mitre.org), generated from the STIX bundle",',
+        '"tactics": [',
+        ",\n".join(json.dumps(tactic) for tactic in index["tactics"]),
+        "],",
+        '"techniques": [',
+        ",\n".join(json.dumps(technique) for technique in index["techniques"]),
+        "]",
+        "}",
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("bundle", help="ATT&CK STIX 2.x bundle, e.g. enterprise-attack.json")
+    parser.add_argument("--attack-version", required=True, help="ATT&CK release of the bundle, e.g. 17.0")
+    parser.add_argument("--output", default=str(BUNDLED_CATALOG_PATH), help="defaults to the bundled index")
+    args = parser.parse_args()
+
+    with open(args.bundle, encoding="utf-8") as bundle_file:
+        index = stix_to_index(json.load(bundle_file))
+    index["attack_version"] = args.attack_version
+    write_index(index, Path(args.output))
+    print(f"✓ {len(index['tactics'])} tactics, {len(index['techniques'])} techniques -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
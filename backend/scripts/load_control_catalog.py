@@ -0,0 +1,114 @@
+"""
+Load compliance framework catalogs and policy-to-control mappings
+
+    python scripts/load_control_catalog.py controls                      # every bundled catalog
+    python scripts/load_control_catalog.py controls --framework NIST_800_53 --file nist-800-53-full.csv
+    python scripts/load_control_catalog.py mappings --file mappings.csv
+    python scripts/load_control_catalog.py crosswalks --file nist-to-iso.csv
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.database import SessionLocal
+from app.models.policy import ComplianceFramework
+from app.services.control_catalog_service import (
+    BUNDLED_CATALOGS,
+    load_bundled_catalog,
+    load_control_catalog,
+    load_control_crosswalks,
+    load_control_mappings,
+    parse_control_catalog,
+    parse_control_crosswalks,
+    parse_control_mappings
+)
+
+
+def _read(path: str):
+    file_path = Path(path)
+    return file_path.read_text(encoding="utf-8-sig"), file_path.suffix.lstrip(".").lower()
+
+
+def load_controls(db, frameworks, file_path):
+    frameworks = [ComplianceFramework(framework) for framework in frameworks]
+    if file_path:
+        if len(frameworks) != 1:
+            raise SystemExit("--file needs exactly one --framework")
+        content, file_format = _read(file_path)
+        results = [load_control_catalog(db, frameworks[0], parse_control_catalog(content, file_format))]
+    else:
+        results = [load_bundled_catalog(db, framework) for framework in frameworks or BUNDLED_CATALOGS]
+    for result in results:
+        scope = " (bundled subset)" if result.get("subset") else ""
+        print(
+            f"  {result['framework'].value}: {result['total']} controls{scope} "
+            f"({result['created']} created, {result['updated']} updated, {result['unchanged']} unchanged)"
+        )
+
+
+def load_mappings(db, file_path):
+    content, file_format = _read(file_path)
+    result = load_control_mappings(db, parse_control_mappings(content, file_format))
+    print(
+        f"  {result['total']} rows: {result['created']} mappings created, "
+        f"{result['existing']} already mapped, {result['unmatched_count']} unmatched"
+    )
+    for row in result["unmatched"]:
+        print(f"    row {row['row']}: {row['policy_name']} -> {row['framework']} {row['control_code']} ({row['reason']})")
+
+
+def load_crosswalks(db, file_path):
+    content, file_format = _read(file_path)
+    result = load_control_crosswalks(db, parse_control_crosswalks(content, file_format))
+    print(
+        f"  {result['total']} rows: {result['created']} crosswalks created, "
+        f"{result['existing']} already linked, {result['unmatched_count']} unmatched"
+    )
+    for row in result["unmatched"]:
+        print(
+            f"    row {row['row']}: {row['source_framework']} {row['source_control_code']} -> "
+            f"{row['target_framework']} {row['target_control_code']} ({row['reason']})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    controls = commands.add_parser("controls", help="upsert framework controls")
+    controls.add_argument(
+        "--framework", action="append", choices=[framework.value for framework in ComplianceFramework], default=[],
+        help="framework to load (repeatable); defaults to every bundled catalog"
+    )
+    controls.add_argument("--file", help="CSV or JSON catalog to load instead of the bundled one")
+    mappings = commands.add_parser("mappings", help="map policy rules to controls")
+    mappings.add_argument("--file", required=True, help="CSV or JSON with policy_name, framework, control_code")
+    crosswalks = commands.add_parser("crosswalks", help="link controls across frameworks")
+    crosswalks.add_argument(
+        "--file", required=True,
+        help="CSV or JSON with source_framework, source_control_code, target_framework, target_control_code"
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        if args.command == "controls":
+            load_controls(db, args.framework, args.file)
+        elif args.command == "mappings":
+            load_mappings(db, args.file)
+        else:
+            load_crosswalks(db, args.file)
+    except ValueError as e:
+        db.rollback()
+        raise SystemExit(f"✗ {e}")
+    finally:
+        db.close()
+    print(f"Done in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
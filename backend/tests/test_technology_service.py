@@ -0,0 +1,53 @@
+import pytest
+
+from app.services.technology_service import parse_technology_entry, parse_version_range
+
+
+@pytest.mark.parametrize("entry, name, version, parts", [
+    ("log4j 2.14.1", "log4j", "2.14.1", (2, 14, 1)),
+    ("nginx/1.25", "nginx", "1.25", (1, 25, 0)),
+    ("log4j-core-2.14.1", "log4j-core", "2.14.1", (2, 14, 1)),
+    ("openssl-3.0.7", "openssl", "3.0.7", (3, 0, 7)),
+    ("jdk-11.0.20.1", "jdk", "11.0.20.1", (11, 0, 20)),
+])
+def test_parse_technology_entry(entry, name, version, parts):
+    parsed = parse_technology_entry(entry)
+    assert parsed["name"] == name
+    assert parsed["version"] == version
+    assert (parsed["version_major"], parsed["version_minor"], parsed["version_patch"]) == parts
+
+
+def test_parse_technology_entry_hyphenated_name_without_version():
+    parsed = parse_technology_entry("spring-boot")
+    assert parsed["name"] == "spring-boot"
+    assert parsed["version_major"] is None
+
+
+def test_less_than_or_equal_partial_version_covers_whole_minor():
+    assert parse_version_range("<=2.14") == [[("<", (2, 15, 0))]]
+
+
+def test_greater_than_partial_version_excludes_whole_major():
+    assert parse_version_range(">2") == [[(">=", (3, 0, 0))]]
+
+
+def test_full_versions_keep_operator():
+    assert parse_version_range(">2.14.1 <=2.17.0") == [[(">", (2, 14, 1)), ("<=", (2, 17, 0))]]
+
+
+def test_partial_lower_and_strict_upper_bounds():
+    assert parse_version_range(">=2.0,<2.15") == [[(">=", (2, 0, 0)), ("<", (2, 15, 0))]]
+
+
+@pytest.mark.parametrize("version_range", ["*", "x", "X", "1.2.3 || *"])
+def test_wildcard_means_no_version_filter(version_range):
+    assert parse_version_range(version_range) == []
+
+
+def test_partial_wildcard_is_a_range():
+    assert parse_version_range("2.x") == [[(">=", (2, 0, 0)), ("<", (3, 0, 0))]]
+
+
+def test_wildcard_with_inequality_is_rejected():
+    with pytest.raises(ValueError):
+        parse_version_range(">*")
@@ -8,9 +8,88 @@ import {
   ResponsiveContainer,
   Legend,
 } from "recharts";
-import { riskTrendData } from "@/data/mockData";
+import { useEffect, useState } from "react";
+import apiService from "@/services/api";
+import { API_ENDPOINTS } from "@/config/api";
+import { Skeleton } from "@/components/ui/skeleton";
+import { Alert, AlertDescription } from "@/components/ui/alert";
+import { AlertCircle } from "lucide-react";
+
+interface RiskTrendPoint {
+  snapshot_date: string;
+  open_findings_by_severity: Record<string, number>;
+}
+
+interface RiskTrendResponse {
+  points: RiskTrendPoint[];
+}
+
+interface RiskTrendChartData {
+  month: string;
+  critical: number;
+  high: number;
+  medium: number;
+  low: number;
+}
+
+// Months of history shown on the dashboard
+const TREND_MONTHS = 6;
 
 export function RiskTrendChart() {
+  const [riskTrendData, setRiskTrendData] = useState<RiskTrendChartData[]>([]);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState<string | null>(null);
+
+  useEffect(() => {
+    const fetchRiskTrend = async () => {
+      try {
+        setLoading(true);
+        setError(null);
+        const from = new Date();
+        from.setMonth(from.getMonth() - TREND_MONTHS);
+        const data = await apiService.get<RiskTrendResponse>(API_ENDPOINTS.analytics.riskTrend, {
+          params: { from: from.toISOString().slice(0, 10), granularity: "month" },
+        });
+        setRiskTrendData(
+          data.points.map((point) => ({
+            month: new Date(point.snapshot_date).toLocaleString("en-US", { month: "short", timeZone: "UTC" }),
+            critical: point.open_findings_by_severity.CRITICAL ?? 0,
+            high: point.open_findings_by_severity.HIGH ?? 0,
+            medium: point.open_findings_by_severity.MEDIUM ?? 0,
+            low: point.open_findings_by_severity.LOW ?? 0,
+          }))
+        );
+      } catch (err: any) {
+        setError(err.message || "Failed to load risk trend data");
+      } finally {
+        setLoading(false);
+      }
+    };
+
+    fetchRiskTrend();
+  }, []);
+
+  if (loading) {
+    return (
+      <div className="p-6 rounded-xl bg-card border border-border">
+        <h3 className="text-lg font-semibold text-foreground mb-4">Risk Trend</h3>
+        <Skeleton className="h-64 w-full" />
+      </div>
+    );
+  }
+
+  if (error) {
+    return (
+      <div className="p-6 rounded-xl bg-card border border-border">
+        <h3 className="text-lg font-semibold text-foreground mb-4">Risk Trend</h3>
+        <Alert variant="destructive">
+          <AlertCircle className="h-4 w-4" />
+          <AlertDescription>{error}</AlertDescription>
+        </Alert>
+      </div>
+    );
+  }
+
   return (
     <div className="p-6 rounded-xl bg-card border border-border">
       <h3 className="text-lg font-semibold text-foreground mb-4">Risk Trend</h3>
@@ -21,7 +21,7 @@ import { cn } from "@/lib/utils";
 import { Plus, Trash2, Save, Download, X, Link2, Upload, Edit, Shield } from "lucide-react";
 import type { Asset } from "@/types";
 import { toast } from "@/components/ui/sonner";
-import { threatsService, type ThreatModelDiagram, type ThreatModelDiagramCreate } from "@/services/threats.service";
+import { threatsService, type ThreatModelDiagramSummary, type ThreatModelDiagramCreate } from "@/services/threats.service";
 import {
   Dialog,
   DialogContent,
@@ -78,7 +78,7 @@ export function ThreatModelingCanvas({ assetId, threatId }: ThreatModelingCanvas
   const [isEditNodeDialogOpen, setIsEditNodeDialogOpen] = useState(false);
   const [saveName, setSaveName] = useState("");
   const [saveDescription, setSaveDescription] = useState("");
-  const [savedDiagrams, setSavedDiagrams] = useState<ThreatModelDiagram[]>([]);
+  const [savedDiagrams, setSavedDiagrams] = useState<ThreatModelDiagramSummary[]>([]);
   const [editingNode, setEditingNode] = useState<CanvasNode | null>(null);
   const [availableThreats, setAvailableThreats] = useState<Threat[]>([]);
   const [currentDiagramId, setCurrentDiagramId] = useState<string | null>(null);
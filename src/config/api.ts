@@ -93,6 +93,10 @@ export const API_ENDPOINTS = {
     riskHeatmap: '/dashboard/risk-heatmap',
     trends: '/analytics/trends',
   },
+  // Analytics
+  analytics: {
+    riskTrend: '/analytics/risk-trend',
+  },
   // Webhooks
   webhooks: {
     scanResults: (scannerType: string) => `/webhooks/scan-results/${scannerType}`,
@@ -127,8 +127,8 @@ export const MITRE_ATTACK_TECHNIQUES: MitreAttackTechnique[] = [
     description: "Adversaries use remote services to move between systems"
   },
   {
-    id: "T1077",
-    name: "Windows Admin Shares",
+    id: "T1021.002",
+    name: "SMB/Windows Admin Shares",
     tactic: "Lateral Movement",
     description: "Adversaries may use Windows admin shares to move between systems"
   },
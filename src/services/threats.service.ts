@@ -131,7 +131,7 @@ export const threatsService = {
     page?: number;
     pageSize?: number;
     threatId?: string;
-  }): Promise<PaginatedResponse<ThreatModelDiagram>> => {
+  }): Promise<PaginatedResponse<ThreatModelDiagramSummary>> => {
     const queryParams: any = {
       page: params?.page || 1,
       page_size: params?.pageSize || 50,
@@ -142,7 +142,7 @@ export const threatsService = {
       queryParams.threat_id = params.threatId;
     }
     
-    const response = await apiService.getPaginated<ThreatModelDiagram>(
+    const response = await apiService.getPaginated<ThreatModelDiagramSummary>(
       API_ENDPOINTS.threats.diagrams.list,
       queryParams
     );
@@ -185,6 +185,22 @@ export interface ThreatModelDiagram {
     nodes: any[];
     links: any[];
   };
+  revision: number;
+  created_by: string;
+  created_at: string;
+  updated_at: string;
+  creator_name?: string;
+}
+
+export interface ThreatModelDiagramSummary {
+  diagram_id: string;
+  threat_id?: string;
+  name: string;
+  description?: string;
+  revision: number;
+  node_count: number;
+  link_count: number;
+  thumbnail_svg?: string;
   created_by: string;
   created_at: string;
   updated_at: string;